@@ -1,545 +1,91 @@
-import requests
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
+from functools import lru_cache
 import streamlit as st
-from typing import Dict, Tuple, Optional
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
 import streamlit.column_config as cc 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from pathlib import Path
-import json
-from copy import deepcopy
-from dataclasses import dataclass
-
-@dataclass
-class GatewayInfo:
-    calculation_number: int
-    gateway_id: str
-    gateway_number: int
-
-base_address: str | None = None     # noch kein Wert
-SETTINGS_PATH = Path(__file__).parent / "settings.json"
-
-# Aktuelles Datum und in 10 Arbeitstagen & 3 Tage zurück
-heute = datetime.today()
-arbeitstage_10spaeter = np.busday_offset(heute.date(), 10, roll='forward')
-arbeitstage_3frueher = np.busday_offset(heute.date(), -3, roll='backward')
-
-# Als Strings im Format DD.MM.YYYY
-datum_heute = heute.strftime("%d.%m.%Y")
-datum_plus10 = pd.Timestamp(arbeitstage_10spaeter).strftime("%d.%m.%Y")
-datum_minus3 = pd.Timestamp(arbeitstage_3frueher).strftime("%d.%m.%Y")
-
-
-
-from typing import Optional, Dict, Any, Tuple, List  # mypy‑friendly
-
-# Zuordnung der Kalkulationsstunden zu den Abteilungen
-CALC_FIELD_TO_DEPT = {
-    "yprjmcad":  "MCAD",
-    "yprjecad":  "ECAD",
-    "yprjauto":  "AUTOMATION",
-    "yprjbild":  "BILDGEBUNG",
-    "yprjas":    "PROJECTMANAGEMENT",
-    "yprjpm":    "PRODUCT DEVELOPMENT",
-    "yprjtd":    "TD",
-    "yprjsoft":  "SOFTWARE",
-}
-ALL_DEPTS = list(CALC_FIELD_TO_DEPT.values())
-# add the Department "IPC" and "TECHNIKUM" to the list
-ALL_DEPTS += ["IPC", "TECHNIKUM"]
-
-#Aufgabennamen
-TASK_NAMES = {
-    "BILDGEBUNG": "Imaging Design",
-    "MCAD": "MCAD Konstruktionsphase (inklusive Kundenlayout)",
-    "ECAD": "ECAD Konstruktionsphase",
-    "PROJECTMANAGEMENT": "Project Planning",
-    "PRODUCT DEVELOPMENT": "Special Development",  
-    "SOFTWARE": "Software Installation",
-    "TD": "Manual",
-    "AUTOMATION": "Automation",
-}
-
-LEISTUNGSARTEN: dict[str, str] = {
-    "BILDGEBUNG":        "BILDGEBUNG",
-    "MCAD":              "MCAD",
-    "ECAD":              "ECAD_ELEKTRONIK",
-    "PROJECTMANAGEMENT": "AUFTRAGSTEUERUNG",
-    "SOFTWARE":          "SOFTWARE",
-    "TD":                "TD",
-    "AUTOMATION":        "AUTOMATIS",
-    "IPC":               "SOFTWARE",
-    "TECHNIKUM":         "TECHNIKUM",
-    "INTRAVIS":        "SONSTIGE",
-}
-# -------
-DATE_RULES = {
-    "BILDGEBUNG":          ("G6", 0,    "G6",  7),
-    "MCAD":                ("G6", 1,  "G6", 8),
-    "ECAD":                ("G6", 1,  "G6", 8),
-    "PROJECTMANAGEMENT":   ("TODAY", -5, "G8",  0),
-    "PRODUCT DEVELOPMENT": ("G6", 0,    "G7",  0),  # Ende Engineering = G7
-    "SOFTWARE":            ("G7", 1,    "G7", 14),
-    "TD":                  ("G8", -10,  "G8", -3),
-    "AUTOMATION":          ("G7", 0,  "G7", 14)
-}
-
-
-DEFAULT_SETTINGS = {
-    "doppelte_bildgebungsaufgabe": True,
-    "mcad_ecad_freigabeaufgabe": True,
-    "base_address": "http://intra-erp:4444/EPLAN_WS_FREE_EDP",
-    "task_names": TASK_NAMES.copy(),     # aus der alten Konstante
-    "date_rules": {k: list(v) for k, v in DATE_RULES.items()},
-}
-
-# TERMINREGELN – leicht anpassbar
-# ---------------------------------------------------------------------------
-# Jeder Eintrag: (Start‑Anker, Start‑Offset‑Tage, End‑Anker, End‑Offset‑Tage)
-# Anker = "G6", "G7", "G8"  oder "TODAY"
-
-
-# ---------------------------------------------------------------------------
-# HILFSFUNKTION – Default‑Start/Ende nach Regelwerk berechnen
-# ---------------------------------------------------------------------------
-def post_json(params: dict,
-              *,
-              err_msg: str = "Fehler beim Abrufen der Daten",
-              address: str | None = None,
-              timeout: int = 30):
+from io import BytesIO
+
+from services import metrics, stream, transport
+from services.date_rules import ANCHORS, compile_date_rules
+from services.journal import CreateJournal
+from services.settings import SettingsConflictError, SettingsSnapshot, freeze
+from services.store import get_store
+from services import pjm
+from services.pjm import (
+    ALL_DEPTS, DATE_RULES, DEFAULT_BASE_ADDRESS, TASK_NAMES,
+    CreateJob, ProjectData,
+    build_create_jobs, build_portfolio_plan,
+    business_calendar, date_rules, decode_overview, extract_department_hours,
+    fetch_project_data, revalidate_in_background,
+    iter_overview_data, map_leistungsart, missing_milestones, parse_project_numbers,
+    read_project_csv, run_create_jobs, save_settings,
+)
+
+
+def _cfg() -> Mapping[str, Any]:
+    return st.session_state.get("cfg", {})
+
+
+# Fachlogik (services/pjm.py) liest Adresse, Feiertage, Regeln, Aufgabennamen
+# und das Höchstalter der Store-Einträge aus der Session und meldet Fehler
+# direkt in der Seite.
+pjm.set_providers(
+    address=lambda: _cfg().get("base_address", DEFAULT_BASE_ADDRESS),
+    holidays=lambda: _cfg().get("holidays", ()),
+    date_rules=lambda: _cfg().get("date_rules", DATE_RULES),
+    task_names=lambda: _cfg().get("task_names", TASK_NAMES),
+    store_revalidate_s=lambda: _cfg().get("store_revalidate_s", 3600),
+)
+pjm.set_reporter(lambda msg, level: getattr(st, level)(msg))
+
+
+def load_project_data(project_number: str, *, reload: bool = False) -> Optional[ProjectData]:
     """
-    Sendet einen POST-Request an `address` und gibt bei Erfolg die JSON-Antwort
-    zurück. Bei Fehlern wird eine Streamlit-Fehlermeldung angezeigt und `None`
-    geliefert.
-
-    Parameters
-    ----------
-    params   : JSON-Payload für den Request
-    err_msg  : Basis-Text für die Fehlermeldung (wird um die Exception ergänzt)
-    address  : Ziel-URL (default: globales `base_address`)
-    timeout  : Sekunden bis zum Timeout (default: 30)
-
-    Returns
-    -------
-    dict | None
-    """
-    if address is None:
-        address = st.session_state.get("cfg", {}).get(
-            "base_address", "http://intra-erp:4444/EPLAN_WS_FREE_EDP"
-        )
-
-    try:
-        res = requests.post(address, json=params, timeout=timeout)
-        res.raise_for_status()
-        return res.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"{err_msg}: {e}")
-        return None
-
-def roll_to_business_day(ts: "pd.Timestamp | pd.NaTType",
-                         *,
-                         how: str = "forward") -> "pd.Timestamp | pd.NaTType":
-    """
-    Rollt ein Datum auf den nächsten/vorherigen Werktag.
-    • ts darf Timestamp, datetime.date oder NaT sein.
-    • how = 'forward'  → nächster Werktag (Mo-Fr)
-      how = 'backward' → vorheriger Werktag
-    """
-    if pd.isna(ts):                # NaT/NaN bleibt NaT
-        return ts
-
-    # in numpy-Datums-Skalierung bringen (D-Tage seit 1970-01-01)
-    d64 = np.datetime64(ts, "D")
-    rolled = np.busday_offset(d64, 0, roll=how)
-    return pd.Timestamp(rolled)
-
-def map_leistungsart(key: str, *, default: str | None = None) -> str:
-    """
-    Gibt den gemappten Wert zurück; Keys werden
-    case-insensitive behandelt. Bei unbekannter
-    Leistungsart → default oder KeyError.
-    """
-    try:
-        return LEISTUNGSARTEN[key.upper()]
-    except KeyError:
-        if default is not None:
-            return default
-        raise ValueError(f"Unbekannte Leistungsart: {key!r}") from None
-
-def release_tasks_to_departments(project_number: str):
-    params = {
-    "action": "infosystem",
-    "infosystem": "PRJMAUFAN",
-    "data": [
-        {"name": "yprojekt", "value": project_number},
-        {"name": "yvondatum", "value": ""},
-        {"name": "ybisdatum", "value": ""},
-        {"name": "bstart", "value": "1"},
-        {"name": "ybuanlegen", "value": "1"}
-    ]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
+    Gateway-Kopf, Gateway-Termine und Kalkulationsstunden eines Projekts.
 
-def load_settings() -> dict:
-    settings = deepcopy(DEFAULT_SETTINGS)
-    if SETTINGS_PATH.exists():
-        try:
-            user_cfg = json.loads(SETTINGS_PATH.read_text("utf-8"))
-            # flach plus verschachteltes Überschreiben
-            for k, v in user_cfg.items():
-                if isinstance(v, dict) and k in settings:
-                    settings[k].update(v)
-                else:
-                    settings[k] = v
-        except json.JSONDecodeError as e:
-            st.warning(f"settings.json defekt ({e}) – benutze Defaults")
-    return settings
-
-def save_settings(settings: dict):
-    SETTINGS_PATH.write_text(json.dumps(settings, indent=2), encoding="utf-8")
-
-def _default_dates(dept: str, gw_dates: Dict[str, str]):
-    rule = DATE_RULES.get(dept)
-    if not rule:
-        return heute.date(), heute.date()
-
-    start_anchor, start_off, end_anchor, end_off = rule
-
-    def _anchor_date(key):
-        if key == "TODAY":
-            return heute.date()
-        d_str = gw_dates.get(key)
-        return pd.to_datetime(d_str, dayfirst=True).date() if d_str else heute.date()
-
-    s_date = _anchor_date(start_anchor) + timedelta(days=start_off)
-    e_date = _anchor_date(end_anchor) + timedelta(days=end_off)
-    return s_date, e_date
-
-def create_project_task_folder(project_number, task_name, date_start, date_end):
-    
-    # JSON-Payload analog zum C# Beispiel
-    params = {
-        "action": "create",
-        "database_and_group": "149:02",
-        "data": [
-            {"name": "yprojekt", "value": project_number},
-            {"name": "namebspr", "value": task_name},
-            {"name": "ypvtyp", "value": "Sammelvorgang"},
-            {"name": "yadatum", "value": date_start},
-            {"name": "yedatum", "value": date_end }
-        ],
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-#create a task for a specific person in ABAS ERP
-def create_project_task_for_person(project_number, person_short, leiart, task_name, time_budget, date_start, date_end):
-    
-    
-    # JSON-Payload analog zum C# Beispiel
-    params = {
-        "action": "create",
-        "database_and_group": "149:02",
-        "data": [
-            {"name": "yprojekt", "value": project_number},
-            {"name": "ypersonal", "value": person_short},
-            {"name": "namebspr", "value": task_name},
-            {"name": "yleiart", "value": leiart},
-            {"name": "ypvsollstd", "value": time_budget},
-            {"name": "ypvplanstd", "value": time_budget},
-            {"name": "ypvforecaststd", "value": time_budget},
-            {"name": "yadatum", "value": date_start},
-            {"name": "yedatum", "value": date_end }
-        ],
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def create_project_task_for_department(project_number, department_short, leiart, task_name, time_budget, date_start, date_end):
-    
-    # JSON-Payload analog zum C# Beispiel
-    params = {
-        "action": "create",
-        "database_and_group": "149:02",
-        "data": [
-            {"name": "yprojekt", "value": project_number},
-            {"name": "yprojteam", "value": department_short},
-            {"name": "yleiart", "value": leiart},
-            {"name": "namebspr", "value": task_name},
-            {"name": "ypvsollstd", "value": time_budget},
-            {"name": "ypvplanstd", "value": time_budget},
-            {"name": "ypvforecaststd", "value": time_budget},
-            {"name": "yadatum", "value": date_start},
-            {"name": "yedatum", "value": date_end }
-        ],
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def create_dispatch_milestone(project_number, person_short, date_start, date_end):
-    
-    # JSON-Payload analog zum C# Beispiel
-    params = {
-        "action": "create",
-        "database_and_group": "149:02",
-        "data": [
-            {"name": "yprojekt", "value": project_number},
-            {"name": "ypersonal", "value": person_short},
-            {"name": "yadatum", "value": date_start},
-            {"name": "yedatum", "value": date_end },
-            {"name": "ypvtyp", "value": "Meilenstein" },
-            {"name": "namebspr", "value": "MS Dispatch"}
-        ],
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def fetch_gateway_data(gateway_id):
-        # JSON-Payload analog zum C# Beispiel
-    params = {
-        "action": "read",
-        "id": gateway_id,
-        "fields": [],
-        "table_fields": ["ytzid","ytname","ytenddate"]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def fetch_calculation_hours(calculation_number):
-    params = {
-        "action": "query",
-        "database_and_group": "41:00",
-        "fields": [
-            "yprjmcad","yprjauto","yprjecad","yprjbild","yprjas","yprjpm","yprjtd","yprjsoft"
-        ],
-        "filter":{
-            "type": "atomic_condition",
-            "name": "nummer",
-            "value": calculation_number,
-            "operator": "EQUALS"
-        }
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-
-def fetch_gateway_infosystem_sold_phase():
-    params = {
-        "action": "infosystem",
-        "infosystem": "GATEWAYDASHBOARD",
-        "data": [
-            {"name": "prjphase", "value": "Sold Phase"},
-            {"name": "bstart", "value": "1"}   
-        ],
-        "table_fields": [
-            "tprojekt^nummer","tserprod^nummer","tprojektname^name",
-            "tprjphase^name","ytaktgw","ygwinfo","ytprjampel",
-            "ytkundeans^name","ytstandortans^name","ytprjverantw^such"
-        ]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def fetch_gateway_infosystem(projektleiter_kuerzel):
-    params = {
-        "action": "infosystem",
-        "infosystem": "GATEWAYDASHBOARD",
-        "data": [
-            {"name": "prjleit", "value": projektleiter_kuerzel},
-            {"name": "bstart", "value": "1"}
-        ],
-        "table_fields": [
-            "tprojekt^nummer","tserprod^nummer","tprojektname^name",
-            "tprjphase^name","ytaktgw","ygwinfo","ytprjampel",
-            "ytkundeans^name","ytstandortans^name","ytprjverantw^such"
-        ]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def fetch_dispatch_infosystem(projektleiter_kuerzel):
-    params = {
-        "action": "infosystem",
-        "infosystem": "DISPATCH",
-        "data": [
-            {"name": "yprjleit", "value": projektleiter_kuerzel},
-            {"name": "yvon", "value": datum_heute},
-            {"name": "ybis", "value": datum_plus10},
-            {"name": "bstart", "value": "1"}
-        ],
-        "table_fields": [
-            "ytprojekt^nummer","ytserprod^nummer",
-            "ytserprodname^name","ytwarenempfname^name","ytdispatch"
-        ]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-    
-def fetch_open_tasks(projektleiter_kuerzel):
-    params = {
-        "action": "infosystem",
-        "infosystem": "10345",
-        "data": [
-            {"name": "bearbeit", "value": projektleiter_kuerzel},
-            {"name": "bstart", "value": "1"}
-        ],
-        "table_fields": ["taufgabe^nummer","taufgabe^projekt^nummer","taufgabe^yprojektname^namebspr","taufgabe^start","taufgabe^end","taufgabenname^namebspr","tbestaetigername^namebspr"]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-
-def fetch_booked_hours(projektleiter_kuerzel):
-    params = {
-        "action": "infosystem",
-        "infosystem": "PRJMLM",
-        "data": [
-            {"name": "ypersonal", "value": projektleiter_kuerzel},
-            {"name": "ystdvondatum", "value": datum_minus3},
-            {"name": "ystdbisdatum", "value": datum_heute},
-            {"name": "bstart", "value": "1"}
-        ],
-        "table_fields": ["yadatum","ystdtats","ytprojekt^nummer","ytprojekt^namebspr"]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
-    
-def fetch_overbooked_projects(projektleiter_kuerzel):
-    params = {
-        "action": "infosystem",
-        "infosystem": "PRJM5080LISTE",
-        "data": [
-            {"name": "yprojleit", "value": projektleiter_kuerzel},
-            {"name": "ybprabgeschlossen", "value": "1"},
-            {"name": "yvondatum", "value": datum_minus3},
-            {"name": "ybisdatum", "value": datum_heute},
-            {"name": "bstart", "value": "1"}
-        ],
-        "table_fields": ["ytprojekt^nummer","ytprojname^namebspr","ytfortistbudget","ytsollstd","ytiststd"]
-    }
-    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+    Reihenfolge: Session (`st.session_state`) → lokaler Projekt-Store →
+    ABAS. Ein Eintrag aus dem Store wird sofort verwendet; ist er älter als
+    `store_revalidate_s`, holt ein Hintergrund-Thread den aktuellen Stand.
+    Hat sich dabei etwas geändert (neue Store-Version), übernimmt der
+    nächste Rerun die neuen Daten.
 
-def get_gateway_info(project_number: str) -> Optional[GatewayInfo]:
+    `reload=True` geht direkt an ABAS und verwirft Session-Eintrag und
+    zugehörige Einträge im Lese-Cache.
     """
-    Liefert (calc_no, gateway_id, gateway_no).
-    Gibt None zurück, wenn etwas fehlt oder ein Fehler auftritt.
-    """
-    params = {
-        "action": "query",
-        "database_and_group": "32:00",
-        "fields": ["nummer", "id", "ycalc^nummer"],
-        "filter": {
-            "type": "atomic_condition",
-            "name": "yproject",
-            "value": project_number,
-            "operator": "EQUALS",
-        },
-    }
-
-    try:
-        r_json = post_json(
-            params,
-            err_msg="Fehler beim Abruf der Gateway-Kopfdaten"
-        )
-
-        if not r_json.get("success"):
-            st.error(f"ABAS meldet Fehler: {r_json.get('message', 'kein Text')}")
-            return None
-
-        rows = r_json.get("result_data", [])
-        if not rows:
-            st.warning(
-                f"Projekt {project_number} wurde nicht gefunden. "
-                "Existiert hier möglicherweise ein Teilprojekt?"
-            )
-            return None
-
-        row = rows[0]
-
-        calc_no = row.get("ycalc^nummer")
-        if not calc_no:                                   # <<–– neuer Check
-            st.error(
-                "❌ Für dieses Gateway ist keine Kalkulationsnummer "
-                "('ycalc^nummer') hinterlegt. "
-                "Bitte in ABAS nachtragen oder das Projekt prüfen."
-            )
-            return None
-
-        return GatewayInfo(calc_no, row.get("id", ""), row.get("nummer", ""))
-
-    except requests.exceptions.RequestException as e:
-        st.error(f"HTTP-Fehler beim Abruf der Gateway-Kopfdaten: {e}")
+    memo: Dict[str, ProjectData] = st.session_state.setdefault("project_data", {})
+    store = get_store()
+
+    if reload:
+        old = memo.pop(project_number, None)
+        tags = []
+        if old is not None:
+            tags = [f"id:{old.gw_info.gateway_id}",
+                    f"filter:nummer={old.gw_info.calculation_number}"]
+        transport.invalidate(projects=[project_number], tags=tags)
+    else:
+        data = memo.get(project_number)
+        if data is not None and store.version(project_number) in (None, data.version):
+            return data
+
+        stored = store.get(project_number)
+        if stored is not None:
+            if data is not None:
+                st.toast(f"Projektdaten {project_number} wurden in ABAS geändert "
+                         "und neu geladen.")
+            data = memo[project_number] = ProjectData.from_record(stored)
+            max_age = st.session_state.get("cfg", {}).get("store_revalidate_s", 3600)
+            if stored.age() > max_age:
+                revalidate_in_background(project_number)
+            return data
+
+    data = fetch_project_data(project_number)
+    if data is None:
         return None
-
-def get_phase_end_dates(response: dict) -> Tuple[Dict[str, str], Dict[str, date]]:
-    """
-    Extrahiert die Enddaten der Phasen G6, G7 und G8 aus dem API-Payload
-    und liefert sie (a) als String-Dictionary und (b) bereits geparst
-    als date-Objekte zurück.
-
-    Parameters
-    ----------
-    response : dict
-        Voller JSON-Response, der u. a. response["result_data"]["table"] enthält.
-
-    Returns
-    -------
-    Tuple[dict[str, str], dict[str, date]]
-        (1) {phase_id: "dd.mm.yyyy"}  – unverändert als String  
-        (2) {phase_id: date(yyyy, mm, dd)} – geparst für weitere Berechnungen
-    """
-    target_phases = {"G6", "G7", "G8"}
-
-    # (1) Rohdaten als String sammeln
-    end_dates = {
-        item.get("ytzid"): item.get("ytenddate", "")
-        for item in response.get("result_data", {}).get("table", [])
-        if item.get("ytzid") in target_phases
-    }
-
-    # (2) In echte date-Objekte umwandeln, leere Strings überspringen
-    milestones = {
-        k: datetime.strptime(v, "%d.%m.%Y").date()
-        for k, v in end_dates.items()
-        if v
-    }
-
-    return end_dates, milestones
-
-
-
-def extract_department_hours(api_response: dict) -> dict[str, int]:
-    """
-    Convert the API's 'result_data' section to {department: hours}.
-
-    Parameters
-    ----------
-    api_response : dict
-        The full JSON object returned by the API call.
-
-    Returns
-    -------
-    dict[str, int]
-        Aggregated hours keyed by the human-readable department names.
-    """
-    dept_hours: dict[str, int] = {}
-    for row in api_response.get("result_data", []):
-        # row is a dict with raw calc fields and numeric hour totals
-        for raw_field, hours in row.items():
-            if raw_field in CALC_FIELD_TO_DEPT and isinstance(hours, (int, float)):
-                dept = CALC_FIELD_TO_DEPT[raw_field]
-                # accumulate in case the same dept appears in multiple rows
-                dept_hours[dept] = dept_hours.get(dept, 0) + hours
-    return dept_hours
-
-def _resolve_anchor(anchor: str, milestones: dict[str, date]) -> date:
-    """Gibt das Basisdatum für einen Ankerstring zurück."""
-    if anchor == "TODAY":
-        return date.today()
-    return milestones[anchor]
-
-def default_interval(dept: str, milestones: dict[str, date]) -> tuple[date, date]:
-    """Berechnet Start- und Enddatum gemäss DATE_RULES."""
-    rules = st.session_state["cfg"]["date_rules"]
-    a_s, off_s, a_e, off_e = rules[dept]
-    start = roll_to_business_day(
-            _resolve_anchor(a_s, milestones) + timedelta(days=off_s),
-            how="forward")
-    end   = roll_to_business_day(
-                _resolve_anchor(a_e, milestones) + timedelta(days=off_e),
-                how="backward")
-    return start, end
+    data.version = store.put(project_number, data.to_record())
+    memo[project_number] = data
+    return data
 
 def plot_gantt(df_active: pd.DataFrame, milestones: dict[str, date]):
     """
@@ -547,27 +93,42 @@ def plot_gantt(df_active: pd.DataFrame, milestones: dict[str, date]):
       • eine Task-Zeile pro Abteilung
       • X-Achse nur Kalenderwochen (KW##)
       • Meilensteine mit Datumsangabe
-    Gibt eine matplotlib-Figure zurück.
+    Gibt eine matplotlib-Figure zurück (ohne pyplot – kein globaler
+    Figure-Zustand, und matplotlib wird erst hier geladen).
     """
-    df = df_active.copy()
-    df["Start"] = pd.to_datetime(df["Start"])
-    df["Ende"]  = pd.to_datetime(df["Ende"])
-    df = df.sort_values("Start")
+    from matplotlib.collections import PolyCollection
+    from matplotlib.dates import date2num
+    from matplotlib.figure import Figure
+
+    df = pd.DataFrame({
+        "Abteilung": df_active["Abteilung"].to_numpy(),
+        "Start": pd.to_datetime(df_active["Start"]).to_numpy(),
+        "Ende":  pd.to_datetime(df_active["Ende"]).to_numpy(),
+    }).sort_values("Start")
 
-    fig, ax = plt.subplots(figsize=(10, 0.6 * len(df) + 2))
-    y_pos = range(len(df))
+    fig = Figure(figsize=(10, 0.6 * len(df) + 2))
+    ax = fig.subplots()
+    y_pos = np.arange(len(df))
 
     # ------------------ Tasks ------------------
-    for i, (_, r) in enumerate(df.iterrows()):
-        ax.barh(i,
-                (r["Ende"] - r["Start"]).days,
-                left=r["Start"],
-                height=0.6)
-        ax.text(r["Start"], i, f' {r["Abteilung"]}', va="center")
+    # alle Balken als eine PolyCollection (ein Artist statt eines Rectangle
+    # je Aufgabe), Ecken in Matplotlib-Tagen; die Abteilungen stehen als
+    # y-Ticklabels daneben statt als Text je Zeile
+    left = date2num(df["Start"])
+    right = date2num(df["Ende"])
+    lo, hi = y_pos - 0.3, y_pos + 0.3
+    verts = np.stack([np.column_stack(c) for c in
+                      ((left, lo), (left, hi), (right, hi), (right, lo))], axis=1)
+    ax.xaxis_date()
+    ax.add_collection(PolyCollection(verts, facecolors="tab:blue"))
+    ax.autoscale_view()
+    ax.set_yticks(y_pos, labels=df["Abteilung"])
 
     # ------------------ Meilensteine ------------------
+    whens = list(milestones.values())
+    ax.vlines(whens, 0, 1, transform=ax.get_xaxis_transform(),
+              linestyles="--", colors="tab:red")
     for label, when in milestones.items():
-        ax.axvline(when, linestyle="--", color="tab:red")
         ax.text(when, len(df)+0.2,
                 f'{label}\n{when.strftime("%d.%m.%Y")}',
                 rotation=90, va="bottom", ha="center", color="tab:red")
@@ -578,9 +139,9 @@ def plot_gantt(df_active: pd.DataFrame, milestones: dict[str, date]):
 
     kw_mondays = pd.date_range(start_kw, end_kw, freq="W-MON")
 
-    # dünne vertikale Linien je KW
-    for w in kw_mondays:
-        ax.axvline(w, alpha=0.2, linewidth=0.5, zorder=0)
+    # dünne vertikale Linien je KW – eine LineCollection
+    ax.vlines(kw_mondays, 0, 1, transform=ax.get_xaxis_transform(),
+              alpha=0.2, linewidth=0.5, zorder=0)
 
     # Achsenticks nur an KW-Montagen
     ax.set_xticks(kw_mondays)
@@ -589,160 +150,299 @@ def plot_gantt(df_active: pd.DataFrame, milestones: dict[str, date]):
 
     # ------------------ Achsen-Finish ------------------
     ax.set_xlabel("Kalenderwoche")
-    ax.set_yticks([])
     ax.set_ylim(-1, len(df) + 1)
     fig.tight_layout()
     return fig
 
-def page_overview(projektleiter: str, settings: dict):
-    st.title("PJM OVERVIEW")
-    projektleiter = st.session_state.get("projektleiter")
-    if not projektleiter:
-        st.warning("Bitte ein Projektleiter-Kürzel eingeben.")
-        return
+@st.cache_data(max_entries=64, show_spinner=False)
+def render_gantt_png(tasks: Tuple[Tuple[str, pd.Timestamp, pd.Timestamp], ...],
+                     milestones: Tuple[Tuple[str, date], ...]) -> bytes:
+    """
+    Gantt als PNG, gecacht über (Aufgaben, Meilensteine): ein unveränderter
+    Plan wird nie neu gezeichnet. Die Figure hängt an keinem pyplot-Register
+    und wird nach dem Rendern einfach freigegeben.
+    """
+    df = pd.DataFrame(list(tasks), columns=["Abteilung", "Start", "Ende"])
+    fig = plot_gantt(df, dict(milestones))
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=120)
+    return buf.getvalue()
 
-    # Gateways in SOLD Phase
-    gw_sold = fetch_gateway_infosystem_sold_phase()
-    if gw_sold and gw_sold.get("success"):
-        df_gw_sold = pd.DataFrame(gw_sold["result_data"]["table"])
-        df_gw_sold.rename(columns={
-            "tprojekt^nummer": "Projekt-Nr.",
-            "tserprod^nummer": "Serviceprodukt",
-            "tprojektname^name": "Projektname",
-            "tprjphase^name": "Phase",
-            "ytaktgw": "Gateway",
-            "ygwinfo": "Gateway-Info",
-            "ytprjampel": "Ampel",
-            "ytkundeans^name": "Kunde",
-            "ytstandortans^name": "Standort",
-            "ytprjverantw^such": "Verantwortlich"
-        }, inplace=True)
-        order_gw_sold = [
-            "Projekt-Nr.","Serviceprodukt","Verantwortlich","Projektname",
-            "Phase","Ampel","Gateway","Gateway-Info",
-            "Kunde","Standort"
-        ]
-        df_gw_sold = df_gw_sold[[c for c in order_gw_sold if c in df_gw_sold.columns]]
-        st.subheader("💸Projekte in Sold Phase")
-        st.dataframe(df_gw_sold, use_container_width=True)
 
+def _week_labels(weeks: pd.DatetimeIndex) -> List[str]:
+    iso = weeks.isocalendar()
+    return [f"KW{w:02d}/{y % 100:02d}" for y, w in zip(iso["year"], iso["week"])]
+
+
+def plot_capacity(load: pd.DataFrame, limit: float = 0.0):
+    """
+    Heatmap Gruppen × Kalenderwochen (Stunden); Zellen über `limit`
+    werden umrandet. Wie `plot_gantt` ohne pyplot.
+    """
+    from matplotlib.figure import Figure
+
+    values = load.to_numpy()
+    n_groups, n_weeks = values.shape
+    fig = Figure(figsize=(max(8, 0.22 * n_weeks + 3), 0.45 * n_groups + 2))
+    ax = fig.subplots()
+    im = ax.imshow(values, aspect="auto", cmap="YlOrRd", interpolation="nearest")
+    fig.colorbar(im, ax=ax, label="Stunden je Woche", pad=0.01)
+
+    if limit > 0:
+        rows, cols = np.nonzero(values > limit)
+        ax.scatter(cols, rows, marker="s", s=60, facecolors="none",
+                   edgecolors="black", linewidths=1.2)
+
+    step = max(1, n_weeks // 40)                  # höchstens ~40 Beschriftungen
+    ax.set_xticks(np.arange(0, n_weeks, step))
+    ax.set_xticklabels(_week_labels(load.columns)[::step], rotation=90)
+    ax.set_yticks(np.arange(n_groups))
+    ax.set_yticklabels(load.index)
+    ax.set_xlabel("Kalenderwoche")
+    fig.tight_layout()
+    return fig
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_capacity_png(load: pd.DataFrame, limit: float) -> bytes:
+    """Heatmap als PNG, gecacht über Matrix und Schwelle."""
+    fig = plot_capacity(load, limit)
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=110)
+    return buf.getvalue()
+
+
+def _show_table(df: pd.DataFrame):
+    """Tabelle mit Datumsspalten im ABAS-Format TT.MM.JJJJ."""
+    dates = {c: cc.DateColumn(c, format="DD.MM.YYYY")
+             for c in df.columns if pd.api.types.is_datetime64_any_dtype(df[c])}
+    st.dataframe(df, use_container_width=True, column_config=dates)
+
+
+# Gateways in SOLD Phase – Verantwortlicher steht hier weiter vorn
+SOLD_ORDER = [
+    "Projekt-Nr.","Serviceprodukt","Verantwortlich","Projektname",
+    "Phase","Ampel","Gateway","Gateway-Info",
+    "Kunde","Standort"
+]
+
+
+def _render_sold(gw_sold: Optional[dict]):
+    df_gw_sold = decode_overview("sold", gw_sold, SOLD_ORDER)
+    if df_gw_sold is not None:
+        st.subheader("💸Projekte in Sold Phase")
+        _show_table(df_gw_sold)
     else:
         st.error("API-Fehler oder keine Verbindung beim Gateway-Datenabruf.")
 
-    # Gateway-Daten anzeigen
-    gw = fetch_gateway_infosystem(projektleiter)
-    if gw and gw.get("success"):
-        df_gw = pd.DataFrame(gw["result_data"]["table"])
-        df_gw.rename(columns={
-            "tprojekt^nummer": "Projekt-Nr.",
-            "tserprod^nummer": "Serviceprodukt",
-            "tprojektname^name": "Projektname",
-            "tprjphase^name": "Phase",
-            "ytaktgw": "Gateway",
-            "ygwinfo": "Gateway-Info",
-            "ytprjampel": "Ampel",
-            "ytkundeans^name": "Kunde",
-            "ytstandortans^name": "Standort",
-            "ytprjverantw^such": "Verantwortlich"
-        }, inplace=True)
-        order_gw = [
-            "Projekt-Nr.","Serviceprodukt","Projektname",
-            "Phase","Ampel","Gateway","Gateway-Info",
-            "Kunde","Standort","Verantwortlich"
-        ]
-        df_gw = df_gw[[c for c in order_gw if c in df_gw.columns]]
+
+def _render_gateway(gw: Optional[dict]):
+    df_gw = decode_overview("gateway", gw)
+    if df_gw is not None:
         st.subheader("🔴 Projekte mit roter Ampel")
-        st.dataframe(df_gw[df_gw["Ampel"]=="icon:ball_red"], use_container_width=True)
+        _show_table(df_gw[df_gw["Ampel"]=="icon:ball_red"])
         st.subheader("🔵 Projekte mit blauer Ampel")
-        st.dataframe(df_gw[df_gw["Ampel"]=="icon:ball_blue"], use_container_width=True)
+        _show_table(df_gw[df_gw["Ampel"]=="icon:ball_blue"])
     else:
         st.error("API-Fehler oder keine Verbindung beim Gateway-Datenabruf.")
 
-    # Dispatch-Daten anzeigen
-    disp = fetch_dispatch_infosystem(projektleiter)
-    if disp and disp.get("success"):
-        df_disp = pd.DataFrame(disp["result_data"]["table"])
-        df_disp.rename(columns={
-            "ytprojekt^nummer": "Projekt-Nr.",
-            "ytserprod^nummer": "Serviceprodukt",
-            "ytserprodname^name": "Systemtyp",
-            "ytwarenempfname^name": "Empfänger",
-            "ytdispatch": "Dispatch"
-        }, inplace=True)
-        order_disp = ["Dispatch","Projekt-Nr.","Serviceprodukt","Systemtyp","Empfänger"]
-        df_disp = df_disp[[c for c in order_disp if c in df_disp.columns]]
+
+def _render_dispatch(disp: Optional[dict]):
+    df_disp = decode_overview("dispatch", disp)
+    if df_disp is not None:
         st.subheader("📦 Dispatch-Übersicht nächste 10 Tage")
-        st.dataframe(df_disp, use_container_width=True)
+        _show_table(df_disp)
     else:
         st.info("Dispatch-Daten konnten nicht geladen werden.")
 
-    #Aufgaben anzeigen
-    tasks = fetch_open_tasks(projektleiter)
-    if tasks and tasks.get("success"):
-        df_t = pd.DataFrame(tasks["result_data"]["table"])
-        df_t.rename(columns={
-            "taufgabe^nummer" : "Nummer",
-            "taufgabenname^namebspr": "Titel",
-            "tbestaetigername^namebspr": "von",
-            "taufgabe^projekt^nummer": "Projektnummer",
-            "taufgabe^yprojektname^namebspr": "Projektname",
-            "taufgabe^start": "Startdatum",
-            "taufgabe^end": "Enddatum",
-            "taufgabenname^namebspr": "Aufgabenbeschreibung"
-        }, inplace=True)
-        order_t = ["Nummer","Titel","von","Projektnummer","Projektname","Startdatum","Enddatum","Aufgabenbeschreibung"]
-        df_t = df_t[[c for c in order_t if c in df_t.columns]]
+
+def _render_tasks(tasks: Optional[dict]):
+    df_t = decode_overview("tasks", tasks)
+    if df_t is not None:
         st.subheader("☑️ Aktive Abas-Aufgaben")
-        st.dataframe(df_t, use_container_width=True)
+        _show_table(df_t)
     else:
         st.info("Aufgaben konnten nicht geladen werden.")
 
-    #Überbuchte Projekte Anzeigen
-    overbooked_projects = fetch_overbooked_projects(projektleiter)
-    if overbooked_projects and overbooked_projects.get("success"):
-        df_overbooked_projects = pd.DataFrame(overbooked_projects["result_data"]["table"])
-        df_overbooked_projects.rename(columns={
-            "ytprojekt^nummer": "Projektnummer",
-            "ytprojname^namebspr": "Projektname",
-            "ytfortistbudget": "Buchung in Prozent des Budgets (%)",
-            "ytsollstd": "Budget",
-            "ytiststd": "Gebucht"
-        }, inplace=True)
-        order_overbooked_projects= ["Projektnummer","Buchung in Prozent des Budgets (%)","Projektname","Budget","Gebucht"]
-        df_overbooked_projects = df_overbooked_projects[[c for c in order_overbooked_projects if c in df_overbooked_projects.columns]]
-        st.subheader("☠️ Überbuchte Projekte")
-        # make sure the column is numeric once, up-front
-        df_overbooked_projects["Buchung in Prozent des Budgets (%)"] = (
-            pd.to_numeric(df_overbooked_projects["Buchung in Prozent des Budgets (%)"],
-                        errors="coerce")
-        )
 
+def _render_overbooked(overbooked_projects: Optional[dict]):
+    df_overbooked_projects = decode_overview("overbooked", overbooked_projects)
+    if df_overbooked_projects is not None:
+        st.subheader("☠️ Überbuchte Projekte")
         over_100 = df_overbooked_projects[
             df_overbooked_projects["Buchung in Prozent des Budgets (%)"] > 100
         ]
-
-        st.dataframe(over_100, use_container_width=True)
+        _show_table(over_100)
     else:
         st.info("Überbuchte Projekte konnten nicht geladen werden.")
 
 
-    #Gebuchte Stunden anzeigen
-    booked = fetch_booked_hours(projektleiter)
-    if booked and booked.get("success"):
-        df_b = pd.DataFrame(booked["result_data"]["table"])
-        df_b.rename(columns={
-            "yadatum": "Datum",
-            "ystdtats": "Stundenzahl",
-            "ytprojekt^nummer": "Projekt-Nr.",
-            "ytprojekt^namebspr": "Leistungsmeldung"
-        }, inplace=True)
-        order_b = ["Datum","Stundenzahl","Projekt-Nr.","Leistungsmeldung"]
-        df_b = df_b[[c for c in order_b if c in df_b.columns]]
+def _render_booked(booked: Optional[dict]):
+    df_b = decode_overview("booked", booked)
+    if df_b is not None:
         st.subheader("⏱️ Gebuchte Stunden (letzte 3 Tage)")
-        st.dataframe(df_b, use_container_width=True)
+        _show_table(df_b)
     else:
         st.info("Stundendaten konnten nicht geladen werden.")
 
+
+# Anzeige-Reihenfolge der Übersicht: Schlüssel → (Titel beim Laden, Renderer)
+OVERVIEW_SECTIONS = {
+    "sold":       ("Projekte in Sold Phase",          _render_sold),
+    "gateway":    ("Projekte mit roter/blauer Ampel", _render_gateway),
+    "dispatch":   ("Dispatch-Übersicht",              _render_dispatch),
+    "tasks":      ("Aktive Abas-Aufgaben",            _render_tasks),
+    "overbooked": ("Überbuchte Projekte",             _render_overbooked),
+    "booked":     ("Gebuchte Stunden",                _render_booked),
+}
+
+
+def page_overview(projektleiter: str, settings: dict):
+    st.title("PJM OVERVIEW")
+    projektleiter = st.session_state.get("projektleiter")
+    if not projektleiter:
+        st.warning("Bitte ein Projektleiter-Kürzel eingeben.")
+        return
+
+    # feste Plätze in Anzeige-Reihenfolge; gefüllt wird, sobald Daten da sind
+    slots = {}
+    for key, (title, _) in OVERVIEW_SECTIONS.items():
+        slots[key] = st.empty()
+        slots[key].caption(f"⏳ {title} wird geladen …")
+
+    for key, result, errors, elapsed in iter_overview_data(projektleiter):
+        title, render = OVERVIEW_SECTIONS[key]
+        with slots[key].container():
+            for msg in errors:
+                st.error(msg)
+            if isinstance(result, dict) and result.get("_stale_since"):
+                st.warning(f"⚠️ veraltet seit {result['_stale_since']} – ABAS antwortet nicht")
+            render(result)
+            st.caption(f"{title}: {elapsed:.2f} s")
+@st.fragment
+def plan_editor(project: str, df_view: pd.DataFrame, settings: dict):
+    """
+    Editor, Werktag-Korrektur, Gantt und Anlage-Button als eigenständig
+    rerunnende Einheit: ein Zell-Edit führt nur dieses Fragment erneut aus,
+    nicht die ganze Seite samt Stunden- und Terminberechnung.
+    """
+    # Editor
+    cfg = {
+        "Abteilung": cc.SelectboxColumn(
+            "Abteilung",
+            options= ALL_DEPTS,      # Dropdown-Einträge
+            required=True,             # darf nicht leer bleiben
+            help="Zuständige Abteilung auswählen",
+        ),
+        "Start": cc.DatetimeColumn("Start", format="DD.MM.YYYY"),
+        "Ende": cc.DatetimeColumn("Ende", format="DD.MM.YYYY"),
+    }
+    
+    edited_view = st.data_editor(
+        df_view,
+        column_config=cfg,
+        num_rows="dynamic",      # Zeilen hinzufügen/entfernen
+        hide_index=True,
+        use_container_width=True,
+        key="task_editor",
+    )
+
+    # Vollständiges DataFrame zum Weiter-Verarbeiten
+    edited = edited_view.copy()
+    cal = business_calendar()
+    for col, direction in (("Start", "forward"), ("Ende", "backward")):
+        edited[col] = cal.roll(                                          # Werktag-Fix, ganze Spalte
+            pd.to_datetime(edited[col], errors="coerce", dayfirst=True),  # → Timestamps / NaT
+            how=direction,
+        )
+    edited["Leistungsart"] = edited["Abteilung"].apply(map_leistungsart)
+
+
+    # Gantt zeichnen
+    # Meilensteine (bereits als date-Objekte geparst)
+    ms = st.session_state["milestones"]
+    milestones = {
+        "Ende Kick-Off":   ms["G6"],
+        "Ende Design":     ms["G7"],
+        "Ende Produktion": ms["G8"],
+    }
+    tasks = tuple(edited[["Abteilung", "Start", "Ende"]]
+                  .dropna().itertuples(index=False, name=None))
+    if tasks:
+        st.image(render_gantt_png(tasks, tuple(milestones.items())),
+                 use_container_width=True)
+
+    # Hinweise zu zusätzlichen Aufgaben
+    st.info("Es wird noch automatisch eine zusätzliche Support-Aufgabe angelegt.") 
+    if settings["doppelte_bildgebungsaufgabe"] == True and "BILDGEBUNG" in edited["Abteilung"].values:
+        st.info("Es wird noch automatisch eine zusätzliche Aufgabe für die Bildgebungsünterstützung in der MCAD angelegt.")
+    if settings["mcad_ecad_freigabeaufgabe"] == True and "MCAD" in edited["Abteilung"].values:
+        st.info("Es wird noch automatisch eine zusätzliche MCAD - Freigabe Aufgabe angelegt.")
+    if settings["mcad_ecad_freigabeaufgabe"] == True and "ECAD" in edited["Abteilung"].values:
+        st.info("Es wird noch automatisch eine zusätzliche ECAD - Freigabe Aufgabe angelegt.")  
+    
+
+
+    # Button für die Erstellung der Aufgaben
+    journal = CreateJournal(project)
+    if journal.done_count():
+        st.caption(
+            f"Journal: {journal.done_count()} Aufgaben für {project} bereits "
+            "angelegt – sie werden beim nächsten Lauf übersprungen."
+        )
+        if st.button("Journal verwerfen"):
+            journal.clear()
+
+    if st.button("Aufgaben anlegen"):
+        missing = missing_milestones(edited, settings, ms)
+        if missing:
+            st.error(f"Meilenstein {', '.join(missing)} fehlt in ABAS – "
+                     "Aufgaben können nicht angelegt werden.")
+            return
+        jobs = build_create_jobs(project, edited, settings,
+                                 st.session_state["projektleiter"], ms)
+        pending = [j for j in jobs if not journal.is_done(j.key)]
+        status = {j.key: [j.label, "✅ bereits angelegt" if journal.is_done(j.key)
+                          else "⏳ wartet", ""] for j in jobs}
+
+        with st.status(f"Lege {len(pending)} von {len(jobs)} Aufgaben an …",
+                       expanded=True) as box:
+            table = st.empty()
+
+            def _show():
+                table.dataframe(
+                    pd.DataFrame(list(status.values()), columns=["Aufgabe", "Status", "Meldung"]),
+                    hide_index=True, use_container_width=True,
+                )
+
+            def _on_done(job: CreateJob, ok: bool, message: str):
+                status[job.key][1:] = ["✅ angelegt" if ok else "❌ fehlgeschlagen", message]
+                _show()
+
+            _show()
+            results = run_create_jobs(
+                pending,
+                max_workers=int(settings.get("create_concurrency", 4)),
+                journal=journal,
+                on_done=_on_done,
+            )
+            failed = [k for k, (ok, _) in results.items() if not ok]
+            box.update(
+                label=(f"{len(failed)} von {len(pending)} Aufgaben fehlgeschlagen"
+                       if failed else "Alle Aufgaben angelegt"),
+                state="error" if failed else "complete",
+            )
+
+        if failed:
+            st.error(
+                f"{len(failed)} Aufgaben konnten nicht angelegt werden. "
+                "Erneut „Aufgaben anlegen“ klicken setzt den Lauf fort – "
+                "bereits angelegte Aufgaben werden nicht doppelt erzeugt."
+            )
+        else:
+            st.success("Aufgaben erfolgreich angelegt.")
+
+
 # Seite zum Erstelllen eines neuen Projektplans
 def page_task_creator(projektleiter: str, settings: dict):
     st.title("📋 Projektplan anlegen")
@@ -750,26 +450,27 @@ def page_task_creator(projektleiter: str, settings: dict):
     if not projektleiter:
         st.warning("Bitte ein Projektleiter-Kürzel eingeben.")
         return
-    project = st.text_input("Projekt‑Nr.")
+    col_project, col_reload = st.columns([4, 1], vertical_alignment="bottom")
+    with col_project:
+        project = st.text_input("Projekt‑Nr.")
+    with col_reload:
+        reload = st.button("🔄 Neu aus ABAS laden", disabled=not project)
     if project:
-        # Get the gateway number, gateway ID and calculation number from the project number 
-        # Gateway-Infos holen (+ Guard)
-        gw_info = get_gateway_info(project)
-        if gw_info is None:          # None ⇒ Fehler schon in Funktion gemeldet
+        # Gateway-Kopf, Termine und Kalkulation – nur einmal pro Projekt laden
+        project_data = load_project_data(project, reload=reload)
+        if project_data is None:     # None ⇒ Fehler schon in Funktion gemeldet
              st.warning(
                  "Für dieses Projekt konnten keine Gateway-Informationen "
                  "ermittelt werden. Bitte Projekt-Nr. prüfen oder Daten nachtragen."
              )
              st.stop()                # bricht den Streamlit-Run sauber ab
- 
-        calculation_number = gw_info.calculation_number
-        gateway_id         = gw_info.gateway_id
-        gateway_number     = gw_info.gateway_number
-        gateway_data = fetch_gateway_data(gateway_id)
-        
+
+        st.caption(f"Stand ABAS: {datetime.fromtimestamp(project_data.fetched_at):%d.%m.%Y %H:%M}"
+                   " – ältere Stände werden im Hintergrund aktualisiert")
+
         # Meilensteine nur für diese Session speichern
-        end_dates, milestones = get_phase_end_dates(gateway_data)
-        st.session_state["milestones"] = milestones
+        end_dates = project_data.end_dates
+        st.session_state["milestones"] = project_data.milestones
 
         
 
@@ -787,8 +488,7 @@ def page_task_creator(projektleiter: str, settings: dict):
 
 
         # Get the calculation hours for this project
-        calc_hours = fetch_calculation_hours(calculation_number)
-        departement_hours = extract_department_hours(calc_hours)
+        departement_hours = extract_department_hours(project_data.calc_hours)
         st.write("**Kalkulationsstunden:**")
         # Create a DataFrame from the dictionary        
         df_hours = pd.DataFrame.from_dict(departement_hours, orient='index', columns=['Stunden'])
@@ -811,8 +511,6 @@ def page_task_creator(projektleiter: str, settings: dict):
                 icon="⚠️"
             )
 
-        print(df_hours)
-        
         st.write("**Projektplan:**")
 
 
@@ -827,10 +525,12 @@ def page_task_creator(projektleiter: str, settings: dict):
         # ab hier wie gehabt: Start/Ende einsetzen, Spalten abbilden, Editor usw.
         df_active.reset_index(drop=True, inplace=True)
 
-        df_active[["Start", "Ende"]] = (
-            df_active["Abteilung"]
-            .apply(lambda d: pd.Series(default_interval(d, st.session_state["milestones"])))
-        )
+        # alle Abteilungen in einem Durchlauf durch die kompilierten Regeln
+        df_active[["Start", "Ende"]] = date_rules().frame(
+            df_active["Abteilung"].tolist(),
+            st.session_state["milestones"],
+            calendar=business_calendar(),
+        ).to_numpy()
         task_names = st.session_state["cfg"]["task_names"]
         df_active["Aufgabe"] = df_active["Abteilung"].map(task_names)
 
@@ -841,182 +541,247 @@ def page_task_creator(projektleiter: str, settings: dict):
         df_active.reset_index(drop=True, inplace=True)
         df_active[["Start", "Ende"]] = df_active[["Start", "Ende"]].apply(pd.to_datetime)
 
+        # Editor + Gantt laufen als Fragment – Edits rerunnen nur diesen Teil
+        plan_editor(project, df_view, settings)
 
-        
-        # Editor
-        cfg = {
-            "Abteilung": cc.SelectboxColumn(
-                "Abteilung",
-                options= ALL_DEPTS,      # Dropdown-Einträge
-                required=True,             # darf nicht leer bleiben
-                help="Zuständige Abteilung auswählen",
-            ),
-            "Start": cc.DatetimeColumn("Start", format="DD.MM.YYYY"),
-            "Ende": cc.DatetimeColumn("Ende", format="DD.MM.YYYY"),
-        }
-        
-        edited_view = st.data_editor(
-            df_view,
-            column_config=cfg,
-            num_rows="dynamic",      # Zeilen hinzufügen/entfernen
-            hide_index=True,
-            use_container_width=True,
-            key="task_editor",
-        )
+    else:
+        st.warning("Keine Daten  gefunden.")
 
-        # Vollständiges DataFrame zum Weiter-Verarbeiten
-        edited = edited_view.copy()
-        for col, direction in (("Start", "forward"), ("Ende", "backward")):
-            edited[col] = (
-                pd.to_datetime(edited[col], errors="coerce", dayfirst=True)  # → Timestamps / NaT
-                .apply(lambda ts: roll_to_business_day(ts, how=direction))   # Werktag-Fix
-            )
-        edited["Leistungsart"] = edited["Abteilung"].apply(map_leistungsart)
+# ---------------------------------------------------------------------------
+# PORTFOLIO – Projektpläne für viele Projekte auf einmal
+# ---------------------------------------------------------------------------
+def load_portfolio_data(projects: List[str],
+                        *,
+                        on_done: Optional[Callable[[str, bool], None]] = None,
+                        ) -> Tuple[Dict[str, ProjectData], Dict[str, List[str]]]:
+    """`pjm.load_projects` mit der Session als Zwischenspeicher."""
+    return pjm.load_projects(
+        projects,
+        memo=st.session_state.setdefault("project_data", {}),
+        on_done=on_done,
+    )
 
+def page_portfolio(projektleiter: str, settings: dict):
+    st.title("🗂️ Portfolio-Planung")
+    projektleiter = st.session_state.get("projektleiter")
+    if not projektleiter:
+        st.warning("Bitte ein Projektleiter-Kürzel eingeben.")
+        return
 
-        # Gantt zeichnen
-        # Meilensteine (bereits als date-Objekte geparst)
-        ms = st.session_state["milestones"]
-        milestones = {
-            "Ende Kick-Off":   ms["G6"],
-            "Ende Design":     ms["G7"],
-            "Ende Produktion": ms["G8"],
+    col_text, col_file = st.columns(2)
+    with col_text:
+        text = st.text_area("Projekt-Nummern (eine pro Zeile oder durch Komma getrennt)",
+                            height=150)
+    with col_file:
+        upload = st.file_uploader("… oder CSV mit Projekt-Nummern", type=["csv", "txt"])
+
+    projects = parse_project_numbers(text)
+    if upload is not None:
+        projects = list(dict.fromkeys(projects + read_project_csv(upload.getvalue())))
+
+    if st.button(f"{len(projects)} Projekte laden", disabled=not projects):
+        progress = st.progress(0.0, text="Lade Projektdaten …")
+        done = []
+
+        def _tick(project: str, ok: bool):
+            done.append(project)
+            progress.progress(len(done) / len(projects),
+                              text=f"{len(done)} / {len(projects)} Projekte geladen")
+
+        data, errors = load_portfolio_data(projects, on_done=_tick)
+        progress.empty()
+        st.session_state["portfolio"] = {
+            "data": data, "errors": errors, "plan": build_portfolio_plan(data),
         }
-        fig = plot_gantt(edited, milestones)
-        st.pyplot(fig, use_container_width=True)
-
-        # Hinweise zu zusätzlichen Aufgaben
-        st.info("Es wird noch automatisch eine zusätzliche Support-Aufgabe angelegt.") 
-        if settings["doppelte_bildgebungsaufgabe"] == True and "BILDGEBUNG" in edited["Abteilung"].values:
-            st.info("Es wird noch automatisch eine zusätzliche Aufgabe für die Bildgebungsünterstützung in der MCAD angelegt.")
-        if settings["mcad_ecad_freigabeaufgabe"] == True and "MCAD" in edited["Abteilung"].values:
-            st.info("Es wird noch automatisch eine zusätzliche MCAD - Freigabe Aufgabe angelegt.")
-        if settings["mcad_ecad_freigabeaufgabe"] == True and "ECAD" in edited["Abteilung"].values:
-            st.info("Es wird noch automatisch eine zusätzliche ECAD - Freigabe Aufgabe angelegt.")  
-        
 
+    portfolio = st.session_state.get("portfolio")
+    if not portfolio:
+        return
 
-        # Button für die Erstellung der Aufgaben
-        if st.button("Aufgaben anlegen"):
-            # Aufgaben für alle Abteilungen anlegen
-            for _, row in edited.sort_values("Start").iterrows():
-
-                if row["Abteilung"] == "PROJECTMANAGEMENT":
-                    # Aufgabe für Projektleiter anlegen
-                    create_project_task_for_person(
-                        project,
-                        st.session_state["projektleiter"],
-                        row["Leistungsart"],
-                        row["Aufgabe"],
-                        row["Stunden"],
-                        row["Start"].strftime("%d.%m.%Y"),
-                        row["Ende"].strftime("%d.%m.%Y"),
-                    )
-                elif row["Abteilung"] == "BILDGEBUNG":
-                    # Hauptbildgebungsaufgabe anlegen
-                    create_project_task_for_department(
-                        project,
-                        row["Abteilung"],
-                        row["Leistungsart"],   
-                        row["Aufgabe"],
-                        row["Stunden"],
-                        row["Start"].strftime("%d.%m.%Y"),
-                        row["Ende"].strftime("%d.%m.%Y"),
-                    )
-                    if settings["doppelte_bildgebungsaufgabe"] == True:
-                    # Bildgebung MCAD/ECAD unterstützung anlegen
-                        imaging_support_start = roll_to_business_day(row["Ende"] + timedelta(days=1))
-                        imaging_support_end = roll_to_business_day(imaging_support_start + timedelta(days=14), how="backward")
-                        create_project_task_for_department(
-                            project,
-                            row["Abteilung"],
-                            "BILDGEBUNG",
-                            "Bildgebung - MCAD/ECAD Unterstützung",
-                            row["Stunden"],
-                            imaging_support_start .strftime("%d.%m.%Y"),
-                            imaging_support_end.strftime("%d.%m.%Y"),
-                        )
-                        
-                elif row["Abteilung"] == "IPC":
-                    # Hauptbildgebungsaufgabe anlegen
-                    create_project_task_for_person(
-                        project,
-                        "RH",
-                        row["Leistungsart"],
-                        row["Aufgabe"],
-                        row["Stunden"],
-                        row["Start"].strftime("%d.%m.%Y"),
-                        row["Ende"].strftime("%d.%m.%Y"),
-                    )
-
-                else:
-                    create_project_task_for_department(
-                        project,
-                        row["Abteilung"],
-                        row["Leistungsart"],   
-                        row["Aufgabe"],
-                        row["Stunden"],
-                        row["Start"].strftime("%d.%m.%Y"),
-                        row["Ende"].strftime("%d.%m.%Y"),
-                    )
-
-            if settings["mcad_ecad_freigabeaufgabe"] == True:
-            # Freigabe-Task anlegen MCAD
-                if "MCAD" in edited["Abteilung"].values:
-                    create_project_task_for_department(
-                        project,
-                        "MCAD",
-                        "MCAD",
-                        "MCAD - Interne Freigabe",
-                        0,
-                        ms["G7"].strftime("%d.%m.%Y"),
-                        ms["G7"].strftime("%d.%m.%Y"),
-                    )
-                      
-                if "ECAD" in edited["Abteilung"].values:
-                    create_project_task_for_department(
-                        project,
-                        "ECAD",
-                        row["Leistungsart"],   
-                        "ECAD - Interne Freigabe",
-                        0,
-                        ms["G7"].strftime("%d.%m.%Y"),
-                        ms["G7"].strftime("%d.%m.%Y"),
-                    ) 
-                             
-            # Meilenstein DISPATCH anlegen
-            create_dispatch_milestone(
-                project,
-                st.session_state["projektleiter"],
-                ms["G8"].strftime("%d.%m.%Y"),
-                ms["G8"].strftime("%d.%m.%Y")
+    for project, msgs in portfolio["errors"].items():
+        st.error(f"{project}: " + "; ".join(msgs))
+    data: Dict[str, ProjectData] = portfolio["data"]
+    if not data:
+        return
+
+    st.dataframe(
+        pd.DataFrame([{"Projekt": p, "Kick-Off": d.end_dates.get("G6"),
+                       "Design": d.end_dates.get("G7"),
+                       "Produktion": d.end_dates.get("G8")}
+                      for p, d in data.items()]),
+        hide_index=True, use_container_width=True,
+    )
+
+    st.write("**Projektpläne:**")
+    edited = st.data_editor(
+        portfolio["plan"],
+        column_config={
+            "Projekt": cc.SelectboxColumn("Projekt", options=list(data), required=True),
+            "Abteilung": cc.SelectboxColumn("Abteilung", options=ALL_DEPTS, required=True),
+            "Start": cc.DatetimeColumn("Start", format="DD.MM.YYYY"),
+            "Ende": cc.DatetimeColumn("Ende", format="DD.MM.YYYY"),
+        },
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        key="portfolio_editor",
+    ).copy()
+    cal = business_calendar()
+    for col, direction in (("Start", "forward"), ("Ende", "backward")):
+        edited[col] = cal.roll(pd.to_datetime(edited[col], errors="coerce"), how=direction)
+    edited["Leistungsart"] = edited["Abteilung"].apply(map_leistungsart)
+
+    incomplete = edited[["Start", "Ende"]].isna().any(axis=1)
+    if incomplete.any():
+        st.warning(f"{int(incomplete.sum())} Zeilen ohne Start/Ende werden nicht angelegt.")
+        edited = edited[~incomplete]
+
+    journals = {p: CreateJournal(p) for p in data}
+    if st.button("Alle Aufgaben anlegen"):
+        jobs: List[CreateJob] = []
+        skipped: Dict[str, str] = {}
+        for project, plan in edited.groupby("Projekt", sort=False):
+            if project not in data:
+                continue
+            missing = missing_milestones(plan, settings, data[project].milestones)
+            if missing:                  # nur dieses Projekt auslassen
+                skipped[project] = f"übersprungen: Meilenstein {', '.join(missing)} fehlt"
+                continue
+            jobs += build_create_jobs(project, plan, settings, projektleiter,
+                                      data[project].milestones)
+        pending = [j for j in jobs if not journals[j.project].is_done(j.key)]
+
+        progress = {p: {"Projekt": p, "Aufgaben": 0, "angelegt": 0,
+                        "fehlgeschlagen": 0, "Meldung": skipped.get(p, "")}
+                    for p in data}
+        for job in jobs:
+            progress[job.project]["Aufgaben"] += 1
+            if journals[job.project].is_done(job.key):
+                progress[job.project]["angelegt"] += 1
+
+        with st.status(f"Lege {len(pending)} von {len(jobs)} Aufgaben für "
+                       f"{len(data)} Projekte an …", expanded=True) as box:
+            table = st.empty()
+
+            def _show():
+                table.dataframe(pd.DataFrame(list(progress.values())),
+                                hide_index=True, use_container_width=True)
+
+            def _on_done(job: CreateJob, ok: bool, message: str):
+                row = progress[job.project]
+                row["angelegt" if ok else "fehlgeschlagen"] += 1
+                if message:
+                    row["Meldung"] = message
+                _show()
+
+            _show()
+            results = run_create_jobs(
+                pending,
+                max_workers=int(settings.get("create_concurrency", 4)),
+                journals=journals,
+                on_done=_on_done,
             )
-            # Support-Aufgabe anlegen
-
-            start_date = ms["G8"]                     # datetime.date-Objekt
-            end_date   = start_date + timedelta(days=365)  # +1 Jahr
-
-            create_project_task_for_department(
-                project,
-                "INTRAVIS",
-                "SONSTIGE",
-                "Support",
-                0,
-                start_date.strftime("%d.%m.%Y"),
-                end_date.strftime("%d.%m.%Y")
+            failed = [k for k, (ok, _) in results.items() if not ok]
+            box.update(
+                label=(f"{len(failed)} von {len(pending)} Aufgaben fehlgeschlagen"
+                       if failed else "Alle Aufgaben angelegt"),
+                state="error" if failed else "complete",
             )
+        if failed:
+            st.error(
+                f"{len(failed)} Aufgaben konnten nicht angelegt werden. Erneut "
+                "„Alle Aufgaben anlegen“ klicken setzt den Lauf fort."
+            )
+        else:
+            st.success("Aufgaben für alle Projekte angelegt.")
 
-        
 
-            st.success("Aufgaben erfolgreich angelegt.")
+# ---------------------------------------------------------------------------
+# KAPAZITÄT – Auslastung der Abteilungen über alle offenen Projekte
+# ---------------------------------------------------------------------------
+CAPACITY_SOURCES = ("Alle Projekte in Sold Phase", "Projekte des Projektleiters",
+                    "Aus Portfolio-Planung")
+
 
-            
+def _capacity_projects(source: str, projektleiter: str) -> List[str]:
+    """Projekt-Nummern der gewählten Quelle (Gateway-Dashboard)."""
+    if source == CAPACITY_SOURCES[0]:
+        df = decode_overview("sold", pjm.fetch_gateway_infosystem_sold_phase())
     else:
-        st.warning("Keine Daten  gefunden.")
+        df = decode_overview("gateway", pjm.fetch_gateway_infosystem(projektleiter))
+    if df is None or "Projekt-Nr." not in df:
+        return []
+    return list(dict.fromkeys(df["Projekt-Nr."].dropna().astype(str).str.strip()))
+
+
+def page_capacity(projektleiter: str, settings: dict):
+    st.title("📈 Kapazität je Abteilung")
+    source = st.radio("Projekte", CAPACITY_SOURCES, horizontal=True)
+
+    if source == CAPACITY_SOURCES[2]:
+        portfolio = st.session_state.get("portfolio")
+        if not portfolio:
+            st.info("Noch keine Projekte in der Portfolio-Planung geladen.")
+            return
+        st.session_state["capacity"] = {"source": source, "plan": portfolio["plan"],
+                                        "errors": {}}
+    elif source == CAPACITY_SOURCES[1] and not projektleiter:
+        st.warning("Bitte ein Projektleiter-Kürzel eingeben.")
+        return
+    elif st.button("Projekte laden und Auslastung berechnen"):
+        with st.spinner("Lade Projektliste …"):
+            projects = _capacity_projects(source, projektleiter)
+        if not projects:
+            st.warning("Keine Projekte gefunden.")
+            return
+        progress = st.progress(0.0, text="Lade Projektdaten …")
+        done = []
+
+        def _tick(project: str, ok: bool):
+            done.append(project)
+            progress.progress(len(done) / len(projects),
+                              text=f"{len(done)} / {len(projects)} Projekte geladen")
+
+        data, errors = load_portfolio_data(projects, on_done=_tick)
+        progress.empty()
+        st.session_state["capacity"] = {"source": source,
+                                        "plan": build_portfolio_plan(data),
+                                        "errors": errors}
+
+    capacity = st.session_state.get("capacity")
+    if not capacity or capacity["source"] != source:
+        return
+    if capacity["errors"]:
+        with st.expander(f"{len(capacity['errors'])} Projekte ohne Daten"):
+            for project, msgs in capacity["errors"].items():
+                st.write(f"{project}: " + "; ".join(msgs))
+
+    col_by, col_limit = st.columns(2)
+    by = col_by.radio("Gruppieren nach", pjm.CAPACITY_GROUPS, horizontal=True)
+    limit = col_limit.number_input("Markieren ab (Stunden je Woche, 0 = aus)",
+                                   min_value=0.0, value=0.0, step=10.0)
+
+    load = pjm.capacity_by_week(capacity["plan"], by=by)
+    if load.empty:
+        st.warning("Keine geplanten Stunden mit gültigen Terminen.")
+        return
+    if load.attrs.get("skipped"):
+        st.caption(f"{load.attrs['skipped']} Aufgaben ohne Werktag im Zeitraum "
+                   "wurden nicht berücksichtigt.")
+    st.image(render_capacity_png(load, float(limit)))
+
+    table = load.round(1)
+    table.columns = _week_labels(load.columns)
+    st.dataframe(table, use_container_width=True)
 
 
-def page_settings(settings: dict):
+def page_settings(snapshot: SettingsSnapshot):
     st.title("⚙️ Einstellungen")
+    # Formular und Version stammen aus demselben Snapshot: gespeichert wird
+    # genau der Stand, der in diesem Lauf angezeigt wurde. Hat zwischen
+    # Anzeige und Schreiben ein anderer Prozess gespeichert, schlägt das
+    # Speichern fehl statt dessen Änderung zu überschreiben.
+    settings, version = snapshot.to_dict(), snapshot.version
 
     # 1. einfache Flags
     settings["doppelte_bildgebungsaufgabe"] = st.checkbox(
@@ -1051,6 +816,8 @@ def page_settings(settings: dict):
     edited_dr = st.data_editor(
         dr_df, hide_index=True, num_rows="dynamic",
         column_config={
+            "StartAnchor": st.column_config.SelectboxColumn("StartAnchor", options=ANCHORS),
+            "EndAnchor":   st.column_config.SelectboxColumn("EndAnchor",   options=ANCHORS),
             "StartOff": st.column_config.NumberColumn("StartOff", step=1),
             "EndOff":   st.column_config.NumberColumn("EndOff",   step=1),
         }
@@ -1062,11 +829,127 @@ def page_settings(settings: dict):
     }
     st.write("G6: Kick-Off / G7: Design / G8: Produktion")
 
+    # Firmenfeiertage für alle Werktagsberechnungen
+    st.subheader("Feiertage / Betriebsferien")
+    hol_text = st.text_area(
+        "Ein Datum pro Zeile (JJJJ-MM-TT)",
+        value="\n".join(settings.get("holidays", [])),
+    )
+    holidays = []
+    for line in hol_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            holidays.append(str(pd.Timestamp(line).date()))
+        except ValueError:
+            st.warning(f"Ungültiges Datum ignoriert: {line!r}")
+    settings["holidays"] = sorted(set(holidays))
+
+    # 4. HTTP-Verbindungspool (prozessweit, gilt für alle Sessions)
+    st.subheader("ABAS-Verbindung")
+    settings["http_pool_size"] = int(st.number_input(
+        "Verbindungen pro Host", min_value=1, max_value=100, step=1,
+        value=int(settings.get("http_pool_size", transport.DEFAULT_POOL_SIZE))
+    ))
+    settings["http_retries"] = int(st.number_input(
+        "Wiederholungen bei Verbindungsfehlern", min_value=0, max_value=10, step=1,
+        value=int(settings.get("http_retries", transport.DEFAULT_RETRIES))
+    ))
+    settings["max_in_flight"] = int(st.number_input(
+        "Gleichzeitige Requests ans ERP (alle Benutzer)", min_value=1, max_value=100,
+        step=1, value=int(settings.get("max_in_flight", transport.DEFAULT_MAX_IN_FLIGHT))
+    ))
+    settings["write_reserve"] = int(st.number_input(
+        "Davon für Aufgaben-Anlage reserviert", min_value=0, max_value=50, step=1,
+        value=int(settings.get("write_reserve", transport.DEFAULT_WRITE_RESERVE))
+    ))
+    settings["rate_limit"] = float(st.number_input(
+        "Requests pro Sekunde (0 = unbegrenzt)", min_value=0.0, max_value=1000.0,
+        step=1.0, value=float(settings.get("rate_limit", transport.DEFAULT_RATE))
+    ))
+    settings["breaker_threshold"] = int(st.number_input(
+        "Ausfälle bis zur Sperre eines Infosystems", min_value=1, max_value=20, step=1,
+        value=int(settings.get("breaker_threshold", transport.DEFAULT_BREAKER_THRESHOLD))
+    ))
+    settings["breaker_cooldown"] = float(st.number_input(
+        "Sekunden bis zum nächsten Verbindungstest", min_value=1.0, max_value=600.0,
+        step=5.0,
+        value=float(settings.get("breaker_cooldown", transport.DEFAULT_BREAKER_COOLDOWN))
+    ))
+    settings["stream_json"] = st.checkbox(
+        "Grosse Infosystem-Antworten streamend dekodieren",
+        value=bool(settings.get("stream_json", True)),
+        help=f"Spart Speicher bei tausenden Zeilen. Backend: {stream.backend()}",
+    )
+    with st.expander("Verbindungsstatistik"):
+        st.json(transport.pool_stats())
+        st.json(transport.governor_stats())
+        st.json(transport.breaker_stats())
+    with st.expander("Lese-Cache"):
+        st.json(transport.cache_stats())
+        if st.button("Cache leeren"):
+            transport.clear_cache()
+
     if st.button("Speichern"):
-        save_settings(settings)
-        st.success("Einstellungen gespeichert")
+        try:
+            compile_date_rules(settings["date_rules"])
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            try:
+                save_settings(settings, base_version=version)
+            except SettingsConflictError as e:
+                st.error(f"{e}. Die Seite zeigt jetzt den aktuellen Stand – "
+                         "Änderungen bitte erneut vornehmen.")
+            else:
+                st.success("Einstellungen gespeichert")
    
 
+def sidebar_metrics():
+    """Admin-Panel: Laufzeiten je Infosystem, Pool-, Breaker- und Cache-Statistik."""
+    with st.sidebar.expander("📊 ABAS-Metriken"):
+        rows = metrics.METRICS.snapshot()
+        if rows:
+            st.dataframe(
+                pd.DataFrame(rows)[["endpoint", "outcome", "calls", "p50_s",
+                                    "p95_s", "max_s", "avg_rows", "avg_response_kb",
+                                    "retries"]],
+                hide_index=True, use_container_width=True,
+            )
+        else:
+            st.caption("Noch keine Aufrufe gemessen.")
+        st.caption("Pool")
+        st.json(transport.pool_stats(), expanded=False)
+        st.caption("Warteschlange (Lesen/Schreiben)")
+        st.json(transport.governor_stats(), expanded=False)
+        st.caption("Zusammengelegte Requests")
+        st.json(transport.flight_stats(), expanded=False)
+        st.caption("Circuit Breaker")
+        st.json(transport.breaker_stats(), expanded=False)
+        st.caption("Lese-Cache")
+        st.json(transport.cache_stats(), expanded=False)
+        if st.button("Metriken zurücksetzen"):
+            metrics.METRICS.reset()
+
+
+@lru_cache(maxsize=4)
+def _session_cfg(settings: SettingsSnapshot) -> Mapping[str, Any]:
+    """
+    Session-Konfiguration je Snapshot einmal bauen (Regeln sind validiert).
+    Alle Sessions teilen sich das Ergebnis – deshalb schreibgeschützt.
+    """
+    return freeze({
+        "base_address": settings.get("base_address", DEFAULT_BASE_ADDRESS),
+        "task_names": dict(settings.get("task_names", TASK_NAMES)),
+        "holidays": tuple(settings.get("holidays", ())),
+        "store_revalidate_s": float(settings.get("store_revalidate_s", 3600)),
+        "date_rules": {
+            k: tuple(v) for k, v in settings.get("date_rules", DATE_RULES).items()
+        },
+    })
+
+
 # ---------------------------------------------------------------------------
 # MAIN – navigation wrapper
 # ---------------------------------------------------------------------------
@@ -1075,7 +958,8 @@ def main():
     st.sidebar.title("Navigation")
     page_choice = st.sidebar.radio(
         "Seite auswählen:",
-        ("PJM Overview", "Projektplan anlegen", "Einstellungen"),  # hier ergänzt
+        ("PJM Overview", "Projektplan anlegen", "Portfolio-Planung", "Kapazität",
+         "Einstellungen"),
         key="page_select"
     )
 
@@ -1085,25 +969,36 @@ def main():
     st.sidebar.text_input("Projektleiter-Kürzel:", key="projektleiter",
                           value=st.session_state["projektleiter"])
 
-    # Einstellungen laden
-    settings = load_settings()
-    if "cfg" not in st.session_state:          # einmal pro Session
-        st.session_state["cfg"] = {}
+    # Einstellungen: unveränderlicher Snapshot, neu gelesen und validiert
+    # nur, wenn sich settings.json geändert hat (auch durch andere Prozesse)
+    settings = pjm.current_settings()
+    for msg in settings.warnings:
+        st.warning(msg)
+    st.session_state["cfg"] = _session_cfg(settings)
 
-    cfg = st.session_state["cfg"]
-    cfg["base_address"] = settings.get(
-        "base_address", "http://intra-erp:4444/EPLAN_WS_FREE_EDP"
-    )
-    cfg["task_names"] = settings.get("task_names", TASK_NAMES).copy()
-    cfg["date_rules"] = {
-        k: tuple(v) for k, v in settings.get("date_rules", DATE_RULES).items()
-    }
+    # Verbindungspool (baut nur bei geänderten Werten neu), Cache,
+    # Drosselung und Breaker – prozessweit
+    pjm.configure_transport(settings)
+
+    # /metrics für Prometheus – einmal pro Prozess, Port 0 = aus,
+    # ohne `metrics_host` nur auf localhost
+    if settings.get("metrics_port"):
+        metrics.start_http_server(int(settings["metrics_port"]),
+                                  settings.get("metrics_host") or "127.0.0.1")
+    # Admin-Panel (inkl. Zurücksetzen der prozessweiten Metriken) nur per
+    # Einstellung – ein URL-Parameter ist keine Zugriffsprüfung
+    if settings.get("show_metrics"):
+        sidebar_metrics()
 
 
     if page_choice == "PJM Overview":
         page_overview(st.session_state["projektleiter"], settings)
     elif page_choice == "Projektplan anlegen":
         page_task_creator(st.session_state["projektleiter"], settings)
+    elif page_choice == "Portfolio-Planung":
+        page_portfolio(st.session_state["projektleiter"], settings)
+    elif page_choice == "Kapazität":
+        page_capacity(st.session_state["projektleiter"], settings)
     else:
         page_settings(settings)
 
@@ -0,0 +1,243 @@
+"""
+Lokaler Ersatz für den ABAS EDP-Webservice (intra-erp:4444/EPLAN_WS_FREE_EDP).
+
+Spricht dasselbe JSON-Protokoll wie `post_json` bzw. `AbasService._post`:
+``infosystem`` (GATEWAYDASHBOARD, DISPATCH, 10345, PRJMLM, PRJM5080LISTE,
+PRJMAUFAN), ``query`` (32:00, 41:00), ``read`` und ``create``. Latenz,
+Fehlerrate und Anzahl Ergebniszeilen sind konfigurierbar, global oder je
+Infosystem/Aktion.
+
+    python -m bench.abas_stub --port 4444 --latency-ms 300 --jitter-ms 100 \
+        --error-rate 0.02 --rows 200 --latency PRJM5080LISTE=2500
+
+Danach in settings.json ``"base_address": "http://localhost:4444/EPLAN_WS_FREE_EDP"``.
+"""
+import argparse
+import gzip
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+CALC_FIELDS = ["yprjmcad", "yprjauto", "yprjecad", "yprjbild",
+               "yprjas", "yprjpm", "yprjtd", "yprjsoft"]
+AMPELN = ["icon:ball_red", "icon:ball_blue", "icon:ball_green", "icon:ball_yellow"]
+PHASEN = ["Sold Phase", "Engineering", "Production", "Commissioning"]
+KUNDEN = ["Acme GmbH", "Globex AG", "Initech SE", "Umbrella KG", "Hooli Inc."]
+KUERZEL = ["AB", "CD", "EF", "GH", "XY"]
+DATE_FIELDS = {"ytdispatch", "yadatum", "taufgabe^start", "taufgabe^end", "ytenddate"}
+NUMBER_FIELDS = {"ystdtats", "ytfortistbudget", "ytsollstd", "ytiststd"}
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 200.0
+    jitter_ms: float = 50.0
+    error_rate: float = 0.0
+    rows: int = 50
+    # Überschreibungen je Infosystem / "query:41:00" / "read" / "create"
+    latency: Dict[str, float] = field(default_factory=dict)
+    rows_by: Dict[str, int] = field(default_factory=dict)
+    seed: int | None = None
+    gzip: bool = False                   # Antwort komprimieren, falls erlaubt
+
+
+def _endpoint(payload: dict) -> str:
+    action = payload.get("action", "")
+    if action == "infosystem":
+        return payload.get("infosystem", "")
+    if action == "query":
+        return f"query:{payload.get('database_and_group', '')}"
+    return action
+
+
+def _fmt(d: date) -> str:
+    return d.strftime("%d.%m.%Y")
+
+
+class _Generator:
+    """Erzeugt plausible Zeilen anhand der angefragten Feldnamen."""
+
+    def __init__(self, seed: int | None):
+        self.rnd = random.Random(seed)
+        self.ids = itertools.count(1)
+
+    def value(self, name: str, i: int) -> Any:
+        rnd = self.rnd
+        today = date.today()
+        if name in DATE_FIELDS:
+            return _fmt(today + timedelta(days=rnd.randint(-20, 60)))
+        if name in NUMBER_FIELDS:
+            return round(rnd.uniform(0, 160), 1)
+        if name == "ytprjampel":
+            return rnd.choice(AMPELN)
+        if name == "tprjphase^name":
+            return rnd.choice(PHASEN)
+        if name == "ytaktgw":
+            return f"G{rnd.randint(1, 8)}"
+        if name.endswith("projekt^nummer") or name == "tprojekt^nummer":
+            return f"P{24000 + i}"
+        if name.endswith("^such"):
+            return rnd.choice(KUERZEL)
+        if name.startswith("ytkunde") or name.startswith("ytwarenempf"):
+            return rnd.choice(KUNDEN)
+        if name.endswith("^nummer"):
+            return f"{name.split('^')[0][-6:].upper()}{1000 + i}"
+        return f"{name.split('^')[0]} {i}"
+
+    def table(self, fields: List[str], rows: int) -> List[Dict[str, Any]]:
+        return [{f: self.value(f, i) for f in fields} for i in range(rows)]
+
+
+def build_response(payload: dict, cfg: StubConfig, gen: _Generator) -> dict:
+    action = payload.get("action")
+    endpoint = _endpoint(payload)
+    rows = cfg.rows_by.get(endpoint, cfg.rows)
+
+    if action == "infosystem":
+        if payload.get("infosystem") == "PRJMAUFAN":
+            return {"success": True, "result_data": {"table": []}}
+        fields = payload.get("table_fields") or ["ytprojekt^nummer"]
+        return {"success": True, "result_data": {"table": gen.table(fields, rows)}}
+
+    if action == "query":
+        group = payload.get("database_and_group")
+        value = (payload.get("filter") or {}).get("value", "")
+        if group == "32:00":
+            return {"success": True, "result_data": [
+                {"nummer": f"GW{value}", "id": f"(32,0,{abs(hash(value)) % 10**6})",
+                 "ycalc^nummer": f"K{value}"}]}
+        if group == "41:00":
+            return {"success": True, "result_data": [
+                {f: float(gen.rnd.choice([0, 8, 16, 24, 40, 80])) for f in CALC_FIELDS}]}
+        return {"success": True, "result_data": []}
+
+    if action == "read":
+        base = date.today() + timedelta(days=14)
+        return {"success": True, "result_data": {
+            "id": payload.get("id"),
+            "table": [{"ytzid": f"G{k}", "ytname": f"Gateway {k}",
+                       "ytenddate": _fmt(base + timedelta(days=21 * (k - 5)))}
+                      for k in range(1, 9)]}}
+
+    if action == "create":
+        return {"success": True, "result_data": {"id": f"(149,2,{next(gen.ids)})"}}
+
+    return {"success": False, "code": "UNKNOWN", "message": f"Unbekannte Aktion {action!r}"}
+
+
+def make_handler(cfg: StubConfig):
+    gen = _Generator(cfg.seed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"            # Keep-Alive wie beim echten EDP
+
+        def log_message(self, *args):            # kein Log pro Request
+            pass
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError:
+                return self._send(400, {"success": False, "message": "kein JSON"})
+
+            endpoint = _endpoint(payload)
+            mean = cfg.latency.get(endpoint, cfg.latency_ms)
+            with lock:
+                delay = max(0.0, gen.rnd.gauss(mean, cfg.jitter_ms)) / 1000
+                fail = gen.rnd.random() < cfg.error_rate
+            time.sleep(delay)
+
+            if fail:
+                return self._send(503, {"success": False, "message": "Stub: simulierter Fehler"})
+            with lock:
+                body = build_response(payload, cfg, gen)
+            self._send(200, body)
+
+        def _send(self, status: int, body: dict):
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            if cfg.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+                raw = gzip.compress(raw, compresslevel=5)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return Handler
+
+
+def serve(cfg: StubConfig, *, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Startet den Stub in einem Daemon-Thread; Port 0 = freien Port wählen."""
+    server = ThreadingHTTPServer((host, port), make_handler(cfg))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True,
+                     name="abas-stub").start()
+    return server
+
+
+def url_of(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/EPLAN_WS_FREE_EDP"
+
+
+def _pairs(items: List[str], cast) -> Dict[str, Any]:
+    out = {}
+    for item in items or []:
+        key, _, value = item.rpartition("=")
+        out[key] = cast(value)
+    return out
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--latency", action="append", metavar="ENDPOINT=MS",
+                        help="Latenz je Infosystem, z. B. PRJM5080LISTE=2500")
+    parser.add_argument("--rows-by", action="append", metavar="ENDPOINT=N",
+                        help="Zeilen je Infosystem, z. B. GATEWAYDASHBOARD=5000")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--gzip", action="store_true",
+                        help="Antworten gzip-komprimiert senden")
+
+
+def config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rows=args.rows,
+        latency=_pairs(args.latency, float),
+        rows_by=_pairs(args.rows_by, int),
+        seed=args.seed,
+        gzip=args.gzip,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4444)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = serve(config_from_args(args), host=args.host, port=args.port)
+    print(f"ABAS-Stub läuft auf {url_of(server)} (Strg+C beendet)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
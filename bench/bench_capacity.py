@@ -0,0 +1,59 @@
+"""
+Laufzeit der Kapazitäts-Heatmap (`pjm.capacity_by_week`) für viele Projekte.
+
+Erzeugt einen synthetischen Portfolio-Plan (Projekte × Abteilungen mit
+zufälligen Intervallen und Stunden) und misst die Verteilung auf Werktage
+plus Summe je Gruppe und Woche – ohne ABAS, ohne Zeichnen.
+
+    python -m bench.bench_capacity --projects 500 --runs 5
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def synthetic_plan(projects: int, seed: int = 0):
+    import numpy as np
+    import pandas as pd
+    from services.pjm import ALL_DEPTS
+
+    rng = np.random.default_rng(seed)
+    n = projects * len(ALL_DEPTS)
+    start = pd.Timestamp.today().normalize() + pd.to_timedelta(rng.integers(0, 540, n), "D")
+    return pd.DataFrame({
+        "Projekt": np.repeat([f"P{i:05d}" for i in range(projects)], len(ALL_DEPTS)),
+        "Abteilung": np.tile(ALL_DEPTS, projects),
+        "Stunden": rng.integers(1, 400, n),
+        "Start": start,
+        "Ende": start + pd.to_timedelta(rng.integers(0, 120, n), "D"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    from services import pjm
+
+    plan = synthetic_plan(args.projects)
+    for by in pjm.CAPACITY_GROUPS:
+        pjm.capacity_by_week(plan, by=by)                # Kalender aufwärmen
+        timings = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            load = pjm.capacity_by_week(plan, by=by)
+            timings.append(time.perf_counter() - t0)
+        print(f"{by:<13} {len(plan)} Aufgaben → {load.shape[0]} × {load.shape[1]} Wochen  "
+              f"p50={statistics.median(timings)*1000:7.1f} ms  "
+              f"min={min(timings)*1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+End-to-End-Latenzmessung gegen den lokalen ABAS-Stub.
+
+Misst die Ladezeit der PJM-Übersicht (alle sechs Infosysteme) und die Anlage
+eines kompletten Projektplans und gibt p50/p95 aus.
+
+    python -m bench.bench_e2e --runs 20 --latency-ms 300 --latency PRJM5080LISTE=1500
+    python -m bench.bench_e2e --address http://intra-erp:4444/EPLAN_WS_FREE_EDP   # ohne Stub
+
+Standardmässig wird der Lese-Cache vor jedem Lauf geleert (kalte Messung);
+``--warm`` misst mit Cache. Mit ``--cassette`` wird eine Aufnahme aus
+Produktion mit ihren Originallaufzeiten abgespielt (s. services/cassette.py):
+
+    python -m bench.bench_e2e --cassette cassettes/montag.jsonl --skip-create
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench.abas_stub import add_stub_arguments, config_from_args, serve, url_of  # noqa: E402
+
+
+def percentile(values: List[float], p: float) -> float:
+    values = sorted(values)
+    if not values:
+        return float("nan")
+    k = (len(values) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def measure(fn: Callable[[], None], runs: int, *, before: Callable[[], None] = lambda: None) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        before()
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def report(name: str, timings: List[float]) -> Dict[str, float]:
+    row = {
+        "runs": len(timings),
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+        "mean": statistics.fmean(timings) if timings else float("nan"),
+        "max": max(timings, default=float("nan")),
+    }
+    print(f"{name:<22} n={row['runs']:<4} p50={row['p50']*1000:8.1f} ms  "
+          f"p95={row['p95']*1000:8.1f} ms  mean={row['mean']*1000:8.1f} ms  "
+          f"max={row['max']*1000:8.1f} ms")
+    return row
+
+
+def sample_plan(pjm):
+    """Plan wie im Task-Creator: alle Abteilungen mit Stunden und Terminen."""
+    import pandas as pd
+
+    g6 = date.today() + timedelta(days=14)
+    ms = {"G6": g6, "G7": g6 + timedelta(days=42), "G8": g6 + timedelta(days=84)}
+    depts = [d for d in pjm.DATE_RULES if d != "PRODUCT DEVELOPMENT"]
+    frame = pjm.date_rules().frame(depts, ms)
+    edited = pd.DataFrame({
+        "Abteilung": depts,
+        "Stunden": [40.0] * len(depts),
+        "Aufgabe": [pjm.TASK_NAMES.get(d, d) for d in depts],
+        "Start": frame["Start"].to_numpy(),
+        "Ende": frame["Ende"].to_numpy(),
+    })
+    edited["Leistungsart"] = edited["Abteilung"].apply(pjm.map_leistungsart)
+    return edited, ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--address", default=None,
+                        help="echter Endpunkt statt des lokalen Stubs")
+    parser.add_argument("--leader", default="XY")
+    parser.add_argument("--create-concurrency", type=int, default=4)
+    parser.add_argument("--warm", action="store_true", help="Lese-Cache nicht leeren")
+    parser.add_argument("--skip-create", action="store_true")
+    parser.add_argument("--cassette", default=None,
+                        help="aufgezeichneten ABAS-Verkehr abspielen statt Stub")
+    parser.add_argument("--cassette-speed", type=float, default=1.0,
+                        help="Abspieltempo: 2 = doppelt so schnell, 0 = ohne Wartezeit")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    server = None
+    address = args.address
+    if args.cassette:
+        address = address or "http://cassette/EPLAN_WS_FREE_EDP"
+    if address is None:
+        server = serve(config_from_args(args))
+        address = url_of(server)
+
+    from services import pjm, transport          # ohne Streamlit
+    from services.cassette import Cassette
+
+    if args.cassette:
+        # Schlüssel enthalten Pseudonyme – gleiches Salz wie bei der Aufnahme
+        transport.configure_cassette(
+            Cassette(args.cassette, "replay", speed=args.cassette_speed,
+                     salt=os.environ.get("ABAS_CASSETTE_SALT", "")))
+
+    before = (lambda: None) if args.warm else transport.clear_cache
+    print(f"Endpunkt: {address}")
+
+    def _overview():
+        _, errors = pjm.load_overview_data(args.leader, address=address)
+        if errors:
+            print("  Fehler:", *errors, sep="\n    ")
+
+    report("overview (parallel)", measure(_overview, args.runs, before=before))
+
+    def _overview_serial():
+        for fn, needs_leader in pjm.OVERVIEW_FETCHERS.values():
+            pjm.run_in_worker(address, fn, *((args.leader,) if needs_leader else ()))
+
+    report("overview (seriell)", measure(_overview_serial, args.runs, before=before))
+
+    if not args.skip_create:
+        edited, ms = sample_plan(pjm)
+        settings = {"doppelte_bildgebungsaufgabe": True, "mcad_ecad_freigabeaufgabe": True}
+        jobs = pjm.build_create_jobs("P99999", edited, settings, args.leader, ms)
+
+        def _create():
+            pjm.run_create_jobs(jobs, address=address,
+                                max_workers=args.create_concurrency)
+
+        report(f"plan create ({len(jobs)} Jobs)", measure(_create, args.runs))
+
+    print("pool:", transport.pool_stats())
+    print("governor:", transport.governor_stats())
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
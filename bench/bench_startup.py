@@ -0,0 +1,95 @@
+"""
+Kaltstart: Importzeit der App-Module und Zeit bis zur ersten Seite.
+
+Jede Messung läuft in einem frischen Interpreter (wie ein Container-Start
+bzw. der erste Streamlit-Rerun nach dem Deploy):
+
+* ``import``  – ``import <modul>`` für app, services.pjm und cli,
+* ``paint``   – `AppTest` rendert die Startseite einmal (ohne
+  Projektleiter-Kürzel, also ohne ERP-Abrufe),
+* ``--top``   – die teuersten Module laut ``python -X importtime``.
+
+    python -m bench.bench_startup --runs 5 --top 15
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULES = ("app", "services.pjm", "cli")
+
+_IMPORT = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+print(json.dumps({{"s": time.perf_counter() - t0,
+                   "pyplot": "matplotlib.pyplot" in sys.modules,
+                   "matplotlib": "matplotlib" in sys.modules}}))
+"""
+
+_PAINT = """
+import json, time
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+print(json.dumps({{"s": time.perf_counter() - t0, "exception": len(at.exception)}}))
+"""
+
+
+def _run(code: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, text=True,
+                         capture_output=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def import_times(module: str, runs: int) -> list[dict]:
+    return [_run(_IMPORT.format(module=module)) for _ in range(runs)]
+
+
+def top_imports(module: str, n: int) -> list[tuple[int, str]]:
+    """(kumulierte µs, Modul) der teuersten Importe."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         cwd=ROOT, text=True, capture_output=True, check=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0,
+                        help="teuerste Importe von app.py anzeigen")
+    parser.add_argument("--no-paint", action="store_true",
+                        help="erste Seite nicht rendern")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        rows = import_times(module, args.runs)
+        times = [r["s"] for r in rows]
+        print(f"import {module:<13} p50={statistics.median(times)*1000:7.1f} ms  "
+              f"min={min(times)*1000:7.1f} ms  "
+              f"matplotlib geladen: {'ja' if rows[-1]['matplotlib'] else 'nein'}")
+
+    if not args.no_paint:
+        paint = [_run(_PAINT.format(app=str(ROOT / "app.py"))) for _ in range(args.runs)]
+        times = [r["s"] for r in paint]
+        print(f"erste Seite          p50={statistics.median(times)*1000:7.1f} ms  "
+              f"min={min(times)*1000:7.1f} ms")
+
+    if args.top:
+        print("\nTeuerste Importe (kumuliert) für app:")
+        for us, name in top_imports("app", args.top):
+            print(f"  {us/1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
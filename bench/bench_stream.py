@@ -0,0 +1,94 @@
+"""
+Speicher und Laufzeit der JSON-Dekodierung grosser Infosystem-Antworten.
+
+Vergleicht für GATEWAYDASHBOARD mit vielen Zeilen
+
+* ``json``   – ``resp.json()`` + ``pd.DataFrame`` (bisheriger Weg),
+* ``stream`` – ``stream=True`` + `services.stream.decode_response` +
+  `services.schema` (spaltenweise, ohne dict je Zeile),
+
+jeweils mit Zeit bis zum fertigen DataFrame (Median) und Spitzen-Speicher
+(tracemalloc, separater Lauf). Der Stub läuft in einem eigenen Prozess, damit das Erzeugen der
+Antworten nicht mitgemessen wird.
+
+    python -m bench.bench_stream --rows 20000 --runs 5 [--gzip]
+"""
+import argparse
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def start_stub(rows: int, gzip: bool) -> tuple[subprocess.Popen, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    cmd = [sys.executable, "-m", "bench.abas_stub", "--port", str(port),
+           "--latency-ms", "0", "--jitter-ms", "0", "--rows", str(rows)]
+    proc = subprocess.Popen(cmd + (["--gzip"] if gzip else []), cwd=ROOT,
+                            stdout=subprocess.DEVNULL)
+    for _ in range(50):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.1)
+    return proc, f"http://127.0.0.1:{port}/EPLAN_WS_FREE_EDP"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--gzip", action="store_true")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from services import pjm, stream, transport
+    from services.schema import SCHEMAS
+
+    proc, address = start_stub(args.rows, args.gzip)
+    payload = {
+        "action": "infosystem",
+        "infosystem": "GATEWAYDASHBOARD",
+        "data": [{"name": "prjphase", "value": "Sold Phase"}, {"name": "bstart", "value": "1"}],
+        "table_fields": SCHEMAS["GATEWAYDASHBOARD"].names,
+    }
+    sess = transport.get_session()
+
+    def via_json():
+        res = sess.post(address, json=payload, timeout=60)
+        return pd.DataFrame(res.json()["result_data"]["table"])
+
+    def via_stream():
+        res = sess.post(address, json=payload, timeout=60, stream=True)
+        data, _ = stream.decode_response(res)
+        return pjm.decode_overview("sold", data)
+
+    print(f"Backend: {stream.backend()}  Zeilen: {args.rows}  gzip: {args.gzip}")
+    for name, fn in (("json", via_json), ("stream", via_stream)):
+        fn()                                            # Verbindung aufwärmen
+        timings = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            df = fn()
+            timings.append(time.perf_counter() - t0)
+        tracemalloc.start()                              # eigener Lauf: bremst stark
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{name:<7} {statistics.median(timings)*1000:8.1f} ms  "
+              f"Spitze {peak/2**20:7.1f} MiB  "
+              f"DataFrame {df.memory_usage(deep=True).sum()/2**20:6.1f} MiB")
+    proc.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Kommandozeile für PJM-Übersicht und Projektpläne – ohne Streamlit.
+
+    python -m cli overview --leader XY --format csv --out export/
+    python -m cli plan P24001 P24002 --file neue_projekte.csv --out plan.csv
+    python -m cli create plan.csv --leader XY [--dry-run]
+    python -m cli capacity --sold --by Abteilung --out kapazitaet.csv
+
+`overview` schreibt je Abschnitt eine Tabelle (CSV, JSON oder Parquet),
+`plan` erzeugt die Standardpläne nach den Terminregeln (zum Prüfen oder
+Nachbearbeiten), `create` legt die Aufgaben aus einer solchen Datei an –
+mit Journal, ein zweiter Lauf setzt also nur fort. `capacity` verteilt die
+geplanten Stunden auf Werktage und summiert je Abteilung und Kalenderwoche.
+
+Einstellungen kommen aus settings.json (``--settings``), die ABAS-Adresse
+lässt sich mit ``--address`` überschreiben. Projektdaten aus dem lokalen
+Store werden verwendet, solange sie jünger als ``store_revalidate_s`` sind;
+``--fresh`` holt sie immer neu. Schwere Module (pandas, die
+Fachlogik) werden erst im jeweiligen Befehl geladen.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import List
+
+FORMATS = ("csv", "json", "parquet")
+
+
+def _setup(args):
+    """Settings laden und Fachlogik darauf einstellen."""
+    from services import pjm
+
+    if args.settings:
+        pjm.SETTINGS_PATH = Path(args.settings)
+    settings = pjm.load_settings()
+    if args.address:
+        settings["base_address"] = args.address
+    pjm.use_settings(settings)
+    pjm.configure_transport(settings)
+    return pjm, settings
+
+
+def _write(df, path: Path, fmt: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False, sep=";", date_format="%d.%m.%Y")
+    elif fmt == "json":
+        df.to_json(path, orient="records", date_format="iso", force_ascii=False, indent=2)
+    else:
+        df.to_parquet(path, index=False)          # braucht pyarrow
+
+
+def _projects(args) -> List[str]:
+    from services.pjm import parse_project_numbers, read_project_csv
+
+    projects = parse_project_numbers(" ".join(args.projects))
+    if args.file:
+        projects += read_project_csv(Path(args.file).read_bytes())
+    return list(dict.fromkeys(projects))
+
+
+def _load_projects(pjm, projects: List[str], args):
+    """Projektdaten; Store-Einträge älter als ``store_revalidate_s`` (oder
+    alle mit ``--fresh``) werden sofort neu geholt – ein Hintergrund-Refresh
+    überlebt das Ende des Prozesses nicht."""
+    return pjm.load_projects(projects, max_workers=args.concurrency,
+                             revalidate=False, fresh=args.fresh)
+
+
+def cmd_overview(args) -> int:
+    pjm, _ = _setup(args)
+    sections = args.sections.split(",") if args.sections else list(pjm.OVERVIEW_FETCHERS)
+    unknown = set(sections) - set(pjm.OVERVIEW_FETCHERS)
+    if unknown:
+        print(f"Unbekannte Abschnitte: {', '.join(sorted(unknown))} "
+              f"(verfügbar: {', '.join(pjm.OVERVIEW_FETCHERS)})", file=sys.stderr)
+        return 2
+
+    failed = 0
+    out = Path(args.out)
+    for key, result, errors, elapsed in pjm.iter_overview_data(args.leader):
+        if key not in sections:
+            continue
+        for msg in errors:
+            print(f"{key}: {msg}", file=sys.stderr)
+        df = pjm.decode_overview(key, result)
+        if df is None:
+            failed += 1
+            continue
+        path = out / f"{key}.{args.format}"
+        _write(df, path, args.format)
+        print(f"{key:<11} {len(df):>6} Zeilen  {elapsed:5.2f} s  → {path}")
+    return 1 if failed else 0
+
+
+def cmd_plan(args) -> int:
+    pjm, _ = _setup(args)
+    projects = _projects(args)
+    if not projects:
+        print("Keine Projekt-Nummern angegeben.", file=sys.stderr)
+        return 2
+
+    data, errors = _load_projects(pjm, projects, args)
+    for project, msgs in errors.items():
+        print(f"{project}: {'; '.join(msgs)}", file=sys.stderr)
+    plan = pjm.build_portfolio_plan(data)
+    _write(plan, Path(args.out), Path(args.out).suffix.lstrip(".") or "csv")
+    print(f"{len(plan)} Aufgaben für {len(data)} Projekte → {args.out}")
+    return 1 if errors else 0
+
+
+def cmd_capacity(args) -> int:
+    pjm, _ = _setup(args)
+    projects = _projects(args)
+    if args.sold:
+        df = pjm.decode_overview("sold", pjm.fetch_gateway_infosystem_sold_phase())
+        if df is None:
+            print("Sold-Phase-Projekte konnten nicht geladen werden.", file=sys.stderr)
+            return 1
+        projects += df["Projekt-Nr."].dropna().astype(str).str.strip().tolist()
+        projects = list(dict.fromkeys(projects))
+    if not projects:
+        print("Keine Projekt-Nummern angegeben.", file=sys.stderr)
+        return 2
+
+    data, errors = _load_projects(pjm, projects, args)
+    for project, msgs in errors.items():
+        print(f"{project}: {'; '.join(msgs)}", file=sys.stderr)
+    load = pjm.capacity_by_week(pjm.build_portfolio_plan(data), by=args.by)
+    load.columns = [d.strftime("%d.%m.%Y") for d in load.columns]
+    _write(load.round(1).reset_index(), Path(args.out),
+           Path(args.out).suffix.lstrip(".") or "csv")
+    print(f"{len(load)} Zeilen × {load.shape[1]} Wochen aus {len(data)} Projekten "
+          f"→ {args.out}")
+    return 1 if errors else 0
+
+
+def _read_plan(path: Path):
+    import pandas as pd
+
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path)
+    if path.suffix == ".json":
+        return pd.read_json(path, orient="records")
+    return pd.read_csv(path, sep=None, engine="python", dtype={"Projekt": str})
+
+
+def cmd_create(args) -> int:
+    import pandas as pd
+
+    pjm, settings = _setup(args)
+    plan = _read_plan(Path(args.plan))
+    missing = {"Projekt", "Abteilung", "Stunden", "Aufgabe", "Start", "Ende"} - set(plan.columns)
+    if missing:
+        print(f"Spalten fehlen: {', '.join(sorted(missing))}", file=sys.stderr)
+        return 2
+
+    cal = pjm.business_calendar()
+    for col, direction in (("Start", "forward"), ("Ende", "backward")):
+        plan[col] = cal.roll(pd.to_datetime(plan[col], errors="coerce", dayfirst=True),
+                             how=direction)
+    plan["Leistungsart"] = plan["Abteilung"].apply(pjm.map_leistungsart)
+    incomplete = plan[["Start", "Ende"]].isna().any(axis=1)
+    if incomplete.any():
+        print(f"{int(incomplete.sum())} Zeilen ohne Start/Ende übersprungen.", file=sys.stderr)
+        plan = plan[~incomplete]
+
+    projects = list(dict.fromkeys(plan["Projekt"]))
+    data, errors = _load_projects(pjm, projects, args)
+    for project, msgs in errors.items():
+        print(f"{project}: {'; '.join(msgs)} – übersprungen", file=sys.stderr)
+
+    journals = {p: pjm.CreateJournal(p) for p in data}
+    jobs = []
+    skipped = 0
+    for project, rows in plan.groupby("Projekt", sort=False):
+        if project not in data:
+            continue
+        missing = pjm.missing_milestones(rows, settings, data[project].milestones)
+        if missing:
+            print(f"{project}: Meilenstein {', '.join(missing)} fehlt – übersprungen",
+                  file=sys.stderr)
+            skipped += 1
+            continue
+        jobs += pjm.build_create_jobs(project, rows, settings, args.leader,
+                                      data[project].milestones)
+    pending = [j for j in jobs if not journals[j.project].is_done(j.key)]
+    print(f"{len(pending)} von {len(jobs)} Aufgaben für {len(data) - skipped} Projekte anzulegen")
+
+    if args.dry_run:
+        for job in pending:
+            print(f"  {job.project:<10} {job.label}")
+        return 0
+
+    def _on_done(job, ok: bool, message: str):
+        mark = "ok " if ok else "ERR"
+        print(f"  [{mark}] {job.project:<10} {job.label}"
+              + (f" – {message}" if message else ""))
+
+    results = pjm.run_create_jobs(
+        pending,
+        max_workers=int(settings.get("create_concurrency", 4)),
+        journals=journals,
+        on_done=_on_done,
+    )
+    failed = sum(1 for ok, _ in results.values() if not ok)
+    if failed:
+        print(f"{failed} Aufgaben fehlgeschlagen – erneuter Aufruf setzt fort.",
+              file=sys.stderr)
+    return 1 if failed or errors or skipped else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli",
+                                     description=__doc__.split("\n\n")[0])
+    parser.add_argument("--settings", default=None, help="Pfad zu settings.json")
+    parser.add_argument("--address", default=None, help="ABAS-Endpunkt überschreiben")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("overview", help="Übersichtstabellen exportieren")
+    p.add_argument("--leader", required=True, help="Projektleiter-Kürzel")
+    p.add_argument("--sections", default=None,
+                   help="Kommagetrennt, z. B. gateway,dispatch (default: alle)")
+    p.add_argument("--format", choices=FORMATS, default="csv")
+    p.add_argument("--out", default="export")
+    p.set_defaults(func=cmd_overview)
+
+    p = sub.add_parser("plan", help="Standardpläne für Projekte erzeugen")
+    p.add_argument("projects", nargs="*", help="Projekt-Nummern")
+    p.add_argument("--file", default=None, help="CSV/Liste mit Projekt-Nummern")
+    p.add_argument("--out", default="plan.csv", help=".csv, .json oder .parquet")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--fresh", action="store_true",
+                   help="Projektdaten neu aus ABAS statt aus dem lokalen Store")
+    p.set_defaults(func=cmd_plan)
+
+    p = sub.add_parser("capacity", help="Stunden je Abteilung und Woche exportieren")
+    p.add_argument("projects", nargs="*", help="Projekt-Nummern")
+    p.add_argument("--file", default=None, help="CSV/Liste mit Projekt-Nummern")
+    p.add_argument("--sold", action="store_true",
+                   help="alle Projekte in Sold Phase hinzunehmen")
+    p.add_argument("--by", choices=("Abteilung", "Leistungsart"), default="Abteilung")
+    p.add_argument("--out", default="capacity.csv", help=".csv, .json oder .parquet")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--fresh", action="store_true",
+                   help="Projektdaten neu aus ABAS statt aus dem lokalen Store")
+    p.set_defaults(func=cmd_capacity)
+
+    p = sub.add_parser("create", help="Aufgaben aus einer Plan-Datei anlegen")
+    p.add_argument("plan", help="Plan-Datei (Ausgabe von `plan`, ggf. bearbeitet)")
+    p.add_argument("--leader", required=True, help="Projektleiter-Kürzel")
+    p.add_argument("--dry-run", action="store_true", help="nur anzeigen")
+    p.add_argument("--concurrency", type=int, default=8)
+    p.add_argument("--fresh", action="store_true",
+                   help="Projektdaten neu aus ABAS statt aus dem lokalen Store")
+    p.set_defaults(func=cmd_create)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(levelname)s %(message)s")
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
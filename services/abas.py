@@ -1,15 +1,19 @@
-from requests.adapters import HTTPAdapter, Retry
+"""
+Synchroner Client für den ABAS EDP-Webservice.
+
+`AbasRequests` baut die Payloads aller Aufrufe, `AbasService` schickt sie
+über den gemeinsamen Transport (Pool, Cache, Metriken). Beim Import passiert
+nichts weiter – Einstellungen liest `services.pjm`, die Datumsfenster werden
+je Aufruf bestimmt, mit den Firmenfeiertagen aus dem Konstruktor.
+"""
+from abc import ABC, abstractmethod
+from typing import Any, Iterable, Optional, Tuple
+
 import requests
-from datetime import datetime, timedelta, date
-import numpy as np
-import pandas as pd
-from typing import Dict, Tuple, Optional
-from typing import Any
-from pathlib import Path
-import json
-from copy import deepcopy
-import streamlit as st
+from requests import HTTPError, RequestException, Timeout
 
+from . import transport
+from .business_days import date_window
 from .exceptions import (
     AbasApiError,
     AbasAuthError,
@@ -17,93 +21,24 @@ from .exceptions import (
     AbasHTTPError,
     AbasTimeoutError,
 )
-from requests import Response, Timeout, RequestException
-
-SETTINGS_PATH = Path(__file__).parent / "settings.json"
-# Aktuelles Datum und in 10 Arbeitstagen & 3 Tage zurück
-heute = datetime.today()
-arbeitstage_10spaeter = np.busday_offset(heute.date(), 10, roll='forward')
-arbeitstage_3frueher = np.busday_offset(heute.date(), -3, roll='backward')
-
-# Als Strings im Format DD.MM.YYYY
-datum_heute = heute.strftime("%d.%m.%Y")
-datum_plus10 = pd.Timestamp(arbeitstage_10spaeter).strftime("%d.%m.%Y")
-datum_minus3 = pd.Timestamp(arbeitstage_3frueher).strftime("%d.%m.%Y")
+from .schema import SCHEMAS
 
 DEFAULT_BASE_ADDRESS = "http://intra-erp:4444/EPLAN_WS_FREE_EDP"
 
-TASK_NAMES = {
-    "BILDGEBUNG": "Imaging Design",
-    "MCAD": "MCAD Konstruktionsphase (inklusive Kundenlayout)",
-    "ECAD": "ECAD Konstruktionsphase",
-    "PROJECTMANAGEMENT": "Project Planning",
-    "PRODUCT DEVELOPMENT": "Special Development",  
-    "SOFTWARE": "Software Installation",
-    "TD": "Manual",
-    "AUTOMATION": "Automation",
-}
-
-SETTINGS_PATH = Path(__file__).parent / "settings.json"
-
-DATE_RULES = {
-    "BILDGEBUNG":          ("G6", 0,    "G6",  7),
-    "MCAD":                ("G7", -14,  "G7", -7),
-    "ECAD":                ("G7", -14,  "G7", -7),
-    "PROJECTMANAGEMENT":   ("TODAY", -5, "G8",  0),
-    "PRODUCT DEVELOPMENT": ("G6", 0,    "G7",  0),  # Ende Engineering = G7
-    "SOFTWARE":            ("G7", 1,    "G7", 14),
-    "TD":                  ("G8", -10,  "G8", -3),
-    "AUTOMATION":          ("G7", 0,  "G7", 14)
-}
-
-DEFAULT_SETTINGS = {
-    "doppelte_bildgebungsaufgabe": True,
-    "mcad_ecad_freigabeaufgabe": True,
-    "task_names": TASK_NAMES.copy(),     # aus der alten Konstante
-    "date_rules": {k: list(v) for k, v in DATE_RULES.items()},
-    "base_adress": "http://intra-erp:4444/EPLAN_WS_FREE_EDP"
-}
-
-def load_settings() -> dict:
-    settings = deepcopy(DEFAULT_SETTINGS)
-    if SETTINGS_PATH.exists():
-        try:
-            user_cfg = json.loads(SETTINGS_PATH.read_text("utf-8"))
-
-            # Tippfehler-Alias: base_adress → base_address
-            if "base_adress" in user_cfg and "base_address" not in user_cfg:
-                user_cfg["base_address"] = user_cfg.pop("base_adress")
-
-            for k, v in user_cfg.items():
-                if isinstance(v, dict) and k in settings:
-                    settings[k].update(v)
-                else:
-                    settings[k] = v
-        except json.JSONDecodeError as e:
-            st.warning(f"settings.json defekt ({e}) – benutze Defaults")
 
-    # ❶ globale Variable setzen, damit alle alten free functions weiterlaufen
-    globals()["base_address"] = settings["base_address"]
-    return settings
+class AbasRequests(ABC):
+    """
+    Payloads aller ABAS-Aufrufe. Jede Methode baut ihren Request und gibt
+    das Ergebnis von ``self._post`` zurück – bei `AbasService` das JSON, bei
+    `AsyncAbasService` (services/abas_async.py) eine Coroutine.
+    """
 
-_SETTINGS = _load_settings()
-BASE_ADDRESS = _SETTINGS["base_address"]        # ← EINMAL global verfügbar
-
-
-
-class AbasService:
-    
-    def __init__(
-        self,
-        base_url: str,
-        *,
-        session: requests.Session | None = None,
-        timeout: int = 15,
-    ):
-        self._base = base_url.rstrip("/")
-        self._session = session or AbasService.make_retry_session(timeout=timeout)
-        self._timeout = timeout
+    # Firmenfeiertage für die Datumsfenster (Werktage ±N)
+    _holidays: tuple = ()
 
+    @abstractmethod
+    def _post(self, payload: dict[str, Any]):
+        """Schickt `payload` ab – synchron oder als Coroutine."""
 
     def release_tasks_to_departments(self,project_number: str):
         params = {
@@ -199,7 +134,7 @@ class AbasService:
             "action": "read",
             "id": gateway_id,
             "fields": [],
-            "table_fields": ["ytzid","ytname","ytenddate"]
+            "table_fields": SCHEMAS["read"].names
         }
         return self._post(params)
     
@@ -207,9 +142,7 @@ class AbasService:
         params = {
             "action": "query",
             "database_and_group": "41:00",
-            "fields": [
-                "yprjmcad","yprjauto","yprjecad","yprjbild","yprjas","yprjpm","yprjtd","yprjsoft"
-            ],
+            "fields": SCHEMAS["41:00"].names,
             "filter":{
                 "type": "atomic_condition",
                 "name": "nummer",
@@ -227,11 +160,7 @@ class AbasService:
                 {"name": "prjphase", "value": "Sold Phase"},
                 {"name": "bstart", "value": "1"}   
             ],
-            "table_fields": [
-                "tprojekt^nummer","tserprod^nummer","tprojektname^name",
-                "tprjphase^name","ytaktgw","ygwinfo","ytprjampel",
-                "ytkundeans^name","ytstandortans^name","ytprjverantw^such"
-            ]
+            "table_fields": SCHEMAS["GATEWAYDASHBOARD"].names
         }
         return self._post(params)
     
@@ -243,40 +172,38 @@ class AbasService:
                 {"name": "prjleit", "value": projektleiter_kuerzel},
                 {"name": "bstart", "value": "1"}
             ],
-            "table_fields": [
-                "tprojekt^nummer","tserprod^nummer","tprojektname^name",
-                "tprjphase^name","ytaktgw","ygwinfo","ytprjampel",
-                "ytkundeans^name","ytstandortans^name","ytprjverantw^such"
-            ]
+            "table_fields": SCHEMAS["GATEWAYDASHBOARD"].names
         }
         return self._post(params)
     
     def fetch_booked_hours(self, projektleiter_kuerzel):
+        window = date_window(holidays=self._holidays)
         params = {
             "action": "infosystem",
             "infosystem": "PRJMLM",
             "data": [
                 {"name": "ypersonal", "value": projektleiter_kuerzel},
-                {"name": "ystdvondatum", "value": datum_minus3},
-                {"name": "ystdbisdatum", "value": datum_heute},
+                {"name": "ystdvondatum", "value": window.minus3},
+                {"name": "ystdbisdatum", "value": window.heute},
                 {"name": "bstart", "value": "1"}
             ],
-            "table_fields": ["yadatum","ystdtats","ytprojekt^nummer","ytprojekt^namebspr"]
+            "table_fields": SCHEMAS["PRJMLM"].names
         }
         return self._post(params)
     
     def fetch_overbooked_projects(self, projektleiter_kuerzel):
+        window = date_window(holidays=self._holidays)
         params = {
             "action": "infosystem",
             "infosystem": "PRJM5080LISTE",
             "data": [
                 {"name": "yprojleit", "value": projektleiter_kuerzel},
                 {"name": "ybprabgeschlossen", "value": "1"},
-                {"name": "yvondatum", "value": datum_minus3},
-                {"name": "ybisdatum", "value": datum_heute},
+                {"name": "yvondatum", "value": window.minus3},
+                {"name": "ybisdatum", "value": window.heute},
                 {"name": "bstart", "value": "1"}
             ],
-            "table_fields": ["ytprojekt^nummer","ytprojname^namebspr","ytfortistbudget","ytsollstd","ytiststd"]
+            "table_fields": SCHEMAS["PRJM5080LISTE"].names
         }
         return self._post(params)
     
@@ -290,7 +217,7 @@ class AbasService:
         params = {
             "action": "query",
             "database_and_group": "32:00",
-            "fields": ["nummer", "id", "ycalc^nummer"],
+            "fields": SCHEMAS["32:00"].names,
             "filter": {
                 "type": "atomic_condition",
                 "name": "yproject",
@@ -301,19 +228,17 @@ class AbasService:
         return self._post(params)
 
     def fetch_dispatch_infosystem(self, projektleiter_kuerzel):
+        window = date_window(holidays=self._holidays)
         params = {
             "action": "infosystem",
             "infosystem": "DISPATCH",
             "data": [
                 {"name": "yprjleit", "value": projektleiter_kuerzel},
-                {"name": "yvon", "value": datum_heute},
-                {"name": "ybis", "value": datum_plus10},
+                {"name": "yvon", "value": window.heute},
+                {"name": "ybis", "value": window.plus10},
                 {"name": "bstart", "value": "1"}
             ],
-            "table_fields": [
-                "ytprojekt^nummer","ytserprod^nummer",
-                "ytserprodname^name","ytwarenempfname^name","ytdispatch"
-            ]
+            "table_fields": SCHEMAS["DISPATCH"].names
         }
         return self._post(params)
     
@@ -325,44 +250,54 @@ class AbasService:
                 {"name": "bearbeit", "value": projektleiter_kuerzel},
                 {"name": "bstart", "value": "1"}
             ],
-            "table_fields": ["taufgabe^nummer","taufgabe^projekt^nummer","taufgabe^yprojektname^namebspr","taufgabe^start","taufgabe^end","taufgabenname^namebspr","tbestaetigername^namebspr"]
+            "table_fields": SCHEMAS["10345"].names
         }
         return self._post(params)
     
+
+
+class AbasService(AbasRequests):
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        session: requests.Session | None = None,
+        timeout: int = 15,
+        holidays: Iterable = (),
+    ):
+        self._base = base_url.rstrip("/")
+        self._session = session or transport.get_session()
+        self._timeout = timeout
+        self._holidays = tuple(holidays)
+
+    @staticmethod
     def make_retry_session(retries: int = 3, timeout: int = 15) -> requests.Session:
-        sess = requests.Session()
-        retry = Retry(
-            total=retries,
-            backoff_factor=0.5,
-            status_forcelist=(502, 503, 504),
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        sess.mount("http://", adapter)
-        sess.mount("https://", adapter)
+        """Eigene Session statt des gemeinsamen Pools (z. B. für Tests)."""
+        sess = transport.make_retry_session(retries)
         sess.request_timeout = timeout          # eigener Attr – praktisch fürs Logging
         return sess
 
     def _post(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # gemeinsamer Pfad mit post_json: Pool, Lese-Cache, Metriken
         try:
-            resp: Response = self._session.post(self._base, json=payload, timeout=self._timeout)
+            data = transport.request_json(self._base, payload,
+                                          timeout=self._timeout,
+                                          session=self._session)
         except Timeout as exc:
             raise AbasTimeoutError(
                 "Gateway Timeout", endpoint=self._base, payload=payload
             ) from exc
+        except HTTPError as exc:
+            raise AbasHTTPError.from_response(exc.response, payload=payload) from exc
         except RequestException as exc:
             raise AbasConnectionError(
                 "Netzwerkfehler", endpoint=self._base, payload=payload
             ) from exc
 
-        if resp.status_code >= 400:
-            raise AbasHTTPError.from_response(resp, payload=payload)
-
-        data = resp.json()
         if not data.get("success", True):
             code = data.get("code")
             exc_cls = AbasAuthError if code == "AUTH" else AbasApiError
             raise exc_cls(code, data.get("message", "Unbekannter API-Fehler"),
                           endpoint=self._base, payload=payload)
         return data
-    
-    
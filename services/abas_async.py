@@ -0,0 +1,155 @@
+"""
+asyncio-Variante von `AbasService` auf Basis von httpx.
+
+`AsyncAbasService` hat dieselben Methoden wie `AbasService` (geerbt von
+`AbasRequests`), liefert aber Coroutines. Ein `httpx.AsyncClient` hält den
+Connection-Pool; jeder Aufruf läuft über `transport.arequest_json` und damit
+über dieselben Grenzen wie der synchrone Client: Governor (Lese-/
+Schreibspur), Circuit Breaker mit Stale-Rückfall, Single-Flight, Lese-Cache,
+Cassette und Metriken. Wartende Aufrufe belegen dabei keinen Thread.
+
+    async with AsyncAbasService(url) as svc:
+        results = await svc.gather(svc.fetch_gateway_data(i) for i in ids)
+
+Aus synchronem Streamlit-Code über die Brücke, die eine Event-Loop in einem
+Hintergrund-Thread betreibt:
+
+    bridge = get_bridge()
+    svc = bridge.service(url)
+    data = bridge.run(svc.fetch_open_tasks("XY"))
+    many = bridge.run(svc.gather(svc.fetch_gateway_data(i) for i in ids))
+
+Fehler kommen als dieselbe `AbasError`-Hierarchie wie beim synchronen Client.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Dict, Iterable, List, TypeVar
+
+import httpx
+
+from . import transport
+from .abas import AbasRequests
+from .breaker import CircuitOpenError
+from .exceptions import (
+    AbasApiError,
+    AbasAuthError,
+    AbasConnectionError,
+    AbasHTTPError,
+    AbasTimeoutError,
+)
+
+T = TypeVar("T")
+
+# Verbindungen je Client; wie viele Requests gleichzeitig ans ERP dürfen,
+# entscheidet der prozessweite Governor in `services.transport`
+DEFAULT_MAX_CONNECTIONS = 20
+
+
+class AsyncAbasService(AbasRequests):
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        client: httpx.AsyncClient | None = None,
+        timeout: float = 15,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        holidays: Iterable = (),
+    ):
+        self._base = base_url.rstrip("/")
+        self._timeout = timeout
+        self._holidays = tuple(holidays)
+        self._own_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections),
+        )
+
+    async def __aenter__(self) -> "AsyncAbasService":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+    async def aclose(self):
+        if self._own_client:
+            await self._client.aclose()
+
+    async def gather(self, calls: Iterable[Awaitable[T]]) -> List[T | Exception]:
+        """Alle Aufrufe gleichzeitig; Fehler stehen als Exception in der Liste."""
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    async def _post(self, payload: dict[str, Any]) -> dict[str, Any]:
+        try:
+            data = await transport.arequest_json(self._client, self._base, payload,
+                                                 timeout=self._timeout)
+        except httpx.TimeoutException as exc:
+            raise AbasTimeoutError(
+                "Gateway Timeout", endpoint=self._base, payload=payload
+            ) from exc
+        except httpx.HTTPStatusError as exc:
+            raise AbasHTTPError.from_response(exc.response, payload=payload) from exc
+        except (httpx.HTTPError, CircuitOpenError, ValueError) as exc:   # ValueError: kein JSON
+            raise AbasConnectionError(
+                "Netzwerkfehler", endpoint=self._base, payload=payload
+            ) from exc
+
+        if not data.get("success", True):
+            code = data.get("code")
+            exc_cls = AbasAuthError if code == "AUTH" else AbasApiError
+            raise exc_cls(code, data.get("message", "Unbekannter API-Fehler"),
+                          endpoint=self._base, payload=payload)
+        return data
+
+
+class AsyncBridge:
+    """Event-Loop in einem Daemon-Thread; synchroner Code übergibt Coroutines."""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        daemon=True, name="abas-async")
+        self._thread.start()
+        self._services: Dict[tuple, AsyncAbasService] = {}
+        self._lock = threading.Lock()
+
+    def run(self, coro: Awaitable[T], timeout: float | None = None) -> T:
+        """Blockiert den aufrufenden Thread bis zum Ergebnis der Coroutine."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def service(self, base_url: str, **kw) -> AsyncAbasService:
+        """Ein Client je Adresse und Optionen – sein Pool lebt auf dieser Loop."""
+        if "holidays" in kw:
+            kw["holidays"] = tuple(kw["holidays"])       # hashbar für den Schlüssel
+        key = (base_url, tuple(sorted(kw.items())))
+        with self._lock:
+            svc = self._services.get(key)
+            if svc is None:
+                svc = self._services[key] = self.run(self._create(base_url, kw))
+            return svc
+
+    @staticmethod
+    async def _create(base_url: str, kw: dict) -> AsyncAbasService:
+        return AsyncAbasService(base_url, **kw)
+
+    def close(self):
+        with self._lock:
+            services, self._services = list(self._services.values()), {}
+        for svc in services:
+            self.run(svc.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+_bridge: AsyncBridge | None = None
+_bridge_lock = threading.Lock()
+
+
+def get_bridge() -> AsyncBridge:
+    """Prozessweite Brücke (einmal angelegt, von allen Sessions geteilt)."""
+    global _bridge
+    with _bridge_lock:
+        if _bridge is None:
+            _bridge = AsyncBridge()
+        return _bridge
@@ -0,0 +1,96 @@
+"""
+Circuit Breaker je ABAS-Infosystem.
+
+Nach `threshold` aufeinanderfolgenden Timeouts/Verbindungsfehlern/5xx öffnet
+der Breaker: Lesezugriffe gehen dann nicht mehr ans ERP, sondern werden aus
+der letzten guten Antwort bedient (bzw. schlagen sofort fehl). Nach
+`cooldown` Sekunden darf genau ein Hintergrund-Request prüfen, ob das System
+wieder antwortet; erst dessen Erfolg schliesst den Breaker.
+"""
+import threading
+import time
+from typing import Any, Dict
+
+import requests
+
+CLOSED, OPEN = "closed", "open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Breaker offen und keine letzte gute Antwort vorhanden."""
+
+
+class CircuitBreaker:
+
+    def __init__(self, name: str, *, threshold: int = 3, cooldown: float = 30.0):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """Darf ein normaler Request ans ERP?"""
+        return self.state == CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures = CLOSED, 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold and self.state == CLOSED:
+                self.state, self.opened_at = OPEN, time.monotonic()
+
+    def try_begin_probe(self) -> bool:
+        """True für genau einen Aufrufer, wenn der Cooldown abgelaufen ist."""
+        with self._lock:
+            if (self.state != OPEN or self._probing
+                    or time.monotonic() - self.opened_at < self.cooldown):
+                return False
+            self._probing = True
+            return True
+
+    def end_probe(self, ok: bool):
+        with self._lock:
+            self._probing = False
+            if ok:
+                self.state, self.failures = CLOSED, 0
+            else:
+                self.opened_at = time.monotonic()    # nächster Versuch nach Cooldown
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures,
+                "open_for_s": round(time.monotonic() - self.opened_at, 1)
+                if self.state == OPEN else 0.0}
+
+
+class BreakerRegistry:
+
+    def __init__(self, *, threshold: int = 3, cooldown: float = 30.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def configure(self, *, threshold: int, cooldown: float):
+        with self._lock:
+            self.threshold, self.cooldown = threshold, cooldown
+            for b in self._breakers.values():
+                b.threshold, b.cooldown = threshold, cooldown
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            b = self._breakers.get(name)
+            if b is None:
+                b = self._breakers[name] = CircuitBreaker(
+                    name, threshold=self.threshold, cooldown=self.cooldown)
+            return b
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: b.stats() for name, b in self._breakers.items()}
@@ -0,0 +1,150 @@
+"""
+Werktagskalender für alle Datumsberechnungen der App.
+
+Statt `np.busday_offset` pro Skalar aufzurufen, werden ganze Spalten in einem
+einzigen NumPy-Aufruf verschoben. Der zugrunde liegende `np.busdaycalendar`
+wird einmal pro Feiertagsliste gebaut und enthält Wochenenden und
+Firmenfeiertage.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Iterable, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+WEEKMASK = "1111100"                 # Mo–Fr
+_NAT = np.datetime64("NaT", "D")
+_PLACEHOLDER = np.datetime64("2000-01-03", "D")   # Montag, ersetzt NaT
+
+
+def _to_days(values: Any) -> Tuple[np.ndarray, Callable[[np.ndarray], Any]]:
+    """
+    Wandelt Skalar, Liste, Series oder Index in ein datetime64[D]-Array um
+    und liefert eine Funktion, die das Ergebnis wieder in die Ursprungsform
+    bringt (Series behalten Index und Namen, Skalare werden zu Timestamp/NaT).
+    """
+    if isinstance(values, pd.Series):
+        arr = pd.to_datetime(values, errors="coerce").to_numpy("datetime64[D]")
+        return arr, lambda out: pd.Series(pd.to_datetime(out), index=values.index,
+                                          name=values.name)
+    if isinstance(values, pd.Index):
+        arr = pd.to_datetime(values, errors="coerce").to_numpy("datetime64[D]")
+        return arr, lambda out: pd.DatetimeIndex(out, name=values.name)
+    if np.ndim(values) == 0:
+        if pd.isna(values):
+            return np.array([_NAT]), lambda out: pd.NaT
+        arr = np.array([np.datetime64(pd.Timestamp(values), "D")])
+        return arr, lambda out: pd.Timestamp(out[0]) if not np.isnat(out[0]) else pd.NaT
+    arr = pd.to_datetime(np.asarray(values), errors="coerce").to_numpy("datetime64[D]")
+    return arr, lambda out: out
+
+
+class BusinessCalendar:
+
+    def __init__(self, holidays: Iterable = (), *, weekmask: str = WEEKMASK):
+        hol = [np.datetime64(pd.Timestamp(h).date(), "D") for h in holidays]
+        self.holidays = tuple(hol)
+        self._cal = np.busdaycalendar(weekmask=weekmask, holidays=hol)
+
+    def offset(self, values: Any, days: Any = 0, *, how: str = "forward") -> Any:
+        """
+        Rollt auf den nächsten (`how='forward'`) bzw. vorherigen
+        (`how='backward'`) Werktag und verschiebt danach um `days` Werktage.
+        `days` darf Skalar oder Array gleicher Länge sein; NaT bleibt NaT.
+        """
+        arr, wrap = _to_days(values)
+        nat = np.isnat(arr)
+        days = np.broadcast_to(np.asarray(days, dtype=np.int64), arr.shape)
+        out = np.busday_offset(np.where(nat, _PLACEHOLDER, arr),
+                               np.where(nat, 0, days),
+                               roll=how, busdaycal=self._cal)
+        return wrap(np.where(nat, _NAT, out))
+
+    def roll(self, values: Any, *, how: str = "forward") -> Any:
+        """Rollt Datumswerte auf den nächsten/vorherigen Werktag."""
+        return self.offset(values, 0, how=how)
+
+    def count(self, start: Any, end: Any) -> np.ndarray:
+        """Anzahl Werktage im Intervall [start, end] (beide inklusive)."""
+        s, _ = _to_days(start)
+        e, _ = _to_days(end)
+        nat = np.isnat(s) | np.isnat(e)
+        s = np.where(nat, _PLACEHOLDER, s)
+        e = np.where(nat, _PLACEHOLDER, e)
+        n = np.busday_count(s, e + np.timedelta64(1, "D"), busdaycal=self._cal)
+        return np.where(nat, 0, np.maximum(n, 0))
+
+    def count_in_bins(self, start: Any, end: Any, edges: Any) -> np.ndarray:
+        """
+        Werktage von [start, end] je Intervall [edges[j], edges[j+1]).
+
+        Statt ``busday_count`` für jede Kombination Aufgabe × Intervall
+        aufzurufen, wird nur je Datum die kumulierte Werktagszahl ab
+        ``edges[0]`` bestimmt; die Überlappung ist danach reine
+        Ganzzahl-Arithmetik.
+
+        Returns
+        -------
+        int-Matrix der Form (len(start), len(edges) - 1); NaT ergibt 0.
+        """
+        s, _ = _to_days(start)
+        e, _ = _to_days(end)
+        edges = np.asarray(pd.to_datetime(edges).to_numpy("datetime64[D]"))
+        nat = np.isnat(s) | np.isnat(e)
+        s = np.where(nat, edges[0], s)
+        e = np.where(nat, edges[0], e)
+
+        def cum(days: np.ndarray) -> np.ndarray:
+            return np.busday_count(edges[0], days, busdaycal=self._cal)
+
+        lo = cum(s)[:, None]                           # [start, …
+        hi = cum(e + np.timedelta64(1, "D"))[:, None]  # …, end]
+        bounds = cum(edges)
+        out = np.minimum(hi, bounds[None, 1:]) - np.maximum(lo, bounds[None, :-1])
+        out = np.maximum(out, 0)
+        out[nat] = 0
+        return out
+
+    def is_busday(self, values: Any) -> np.ndarray:
+        arr, _ = _to_days(values)
+        nat = np.isnat(arr)
+        return ~nat & np.is_busday(np.where(nat, _PLACEHOLDER, arr),
+                                   busdaycal=self._cal)
+
+
+@lru_cache(maxsize=8)
+def _calendar_for(holidays: Tuple[str, ...], weekmask: str) -> BusinessCalendar:
+    return BusinessCalendar(holidays, weekmask=weekmask)
+
+
+def get_calendar(holidays: Iterable = (), *, weekmask: str = WEEKMASK) -> BusinessCalendar:
+    """Vorkompilierter Kalender je Feiertagsliste (prozessweit gecacht)."""
+    key = tuple(sorted(str(pd.Timestamp(h).date()) for h in holidays))
+    return _calendar_for(key, weekmask)
+
+
+class DateWindow(NamedTuple):
+    """Abfragefenster der Übersicht im ABAS-Format TT.MM.JJJJ."""
+    heute: str
+    plus10: str          # in 10 Werktagen
+    minus3: str          # vor 3 Werktagen
+
+
+@lru_cache(maxsize=4)
+def _window_for(today: date, holidays: Tuple[str, ...]) -> DateWindow:
+    cal = _calendar_for(holidays, WEEKMASK)
+    return DateWindow(
+        today.strftime("%d.%m.%Y"),
+        cal.offset(today, 10, how="forward").strftime("%d.%m.%Y"),
+        cal.offset(today, -3, how="backward").strftime("%d.%m.%Y"),
+    )
+
+
+def date_window(today: date | None = None, holidays: Iterable = ()) -> DateWindow:
+    """
+    Fenster zum aktuellen Tag – je Aufruf bestimmt, damit ein Server, der
+    über Mitternacht läuft, nicht mit dem Datum seines Starts weiterfragt.
+    """
+    key = tuple(sorted(str(pd.Timestamp(h).date()) for h in holidays))
+    return _window_for(today or date.today(), key)
@@ -0,0 +1,73 @@
+"""
+Prozessweiter Lese-Cache für ABAS-Antworten.
+
+Einträge haben eine eigene Lebensdauer (TTL), die Gesamtgrösse ist begrenzt
+(LRU-Verdrängung) und jeder Eintrag kann mit Tags wie ``projekt:P123``
+versehen werden, um ihn nach einem Schreibzugriff gezielt zu verwerfen.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[float, Any, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]          # abgelaufen
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str] = ()):
+        expires = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (expires, value, frozenset(tags))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """Verwirft alle Einträge mit mindestens einem der Tags."""
+        tags = set(tags)
+        if not tags:
+            return 0
+        with self._lock:
+            stale = [k for k, (_, _, t) in self._data.items() if t & tags]
+            for k in stale:
+                del self._data[k]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+                "evictions": self.evictions,
+            }
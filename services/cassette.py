@@ -0,0 +1,196 @@
+"""
+Aufnahme und Wiedergabe von ABAS-Verkehr („Cassette“).
+
+Im Aufnahme-Modus wird jedes Request/Response-Paar, das über
+`transport.post` bzw. `transport.apost` läuft (also `post_json`,
+`AbasService._post` und `AsyncAbasService._post`), anonymisiert
+als JSON-Zeile auf die Platte geschrieben – samt ursprünglicher Laufzeit.
+Timeouts und Verbindungsfehler werden ebenfalls aufgezeichnet (``kind:
+"error"``), damit Breaker und Stale-Rückfall nachgestellt werden können. Im
+Wiedergabe-Modus beantwortet die Cassette dieselben Requests ohne Netz, wirft
+aufgezeichnete Fehler erneut und wartet dabei die aufgezeichnete Zeit
+(skalierbar) ab. So lassen sich langsame Vormittage deterministisch
+nachstellen.
+
+Gesteuert über Umgebungsvariablen:
+
+    ABAS_CASSETTE=cassettes/montag.jsonl
+    ABAS_CASSETTE_MODE=record | replay
+    ABAS_CASSETTE_SPEED=1.0          # 2 = doppelt so schnell, 0 = ohne Wartezeit
+    ABAS_CASSETTE_SALT=…             # Salz für die Pseudonyme (Pflicht beim
+                                     # Aufnehmen, beim Abspielen dasselbe)
+"""
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+import requests
+
+# Felder mit Personen- oder Kundenbezug – werden durch stabile Pseudonyme
+# ersetzt, damit Aufnahme und Wiedergabe dieselben Schlüssel erzeugen.
+PERSONAL_FIELDS = {
+    "ypersonal", "prjleit", "yprjleit", "yprojleit", "bearbeit",
+    "ytprjverantw^such", "tbestaetigername^namebspr",
+    "ytkundeans^name", "ytstandortans^name", "ytwarenempfname^name",
+    # Projektnamen enthalten meist den Kunden
+    "tprojektname^name", "taufgabe^yprojektname^namebspr", "ytprojname^namebspr",
+    # Freitexte (Gateway-Info, Aufgaben, Leistungsmeldungen)
+    "ygwinfo", "taufgabenname^namebspr", "ytprojekt^namebspr",
+}
+
+
+class Cassette:
+
+    def __init__(self, path: str | Path, mode: str, *, speed: float = 1.0, salt: str = ""):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unbekannter Cassette-Modus: {mode!r}")
+        if mode == "record" and not salt:
+            # ohne Salz lassen sich z. B. zweistellige Kürzel durch
+            # Ausprobieren aller Kombinationen zurückrechnen
+            raise ValueError("Aufnahme nur mit Salz (ABAS_CASSETTE_SALT)")
+        self.path = Path(path)
+        self.mode = mode
+        self.speed = speed
+        self._salt = salt
+        self._lock = threading.Lock()
+        self._tapes: Dict[str, "itertools.cycle"] = {}
+        if mode == "replay":
+            self._load()
+
+    # ------------------------------------------------------------------ anonym
+    def _pseudonym(self, value: Any) -> Any:
+        if value in (None, ""):
+            return value
+        digest = hashlib.sha256(f"{self._salt}{value}".encode("utf-8")).hexdigest()
+        return f"anon-{digest[:8]}"
+
+    def anonymize(self, obj: Any) -> Any:
+        """Ersetzt personenbezogene Werte rekursiv – in Payloads
+        (``{"name": …, "value": …}``) wie in Ergebniszeilen."""
+        if isinstance(obj, list):
+            return [self.anonymize(v) for v in obj]
+        if not isinstance(obj, dict):
+            return obj
+        if obj.get("name") in PERSONAL_FIELDS and "value" in obj:
+            return {**obj, "value": self._pseudonym(obj["value"])}
+        return {k: self._pseudonym(v) if k in PERSONAL_FIELDS else self.anonymize(v)
+                for k, v in obj.items()}
+
+    def key(self, payload: dict) -> str:
+        """Unabhängig von der Zieladresse – Aufnahmen aus Produktion lassen
+        sich so gegen jede Umgebung abspielen."""
+        return json.dumps(self.anonymize(payload), sort_keys=True,
+                          separators=(",", ":"), ensure_ascii=False, default=str)
+
+    # --------------------------------------------------------------- Aufnahme
+    def _append(self, entry: dict):
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+
+    def record(self, payload: dict, *, status: int, reason: str, content: bytes,
+               elapsed: float):
+        """
+        Antwort aufzeichnen, nachdem ihr Body vollständig gelesen wurde –
+        `elapsed` reicht vom Absenden bis zum letzten Byte.
+        """
+        try:
+            body: Any = self.anonymize(json.loads(content))
+            kind = "json"
+        except ValueError:
+            body, kind = content.decode("utf-8", errors="replace"), "text"
+        entry = {
+            "key": self.key(payload),
+            "status": status,
+            "reason": reason,
+            "kind": kind,
+            "body": body,
+            "elapsed": round(elapsed, 4),
+            "bytes": len(content),
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._append(entry)
+
+    def record_error(self, payload: dict, exc: Exception, elapsed: float):
+        """Timeout/Verbindungsfehler aufzeichnen – bei der Wiedergabe erneut geworfen."""
+        self._append({
+            "key": self.key(payload),
+            "kind": "error",
+            "error": type(exc).__name__,
+            "message": str(exc),
+            "elapsed": round(elapsed, 4),
+            "at": datetime.now().isoformat(timespec="seconds"),
+        })
+
+    # ------------------------------------------------------------- Wiedergabe
+    def _load(self):
+        tapes: Dict[str, List[dict]] = {}
+        with self.path.open(encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    entry = json.loads(line)
+                    tapes.setdefault(entry["key"], []).append(entry)
+        # mehrere Aufnahmen desselben Requests werden reihum abgespielt
+        self._tapes = {k: itertools.cycle(v) for k, v in tapes.items()}
+
+    def next_entry(self, payload: dict) -> dict | None:
+        """Nächste Aufnahme zu diesem Request (None = keine vorhanden)."""
+        with self._lock:
+            tape = self._tapes.get(self.key(payload))
+            return next(tape) if tape is not None else None
+
+    def delay(self, entry: dict) -> float:
+        """Wartezeit der Wiedergabe in Sekunden."""
+        return entry["elapsed"] / self.speed if self.speed > 0 else 0.0
+
+    @staticmethod
+    def content(entry: dict) -> bytes:
+        """Aufgezeichneter Body als Bytes."""
+        if entry.get("kind") == "json":
+            return json.dumps(entry["body"], ensure_ascii=False).encode("utf-8")
+        return str(entry["body"]).encode("utf-8")
+
+    def replay(self, address: str, payload: dict) -> requests.Response:
+        entry = self.next_entry(payload)
+        if entry is None:
+            raise requests.exceptions.ConnectionError(
+                f"Cassette {self.path.name}: keine Aufnahme für diesen Request"
+            )
+        time.sleep(self.delay(entry))
+        if entry.get("kind") == "error":
+            exc_type = getattr(requests.exceptions, entry.get("error", ""), None)
+            if not (isinstance(exc_type, type)
+                    and issubclass(exc_type, requests.exceptions.RequestException)):
+                exc_type = requests.exceptions.ConnectionError
+            raise exc_type(f"{entry.get('message', '')} (Cassette {self.path.name})")
+
+        resp = requests.Response()
+        resp.status_code = entry["status"]
+        resp.reason = entry.get("reason") or ""
+        resp.url = address
+        resp.encoding = "utf-8"
+        resp.elapsed = timedelta(seconds=entry["elapsed"])
+        resp._content = self.content(entry)
+        if entry.get("kind") == "json":
+            resp.headers["Content-Type"] = "application/json"
+        return resp
+
+
+def from_env() -> Cassette | None:
+    path = os.environ.get("ABAS_CASSETTE")
+    if not path:
+        return None
+    return Cassette(
+        path,
+        os.environ.get("ABAS_CASSETTE_MODE", "replay"),
+        speed=float(os.environ.get("ABAS_CASSETTE_SPEED", "1.0")),
+        salt=os.environ.get("ABAS_CASSETTE_SALT", ""),
+    )
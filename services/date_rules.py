@@ -0,0 +1,141 @@
+"""
+Terminregeln (DATE_RULES / settings["date_rules"]) als kompilierter Evaluator.
+
+Jede Regel ist ein Vierer ``(Start-Anker, Start-Offset, End-Anker, End-Offset)``
+mit Anker ∈ {"G6", "G7", "G8", "TODAY"} und Offsets in Kalendertagen. Das
+Ergebnis wird anschliessend auf Werktage gerollt (Start vorwärts, Ende
+rückwärts).
+
+Die Regeln werden beim Laden einmal validiert und in Index-/Offset-Arrays
+übersetzt; `evaluate` rechnet danach Start- und Enddaten für alle Abteilungen
+und beliebig viele Projekte in einem einzigen vektorisierten Durchlauf.
+"""
+from datetime import date
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .business_days import BusinessCalendar, get_calendar
+
+ANCHORS: Tuple[str, ...] = ("G6", "G7", "G8", "TODAY")
+_ANCHOR_IDX = {a: i for i, a in enumerate(ANCHORS)}
+
+
+def _as_offset(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError
+    f = float(value)
+    if not f.is_integer():
+        raise ValueError
+    return int(f)
+
+
+class CompiledDateRules:
+
+    def __init__(self, rules: Mapping[str, Sequence]):
+        problems: List[str] = []
+        depts, s_idx, s_off, e_idx, e_off = [], [], [], [], []
+
+        for dept, rule in rules.items():
+            try:
+                a_s, o_s, a_e, o_e = rule
+            except (TypeError, ValueError):
+                problems.append(f"{dept}: erwartet (Anker, Offset, Anker, Offset), nicht {rule!r}")
+                continue
+            for anchor in (a_s, a_e):
+                if anchor not in _ANCHOR_IDX:
+                    problems.append(f"{dept}: unbekannter Anker {anchor!r} "
+                                    f"(erlaubt: {', '.join(ANCHORS)})")
+            try:
+                o_s, o_e = _as_offset(o_s), _as_offset(o_e)
+            except (TypeError, ValueError):
+                problems.append(f"{dept}: Offsets müssen ganze Tage sein ({o_s!r}, {o_e!r})")
+                continue
+            if a_s in _ANCHOR_IDX and a_e in _ANCHOR_IDX:
+                depts.append(dept)
+                s_idx.append(_ANCHOR_IDX[a_s]); s_off.append(o_s)
+                e_idx.append(_ANCHOR_IDX[a_e]); e_off.append(o_e)
+
+        if problems:
+            raise ValueError("Ungültige Terminregeln:\n" + "\n".join(problems))
+
+        self.departments: Tuple[str, ...] = tuple(depts)
+        self._pos = {d: i for i, d in enumerate(depts)}
+        self._s_idx = np.array(s_idx, dtype=np.intp)
+        self._e_idx = np.array(e_idx, dtype=np.intp)
+        self._s_off = np.array(s_off, dtype="timedelta64[D]")
+        self._e_off = np.array(e_off, dtype="timedelta64[D]")
+
+    def __contains__(self, dept: str) -> bool:
+        return dept in self._pos
+
+    def evaluate(self,
+                 milestones: Mapping[str, Iterable],
+                 *,
+                 today: date | None = None,
+                 calendar: BusinessCalendar | None = None,
+                 ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Start- und Enddaten aller Abteilungen für N Projekte.
+
+        Parameters
+        ----------
+        milestones : {"G6": [...], "G7": [...], "G8": [...]} – je N Daten
+                     (date, Timestamp, String oder NaT); fehlende Anker → NaT
+        today      : Anker "TODAY" (default: heute)
+        calendar   : Werktagskalender (default: ohne Feiertage)
+
+        Returns
+        -------
+        (start, end) – datetime64[D]-Arrays der Form (N, len(departments))
+        """
+        cal = calendar or get_calendar()
+        cols = {k: pd.to_datetime(pd.Series(list(v)), errors="coerce")
+                   .to_numpy("datetime64[D]")
+                for k, v in milestones.items()}
+        n = max((len(c) for c in cols.values()), default=1)
+        today64 = np.datetime64(today or date.today(), "D")
+
+        anchors = np.empty((len(ANCHORS), n), dtype="datetime64[D]")
+        for i, a in enumerate(ANCHORS):
+            if a == "TODAY":
+                anchors[i] = today64
+            else:
+                anchors[i] = cols.get(a, np.full(n, np.datetime64("NaT", "D")))
+
+        # (Abteilungen, Projekte) → Kalenderoffset → Werktag rollen
+        start = anchors[self._s_idx] + self._s_off[:, None]
+        end = anchors[self._e_idx] + self._e_off[:, None]
+        start = cal.roll(start.ravel(), how="forward").reshape(start.shape)
+        end = cal.roll(end.ravel(), how="backward").reshape(end.shape)
+        return start.T, end.T
+
+    def frame(self, departments: Sequence[str], milestones: Mapping[str, date], **kw) -> pd.DataFrame:
+        """Start/Ende (Timestamps) für die gewünschten Abteilungen eines Projekts."""
+        start, end = self.evaluate({k: [v] for k, v in milestones.items()}, **kw)
+        pos = [self._pos.get(d) for d in departments]
+        nat = np.datetime64("NaT", "D")
+        return pd.DataFrame({
+            "Start": pd.to_datetime([start[0, p] if p is not None else nat for p in pos]),
+            "Ende":  pd.to_datetime([end[0, p] if p is not None else nat for p in pos]),
+        })
+
+    def interval(self, dept: str, milestones: Mapping[str, date], **kw) -> Tuple[pd.Timestamp, pd.Timestamp]:
+        row = self.frame([dept], milestones, **kw).iloc[0]
+        return row["Start"], row["Ende"]
+
+
+@lru_cache(maxsize=16)
+def _compile(frozen: Tuple[Tuple[str, Tuple], ...]) -> CompiledDateRules:
+    return CompiledDateRules(dict(frozen))
+
+
+def compile_date_rules(rules: Mapping[str, Sequence]) -> CompiledDateRules:
+    """Validiert und kompiliert Regeln; gleiche Regeln → dasselbe Objekt."""
+    try:
+        frozen = tuple(sorted((k, tuple(v)) for k, v in rules.items()))
+    except TypeError:
+        return CompiledDateRules(rules)      # meldet den Formfehler
+    return _compile(frozen)
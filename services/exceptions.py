@@ -0,0 +1,61 @@
+"""
+Fehlerhierarchie für den ABAS EDP-Webservice.
+
+    AbasError
+    ├── AbasConnectionError      Netz nicht erreichbar, Verbindung abgebrochen
+    │   └── AbasTimeoutError     keine Antwort innerhalb des Timeouts
+    ├── AbasHTTPError            Antwort mit HTTP-Status >= 400
+    └── AbasApiError             HTTP 200, aber ``success: false``
+        └── AbasAuthError        Code ``AUTH``
+
+Gemeinsam genutzt von `AbasService` und `AsyncAbasService`.
+"""
+from typing import Any, Dict, Optional
+
+
+class AbasError(Exception):
+    """Basisklasse; `endpoint` und `payload` erleichtern das Logging."""
+
+    def __init__(self, message: str, *, endpoint: str = "",
+                 payload: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.message = message
+        self.endpoint = endpoint
+        self.payload = payload
+
+
+class AbasConnectionError(AbasError):
+    pass
+
+
+class AbasTimeoutError(AbasConnectionError):
+    pass
+
+
+class AbasHTTPError(AbasError):
+
+    def __init__(self, status: int, message: str, **kw):
+        super().__init__(f"HTTP {status}: {message}", **kw)
+        self.status = status
+
+    @classmethod
+    def from_response(cls, response, *, payload: Optional[Dict[str, Any]] = None):
+        """Aus einer `requests`- oder `httpx`-Antwort (None → Status 0)."""
+        if response is None:
+            return cls(0, "keine Antwort", payload=payload)
+        reason = (getattr(response, "reason", None)
+                  or getattr(response, "reason_phrase", None) or "")
+        text = (response.text or "")[:200]
+        return cls(response.status_code, f"{reason} {text}".strip(),
+                   endpoint=str(response.url), payload=payload)
+
+
+class AbasApiError(AbasError):
+
+    def __init__(self, code: Optional[str], message: str, **kw):
+        super().__init__(f"{code}: {message}" if code else message, **kw)
+        self.code = code
+
+
+class AbasAuthError(AbasApiError):
+    pass
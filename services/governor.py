@@ -0,0 +1,184 @@
+"""
+Prozessweite Drosselung aller ABAS-Requests.
+
+Vor jedem Request holt sich der Aufrufer über `slot(lane)` einen Platz:
+
+* höchstens `max_in_flight` Requests gleichzeitig,
+* Token-Bucket mit `rate` Requests/s und Spitzen bis `burst` (rate 0 = aus),
+* zwei Spuren: ``write`` (Anlage von Aufgaben) vor ``read`` (Übersicht,
+  Projektdaten). Lesezugriffe warten, solange Schreibzugriffe anstehen, und
+  dürfen die letzten `write_reserve` Plätze nicht belegen – Anlagen im
+  Task-Creator verhungern so nie hinter einer Welle von Übersichtsabfragen.
+
+`aslot(lane)` ist dasselbe für Coroutines (services/abas_async.py): es
+wartet, ohne den Thread der Event-Loop zu blockieren, und zählt gegen
+dieselben Plätze und Tokens.
+
+Warteschlangenlänge und Wartezeiten je Spur liefert `stats()`.
+"""
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, Set, Tuple
+
+READ, WRITE = "read", "write"
+
+
+class _Lane:
+    __slots__ = ("waiting", "in_flight", "admitted", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+
+class Governor:
+
+    def __init__(self, *, max_in_flight: int = 8, rate: float = 20.0,
+                 burst: int = 10, write_reserve: int = 2):
+        self._cond = threading.Condition()
+        self._lanes = {READ: _Lane(), WRITE: _Lane()}
+        # wartende Coroutines: (Loop, Future), geweckt bei jeder Freigabe
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+        self.configure(max_in_flight=max_in_flight, rate=rate, burst=burst,
+                       write_reserve=write_reserve)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+
+    def configure(self, *, max_in_flight: int, rate: float, burst: int,
+                  write_reserve: int):
+        with self._cond:
+            self.max_in_flight = max(1, int(max_in_flight))
+            self.rate = max(0.0, float(rate))
+            self.burst = max(1, int(burst))
+            self.write_reserve = min(max(0, int(write_reserve)), self.max_in_flight - 1)
+            self._notify()
+
+    # ------------------------------------------------------------- intern
+    def _refill(self, now: float):
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _in_flight(self) -> int:
+        return sum(lane.in_flight for lane in self._lanes.values())
+
+    def _wait_for_capacity(self, lane: str) -> float | None:
+        """None = sofort zulassen, sonst maximale Wartezeit bis zur nächsten Prüfung."""
+        limit = self.max_in_flight
+        if lane == READ:
+            if self._lanes[WRITE].waiting:
+                return 1.0                       # Schreibzugriffe zuerst
+            limit -= self.write_reserve
+        if self._in_flight() >= limit:
+            return 1.0                           # wird bei Freigabe geweckt
+        if self.rate and self._tokens < 1.0:
+            return (1.0 - self._tokens) / self.rate
+        return None
+
+    def _notify(self):
+        """Wartende Threads und Coroutines wecken (unter `_cond`)."""
+        self._cond.notify_all()
+        for loop, fut in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, fut)
+            except RuntimeError:                 # Loop bereits geschlossen
+                pass
+        self._async_waiters.clear()
+
+    def _admit(self, stats: _Lane, t0: float) -> float:
+        """Zulassung verbuchen (unter `_cond`); liefert die Wartezeit."""
+        if self.rate:
+            self._tokens -= 1.0
+        waited = time.monotonic() - t0
+        stats.in_flight += 1
+        stats.admitted += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+        self._notify()                           # evtl. wartende Leser freigeben
+        return waited
+
+    def _release(self, stats: _Lane):
+        with self._cond:
+            stats.in_flight -= 1
+            self._notify()
+
+    # ----------------------------------------------------------- öffentlich
+    @contextmanager
+    def slot(self, lane: str = READ) -> Iterator[float]:
+        """Blockiert bis zur Zulassung; liefert die Wartezeit in Sekunden."""
+        stats = self._lanes[lane]
+        t0 = time.monotonic()
+        with self._cond:
+            stats.waiting += 1
+            try:
+                while True:
+                    self._refill(time.monotonic())
+                    timeout = self._wait_for_capacity(lane)
+                    if timeout is None:
+                        break
+                    self._cond.wait(timeout)
+            finally:
+                stats.waiting -= 1
+            waited = self._admit(stats, t0)
+        try:
+            yield waited
+        finally:
+            self._release(stats)
+
+    @asynccontextmanager
+    async def aslot(self, lane: str = READ) -> AsyncIterator[float]:
+        """Wie `slot`, wartet aber mit ``await`` statt im Thread."""
+        loop = asyncio.get_running_loop()
+        stats = self._lanes[lane]
+        t0 = time.monotonic()
+        with self._cond:
+            stats.waiting += 1
+        admitted = False
+        try:
+            while True:
+                with self._cond:
+                    self._refill(time.monotonic())
+                    timeout = self._wait_for_capacity(lane)
+                    if timeout is None:
+                        stats.waiting -= 1
+                        admitted = True
+                        waited = self._admit(stats, t0)
+                        break
+                    waiter = (loop, loop.create_future())
+                    self._async_waiters.add(waiter)
+                try:
+                    await asyncio.wait_for(waiter[1], timeout)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._cond:
+                        self._async_waiters.discard(waiter)
+        finally:
+            if not admitted:                     # abgebrochen (Cancel)
+                with self._cond:
+                    stats.waiting -= 1
+        try:
+            yield waited
+        finally:
+            self._release(stats)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            return {name: {
+                "queued": lane.waiting,
+                "in_flight": lane.in_flight,
+                "admitted": lane.admitted,
+                "mean_wait_s": round(lane.wait_total / lane.admitted, 3)
+                if lane.admitted else 0.0,
+                "max_wait_s": round(lane.wait_max, 3),
+            } for name, lane in self._lanes.items()}
+
+
+def _wake(fut: asyncio.Future):
+    if not fut.done():
+        fut.set_result(None)
@@ -0,0 +1,136 @@
+"""
+Lokales Journal für Aufgaben-Anlagen in ABAS.
+
+Pro Projekt wird festgehalten, welche `create`-Aufrufe bereits erfolgreich
+waren. Ein abgebrochener oder teilweise fehlgeschlagener Lauf kann so
+fortgesetzt werden, ohne Aufgaben doppelt anzulegen.
+
+Ablageort: ``PJM_JOURNAL_DIR`` (Umgebungsvariable), sonst ``journal/``
+neben dem Code.
+"""
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+try:
+    import fcntl
+except ImportError:                       # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+# wie der Projekt-Store: im Container auf ein Volume legen
+JOURNAL_DIR = Path(os.environ.get("PJM_JOURNAL_DIR")
+                   or Path(__file__).parent.parent / "journal")
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exklusive Sperre über Prozesse hinweg (App, CLI, weitere Worker)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _stamp(path: Path) -> Tuple[int, ...] | None:
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+
+class CreateJournal:
+    """
+    Mehrere Journale desselben Projekts (zweite Session, CLI neben der App)
+    teilen sich die Datei: geschrieben wird unter einer Dateisperre, nach
+    erneutem Lesen und Zusammenführen, über eine eigene Temp-Datei. Ein
+    "ok" wird dabei nie durch "failed" ersetzt.
+    """
+
+    def __init__(self, project_number: str, *, directory: Path = JOURNAL_DIR):
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in project_number)
+        self.path = Path(directory) / f"{safe}.json"
+        self._lock_path = self.path.with_suffix(".lock")
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._stamp: Tuple[int, ...] | None = None
+        with self._lock:
+            self._reload()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            return json.loads(self.path.read_text("utf-8"))
+        except FileNotFoundError:
+            return {}
+        except json.JSONDecodeError:
+            return {}                       # defektes Journal → neu beginnen
+
+    def _reload(self):
+        """Datei neu lesen, falls eine andere Instanz sie geändert hat."""
+        stamp = _stamp(self.path)
+        if stamp != self._stamp:
+            self._entries = self._read()
+            self._stamp = stamp
+
+    def is_done(self, key: str) -> bool:
+        with self._lock:
+            self._reload()
+            return self._entries.get(key, {}).get("status") == "ok"
+
+    def done_count(self) -> int:
+        with self._lock:
+            self._reload()
+            return sum(1 for e in self._entries.values() if e.get("status") == "ok")
+
+    def record(self, key: str, label: str, ok: bool, message: str = ""):
+        """Ergebnis eines Aufrufs festhalten und sofort (atomar) schreiben."""
+        entry = {
+            "label": label,
+            "status": "ok" if ok else "failed",
+            "message": message,
+            "at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock, _file_lock(self._lock_path):
+            entries = self._read()
+            if ok or entries.get(key, {}).get("status") != "ok":
+                entries[key] = entry
+            self._write(entries)
+            self._entries = entries
+            self._stamp = _stamp(self.path)
+
+    def clear(self):
+        with self._lock, _file_lock(self._lock_path):
+            self._entries = {}
+            self.path.unlink(missing_ok=True)
+            self._stamp = None
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.stem}-",
+                                   suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
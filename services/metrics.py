@@ -0,0 +1,190 @@
+"""
+Laufzeitmetriken aller ABAS-Aufrufe.
+
+Jeder Aufruf über `transport.request_json` wird mit Endpunkt (Infosystem bzw.
+Datenbank:Gruppe), Aktion und Ergebnis getaggt und in ein Latenz-Histogramm
+einsortiert; dazu kommen Payload-/Antwortgrösse, Zeilenzahl und Retries.
+Andere Module können Momentanwerte (Gauges) über `add_gauges` beisteuern.
+
+Auslesen über `snapshot()` (Admin-Panel in der Sidebar) oder im
+Prometheus-Textformat über einen kleinen HTTP-Endpunkt (`start_http_server`).
+"""
+import json
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Obergrenzen der Histogramm-Buckets in Sekunden
+BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, math.inf)
+
+
+class _Series:
+    __slots__ = ("count", "total", "buckets", "payload_bytes", "response_bytes",
+                 "rows", "retries", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.payload_bytes = 0
+        self.response_bytes = 0
+        self.rows = 0
+        self.retries = 0
+
+    def quantile(self, q: float) -> float:
+        """Schätzung aus dem Histogramm (lineare Interpolation im Bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for upper, n in zip(BUCKETS, self.buckets):
+            if seen + n >= rank and n:
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        return self.max
+
+
+class Metrics:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], _Series] = {}
+        self._gauges: List[Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]] = []
+
+    def add_gauges(self, fn: Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]):
+        """Zusätzliche Momentanwerte für /metrics, z. B. Warteschlangen.
+        `fn` liefert Tupel (Name, Labels, Wert)."""
+        self._gauges.append(fn)
+
+    def record(self, *, endpoint: str, action: str, outcome: str, elapsed: float,
+               payload_bytes: int = 0, response_bytes: int = 0,
+               rows: int = 0, retries: int = 0):
+        key = (endpoint or "-", action or "-", outcome)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = _Series()
+            s.count += 1
+            s.total += elapsed
+            s.max = max(s.max, elapsed)
+            for i, upper in enumerate(BUCKETS):
+                if elapsed <= upper:
+                    s.buckets[i] += 1
+                    break
+            s.payload_bytes += payload_bytes
+            s.response_bytes += response_bytes
+            s.rows += rows
+            s.retries += retries
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Eine Zeile je (Endpunkt, Aktion, Ergebnis), langsamste zuerst."""
+        with self._lock:
+            rows = [{
+                "endpoint": ep, "action": action, "outcome": outcome,
+                "calls": s.count,
+                "mean_s": round(s.total / s.count, 3),
+                "p50_s": round(s.quantile(0.50), 3),
+                "p95_s": round(s.quantile(0.95), 3),
+                "max_s": round(s.max, 3),
+                "avg_rows": round(s.rows / s.count, 1),
+                "avg_response_kb": round(s.response_bytes / s.count / 1024, 1),
+                "avg_payload_b": round(s.payload_bytes / s.count),
+                "retries": s.retries,
+            } for (ep, action, outcome), s in self._series.items()]
+        return sorted(rows, key=lambda r: r["p95_s"], reverse=True)
+
+    def prometheus(self) -> str:
+        """Prometheus-Textformat (Histogramm + Zähler)."""
+        out = [
+            "# HELP abas_request_seconds Laufzeit der ABAS-Aufrufe",
+            "# TYPE abas_request_seconds histogram",
+        ]
+        counters: Dict[str, List[str]] = {
+            "abas_response_bytes_total": [], "abas_payload_bytes_total": [],
+            "abas_rows_total": [], "abas_retries_total": [],
+        }
+        with self._lock:
+            for (ep, action, outcome), s in sorted(self._series.items()):
+                labels = f'endpoint="{ep}",action="{action}",outcome="{outcome}"'
+                cumulative = 0
+                for upper, n in zip(BUCKETS, s.buckets):
+                    cumulative += n
+                    le = "+Inf" if math.isinf(upper) else repr(upper)
+                    out.append(f'abas_request_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                out.append(f"abas_request_seconds_sum{{{labels}}} {s.total}")
+                out.append(f"abas_request_seconds_count{{{labels}}} {s.count}")
+                for name, value in (("abas_response_bytes_total", s.response_bytes),
+                                     ("abas_payload_bytes_total", s.payload_bytes),
+                                     ("abas_rows_total", s.rows),
+                                     ("abas_retries_total", s.retries)):
+                    counters[name].append(f"{name}{{{labels}}} {value}")
+        for name, samples in counters.items():
+            out.append(f"# TYPE {name} counter")
+            out += samples
+        gauges: Dict[str, List[str]] = {}
+        for fn in self._gauges:
+            for name, labels, value in fn():
+                lbl = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                gauges.setdefault(name, []).append(f"{name}{{{lbl}}} {value}")
+        for name, samples in gauges.items():
+            out.append(f"# TYPE {name} gauge")
+            out += samples
+        return "\n".join(out) + "\n"
+
+
+METRICS = Metrics()
+
+_server: ThreadingHTTPServer | None = None
+_server_lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(METRICS.snapshot(), indent=2).encode("utf-8")
+            ctype = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = METRICS.prometheus().encode("utf-8")
+            ctype = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> bool:
+    """
+    Startet /metrics (Prometheus) und /metrics.json einmal pro Prozess.
+    Ist der Port schon belegt (z. B. zweiter Worker), wird nichts gestartet.
+
+    Der Endpunkt hat keine Anmeldung und zeigt Infosysteme, Projektverkehr
+    und Fehlerraten – daher standardmässig nur auf localhost.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError:
+            return False
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True,
+                         name="abas-metrics").start()
+        return True
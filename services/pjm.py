@@ -0,0 +1,1179 @@
+"""
+PJM-Fachlogik ohne Streamlit: ABAS-Abfragen, Projektdaten, Terminregeln,
+Aufgabenpläne und deren Anlage.
+
+`app.py` (Streamlit) und `cli.py` (Kommandozeile, Cron) nutzen dieselben
+Funktionen. Was von der Oberfläche abhängt – Zieladresse, Fehlerausgabe,
+Feiertage, Terminregeln und Aufgabennamen – kommt über Provider:
+`app.py` setzt sie mit `set_providers` / `set_reporter` auf die Session,
+Skripte mit `use_settings` auf ein festes Settings-Dict.
+"""
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+from . import transport
+from .business_days import BusinessCalendar, date_window, get_calendar
+from .date_rules import CompiledDateRules, compile_date_rules
+from .journal import CreateJournal
+from .schema import SCHEMAS, decode_table
+from .settings import SettingsFile, SettingsSnapshot
+from .store import StoredProject, get_store
+
+log = logging.getLogger("pjm")
+
+DEFAULT_BASE_ADDRESS = "http://intra-erp:4444/EPLAN_WS_FREE_EDP"
+SETTINGS_PATH = Path(__file__).parent.parent / "settings.json"
+
+
+@dataclass
+class GatewayInfo:
+    calculation_number: int
+    gateway_id: str
+    gateway_number: int
+
+@dataclass
+class ProjectData:
+    gw_info: GatewayInfo
+    end_dates: Dict[str, str]
+    milestones: Dict[str, date]
+    calc_hours: dict
+    version: int = 0            # Stand im lokalen Projekt-Store
+    fetched_at: float = 0.0     # Abrufzeit aus ABAS (time.time())
+
+    def to_record(self) -> dict:
+        """JSON-fähiger Datensatz für den Projekt-Store."""
+        return {
+            "gw_info": asdict(self.gw_info),
+            "end_dates": self.end_dates,
+            "milestones": {k: v.isoformat() for k, v in self.milestones.items()},
+            "calc_hours": self.calc_hours,
+        }
+
+    @classmethod
+    def from_record(cls, stored: StoredProject) -> "ProjectData":
+        rec = stored.data
+        return cls(
+            GatewayInfo(**rec["gw_info"]),
+            rec["end_dates"],
+            {k: date.fromisoformat(v) for k, v in rec["milestones"].items()},
+            rec["calc_hours"],
+            version=stored.version,
+            fetched_at=stored.fetched_at,
+        )
+
+# Zuordnung der Kalkulationsstunden zu den Abteilungen
+CALC_FIELD_TO_DEPT = {
+    "yprjmcad":  "MCAD",
+    "yprjecad":  "ECAD",
+    "yprjauto":  "AUTOMATION",
+    "yprjbild":  "BILDGEBUNG",
+    "yprjas":    "PROJECTMANAGEMENT",
+    "yprjpm":    "PRODUCT DEVELOPMENT",
+    "yprjtd":    "TD",
+    "yprjsoft":  "SOFTWARE",
+}
+ALL_DEPTS = list(CALC_FIELD_TO_DEPT.values())
+# add the Department "IPC" and "TECHNIKUM" to the list
+ALL_DEPTS += ["IPC", "TECHNIKUM"]
+
+#Aufgabennamen
+TASK_NAMES = {
+    "BILDGEBUNG": "Imaging Design",
+    "MCAD": "MCAD Konstruktionsphase (inklusive Kundenlayout)",
+    "ECAD": "ECAD Konstruktionsphase",
+    "PROJECTMANAGEMENT": "Project Planning",
+    "PRODUCT DEVELOPMENT": "Special Development",  
+    "SOFTWARE": "Software Installation",
+    "TD": "Manual",
+    "AUTOMATION": "Automation",
+}
+
+LEISTUNGSARTEN: dict[str, str] = {
+    "BILDGEBUNG":        "BILDGEBUNG",
+    "MCAD":              "MCAD",
+    "ECAD":              "ECAD_ELEKTRONIK",
+    "PROJECTMANAGEMENT": "AUFTRAGSTEUERUNG",
+    "SOFTWARE":          "SOFTWARE",
+    "TD":                "TD",
+    "AUTOMATION":        "AUTOMATIS",
+    "IPC":               "SOFTWARE",
+    "TECHNIKUM":         "TECHNIKUM",
+    "INTRAVIS":        "SONSTIGE",
+}
+# -------
+DATE_RULES = {
+    "BILDGEBUNG":          ("G6", 0,    "G6",  7),
+    "MCAD":                ("G6", 1,  "G6", 8),
+    "ECAD":                ("G6", 1,  "G6", 8),
+    "PROJECTMANAGEMENT":   ("TODAY", -5, "G8",  0),
+    "PRODUCT DEVELOPMENT": ("G6", 0,    "G7",  0),  # Ende Engineering = G7
+    "SOFTWARE":            ("G7", 1,    "G7", 14),
+    "TD":                  ("G8", -10,  "G8", -3),
+    "AUTOMATION":          ("G7", 0,  "G7", 14)
+}
+
+
+DEFAULT_SETTINGS = {
+    "doppelte_bildgebungsaufgabe": True,
+    "mcad_ecad_freigabeaufgabe": True,
+    "base_address": "http://intra-erp:4444/EPLAN_WS_FREE_EDP",
+    "task_names": TASK_NAMES.copy(),     # aus der alten Konstante
+    "date_rules": {k: list(v) for k, v in DATE_RULES.items()},
+    "http_pool_size": transport.DEFAULT_POOL_SIZE,
+    "http_retries": transport.DEFAULT_RETRIES,
+    "http_backoff": transport.DEFAULT_BACKOFF,
+    "cache_size": transport.DEFAULT_CACHE_SIZE,
+    "cache_ttl": dict(transport.DEFAULT_CACHE_TTL),
+    "create_concurrency": 4,
+    "max_in_flight": transport.DEFAULT_MAX_IN_FLIGHT,
+    "rate_limit": transport.DEFAULT_RATE,
+    "rate_burst": transport.DEFAULT_BURST,
+    "write_reserve": transport.DEFAULT_WRITE_RESERVE,
+    "breaker_threshold": transport.DEFAULT_BREAKER_THRESHOLD,
+    "breaker_cooldown": transport.DEFAULT_BREAKER_COOLDOWN,
+    "stream_json": True,
+    "holidays": [],
+    "store_revalidate_s": 3600,
+    "metrics_port": 0,                   # /metrics aus; z. B. 9101 zum Einschalten
+    "metrics_host": "127.0.0.1",
+    "show_metrics": False,
+}
+
+# ---------------------------------------------------------------------------
+# PROVIDER – Umgebung der jeweiligen Oberfläche
+# ---------------------------------------------------------------------------
+def _log_report(msg: str, level: str):
+    getattr(log, level if level in ("warning", "error") else "error")(msg)
+
+
+_providers: Dict[str, Callable[[], Any]] = {
+    "address": lambda: DEFAULT_BASE_ADDRESS,
+    "holidays": lambda: (),
+    "date_rules": lambda: DATE_RULES,
+    "task_names": lambda: TASK_NAMES,
+    "store_revalidate_s": lambda: DEFAULT_SETTINGS["store_revalidate_s"],
+}
+_reporter: Callable[[str, str], None] = _log_report
+
+
+def set_providers(**providers: Callable[[], Any]):
+    """Provider für ``address``, ``holidays``, ``date_rules``, ``task_names``,
+    ``store_revalidate_s`` setzen."""
+    unknown = set(providers) - set(_providers)
+    if unknown:
+        raise ValueError(f"Unbekannte Provider: {', '.join(sorted(unknown))}")
+    _providers.update(providers)
+
+
+def set_reporter(reporter: Callable[[str, str], None]):
+    """Ausgabe von Meldungen ausserhalb von Worker-Threads: ``reporter(msg, level)``."""
+    global _reporter
+    _reporter = reporter
+
+
+def use_settings(settings: dict):
+    """Provider auf ein festes Settings-Dict setzen (CLI, Skripte, Benchmarks)."""
+    rules = {k: tuple(v) for k, v in settings.get("date_rules", DATE_RULES).items()}
+    holidays = tuple(settings.get("holidays", ()))
+    set_providers(
+        address=lambda: settings.get("base_address", DEFAULT_BASE_ADDRESS),
+        holidays=lambda: holidays,
+        date_rules=lambda: rules,
+        task_names=lambda: settings.get("task_names", TASK_NAMES),
+        store_revalidate_s=lambda: float(settings.get(
+            "store_revalidate_s", DEFAULT_SETTINGS["store_revalidate_s"])),
+    )
+
+
+def configure_transport(settings: dict):
+    """Pool, Cache, Drosselung und Breaker aus den Einstellungen übernehmen."""
+    transport.configure(
+        pool_size=settings.get("http_pool_size", transport.DEFAULT_POOL_SIZE),
+        retries=settings.get("http_retries", transport.DEFAULT_RETRIES),
+        backoff=settings.get("http_backoff", transport.DEFAULT_BACKOFF),
+    )
+    transport.configure_cache(
+        ttl=settings.get("cache_ttl", transport.DEFAULT_CACHE_TTL),
+        maxsize=settings.get("cache_size", transport.DEFAULT_CACHE_SIZE),
+    )
+    transport.configure_governor(
+        max_in_flight=settings.get("max_in_flight", transport.DEFAULT_MAX_IN_FLIGHT),
+        rate=settings.get("rate_limit", transport.DEFAULT_RATE),
+        burst=settings.get("rate_burst", transport.DEFAULT_BURST),
+        write_reserve=settings.get("write_reserve", transport.DEFAULT_WRITE_RESERVE),
+    )
+    transport.configure_breaker(
+        threshold=settings.get("breaker_threshold", transport.DEFAULT_BREAKER_THRESHOLD),
+        cooldown=settings.get("breaker_cooldown", transport.DEFAULT_BREAKER_COOLDOWN),
+    )
+    transport.configure_stream(settings.get("stream_json", True))
+
+
+def task_names() -> Mapping[str, str]:
+    return _providers["task_names"]()
+
+
+
+# ---------------------------------------------------------------------------
+# ABAS-ZUGRIFF – gemeinsamer POST-Pfad
+# ---------------------------------------------------------------------------
+def post_json(params: dict,
+              *,
+              err_msg: str = "Fehler beim Abrufen der Daten",
+              address: str | None = None,
+              timeout: int = 30):
+    """
+    Sendet einen POST-Request an `address` und gibt bei Erfolg die JSON-Antwort
+    zurück. Bei Fehlern wird die Meldung über den Reporter ausgegeben (bzw.
+    im Worker gesammelt) und `None` geliefert.
+
+    Parameters
+    ----------
+    params   : JSON-Payload für den Request
+    err_msg  : Basis-Text für die Fehlermeldung (wird um die Exception ergänzt)
+    address  : Ziel-URL (default: Provider ``address``)
+    timeout  : Sekunden bis zum Timeout (default: 30)
+
+    Returns
+    -------
+    dict | None
+    """
+    address = resolve_address(address)
+
+    try:
+        return transport.request_json(address, params, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        _report_error(f"{err_msg}: {e}")
+        return None
+
+# ---------------------------------------------------------------------------
+# WORKER-KONTEXT – ABAS-Aufrufe ausserhalb des Haupt-Threads
+# ---------------------------------------------------------------------------
+# In Worker-Threads gibt es weder `st.session_state` noch darf dort `st.error`
+# aufgerufen werden. Adresse, Feiertage und Fehlerliste werden deshalb pro
+# Thread gesetzt.
+_worker_ctx = threading.local()
+
+
+def resolve_address(address: str | None = None) -> str:
+    """Ziel-URL: explizit > Worker-Kontext > Provider (Session-Config bzw. Settings)."""
+    if address is None:
+        address = getattr(_worker_ctx, "address", None)
+    if address is None:
+        address = _providers["address"]()
+    return address
+
+
+def _holidays() -> tuple:
+    """Firmenfeiertage: Worker-Kontext > Provider."""
+    holidays = getattr(_worker_ctx, "holidays", None)
+    return tuple(_providers["holidays"]()) if holidays is None else holidays
+
+
+def _report_error(msg: str, *, level: str = "error"):
+    """Im Haupt-Thread sofort über den Reporter ausgeben (`st.error`/`st.warning`
+    bzw. Logging), im Worker nur sammeln."""
+    errors = getattr(_worker_ctx, "errors", None)
+    if errors is None:
+        _reporter(msg, level)
+    else:
+        errors.append(msg)
+
+
+def run_in_worker(address: str, fn, *args,
+                  holidays: tuple | None = None) -> Tuple[Any, List[str]]:
+    """
+    Führt `fn(*args)` in einem Worker-Thread aus. `holidays` (im aufrufenden
+    Thread bestimmt) nutzen die Datumsfenster der Übersichts-Abfragen.
+
+    Returns
+    -------
+    (Ergebnis, gesammelte Fehlermeldungen) – die Meldungen werden später
+    vom aufrufenden Thread ausgegeben.
+    """
+    _worker_ctx.address = address
+    _worker_ctx.holidays = holidays
+    _worker_ctx.errors = []
+    try:
+        return fn(*args), _worker_ctx.errors
+    except Exception as e:                     # nichts darf den Pool sprengen
+        _worker_ctx.errors.append(f"{fn.__name__}: {e}")
+        return None, _worker_ctx.errors
+    finally:
+        del _worker_ctx.address
+        del _worker_ctx.holidays
+        del _worker_ctx.errors
+
+def roll_to_business_day(ts: "pd.Timestamp | pd.NaTType",
+                         *,
+                         how: str = "forward") -> "pd.Timestamp | pd.NaTType":
+    """
+    Rollt ein Datum auf den nächsten/vorherigen Werktag.
+    • ts darf Timestamp, datetime.date, NaT – oder eine ganze Series sein
+      (dann in einem einzigen NumPy-Aufruf).
+    • how = 'forward'  → nächster Werktag (Mo-Fr, ohne Firmenfeiertage)
+      how = 'backward' → vorheriger Werktag
+    """
+    return business_calendar().roll(ts, how=how)
+
+def business_calendar() -> BusinessCalendar:
+    """Firmenkalender mit den Feiertagen aus den Einstellungen."""
+    return get_calendar(_holidays())
+
+def map_leistungsart(key: str, *, default: str | None = None) -> str:
+    """
+    Gibt den gemappten Wert zurück; Keys werden
+    case-insensitive behandelt. Bei unbekannter
+    Leistungsart → default oder KeyError.
+    """
+    try:
+        return LEISTUNGSARTEN[key.upper()]
+    except KeyError:
+        if default is not None:
+            return default
+        raise ValueError(f"Unbekannte Leistungsart: {key!r}") from None
+
+def release_tasks_to_departments(project_number: str):
+    params = {
+    "action": "infosystem",
+    "infosystem": "PRJMAUFAN",
+    "data": [
+        {"name": "yprojekt", "value": project_number},
+        {"name": "yvondatum", "value": ""},
+        {"name": "ybisdatum", "value": ""},
+        {"name": "bstart", "value": "1"},
+        {"name": "ybuanlegen", "value": "1"}
+    ]
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+
+def _check_settings(settings: dict) -> List[str]:
+    """Validiert einmal je geänderter Datei (nicht je Rerun)."""
+    warnings = []
+    try:
+        compile_date_rules(settings["date_rules"])
+    except ValueError as e:
+        warnings.append(f"{e}\n\nEs werden die Standard-Terminregeln verwendet.")
+        settings["date_rules"] = {k: list(v) for k, v in DATE_RULES.items()}
+    return warnings
+
+
+_settings_files: Dict[Path, SettingsFile] = {}
+_settings_lock = threading.Lock()
+
+
+def settings_file() -> SettingsFile:
+    """`SettingsFile` für das aktuelle `SETTINGS_PATH` (je Pfad einmal)."""
+    with _settings_lock:
+        sf = _settings_files.get(SETTINGS_PATH)
+        if sf is None:
+            sf = _settings_files[SETTINGS_PATH] = SettingsFile(
+                SETTINGS_PATH, DEFAULT_SETTINGS, validate=_check_settings)
+        return sf
+
+
+def current_settings() -> SettingsSnapshot:
+    """Unveränderlicher Stand; liest settings.json nur nach einer Änderung."""
+    return settings_file().snapshot()
+
+
+def load_settings() -> dict:
+    """Veränderbare Kopie des aktuellen Stands (CLI, Einstellungsseite)."""
+    snap = current_settings()
+    for msg in snap.warnings:
+        _report_error(msg, level="warning")
+    return snap.to_dict()
+
+
+def save_settings(settings: dict, *, base_version: int | None = None) -> SettingsSnapshot:
+    """Atomar speichern; s. `SettingsFile.save` (wirft `SettingsConflictError`)."""
+    return settings_file().save(settings, base_version=base_version)
+
+def create_project_task_folder(project_number, task_name, date_start, date_end):
+    
+    # JSON-Payload analog zum C# Beispiel
+    params = {
+        "action": "create",
+        "database_and_group": "149:02",
+        "data": [
+            {"name": "yprojekt", "value": project_number},
+            {"name": "namebspr", "value": task_name},
+            {"name": "ypvtyp", "value": "Sammelvorgang"},
+            {"name": "yadatum", "value": date_start},
+            {"name": "yedatum", "value": date_end }
+        ],
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+#create a task for a specific person in ABAS ERP
+def create_project_task_for_person(project_number, person_short, leiart, task_name, time_budget, date_start, date_end):
+    
+    
+    # JSON-Payload analog zum C# Beispiel
+    params = {
+        "action": "create",
+        "database_and_group": "149:02",
+        "data": [
+            {"name": "yprojekt", "value": project_number},
+            {"name": "ypersonal", "value": person_short},
+            {"name": "namebspr", "value": task_name},
+            {"name": "yleiart", "value": leiart},
+            {"name": "ypvsollstd", "value": time_budget},
+            {"name": "ypvplanstd", "value": time_budget},
+            {"name": "ypvforecaststd", "value": time_budget},
+            {"name": "yadatum", "value": date_start},
+            {"name": "yedatum", "value": date_end }
+        ],
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def create_project_task_for_department(project_number, department_short, leiart, task_name, time_budget, date_start, date_end):
+    
+    # JSON-Payload analog zum C# Beispiel
+    params = {
+        "action": "create",
+        "database_and_group": "149:02",
+        "data": [
+            {"name": "yprojekt", "value": project_number},
+            {"name": "yprojteam", "value": department_short},
+            {"name": "yleiart", "value": leiart},
+            {"name": "namebspr", "value": task_name},
+            {"name": "ypvsollstd", "value": time_budget},
+            {"name": "ypvplanstd", "value": time_budget},
+            {"name": "ypvforecaststd", "value": time_budget},
+            {"name": "yadatum", "value": date_start},
+            {"name": "yedatum", "value": date_end }
+        ],
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def create_dispatch_milestone(project_number, person_short, date_start, date_end):
+    
+    # JSON-Payload analog zum C# Beispiel
+    params = {
+        "action": "create",
+        "database_and_group": "149:02",
+        "data": [
+            {"name": "yprojekt", "value": project_number},
+            {"name": "ypersonal", "value": person_short},
+            {"name": "yadatum", "value": date_start},
+            {"name": "yedatum", "value": date_end },
+            {"name": "ypvtyp", "value": "Meilenstein" },
+            {"name": "namebspr", "value": "MS Dispatch"}
+        ],
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def fetch_gateway_data(gateway_id):
+        # JSON-Payload analog zum C# Beispiel
+    params = {
+        "action": "read",
+        "id": gateway_id,
+        "fields": [],
+        "table_fields": SCHEMAS["read"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def fetch_calculation_hours(calculation_number):
+    params = {
+        "action": "query",
+        "database_and_group": "41:00",
+        "fields": SCHEMAS["41:00"].names,
+        "filter":{
+            "type": "atomic_condition",
+            "name": "nummer",
+            "value": calculation_number,
+            "operator": "EQUALS"
+        }
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+
+def fetch_gateway_infosystem_sold_phase():
+    params = {
+        "action": "infosystem",
+        "infosystem": "GATEWAYDASHBOARD",
+        "data": [
+            {"name": "prjphase", "value": "Sold Phase"},
+            {"name": "bstart", "value": "1"}   
+        ],
+        "table_fields": SCHEMAS["GATEWAYDASHBOARD"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def fetch_gateway_infosystem(projektleiter_kuerzel):
+    params = {
+        "action": "infosystem",
+        "infosystem": "GATEWAYDASHBOARD",
+        "data": [
+            {"name": "prjleit", "value": projektleiter_kuerzel},
+            {"name": "bstart", "value": "1"}
+        ],
+        "table_fields": SCHEMAS["GATEWAYDASHBOARD"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def fetch_dispatch_infosystem(projektleiter_kuerzel):
+    window = date_window(holidays=_holidays())
+    params = {
+        "action": "infosystem",
+        "infosystem": "DISPATCH",
+        "data": [
+            {"name": "yprjleit", "value": projektleiter_kuerzel},
+            {"name": "yvon", "value": window.heute},
+            {"name": "ybis", "value": window.plus10},
+            {"name": "bstart", "value": "1"}
+        ],
+        "table_fields": SCHEMAS["DISPATCH"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+    
+def fetch_open_tasks(projektleiter_kuerzel):
+    params = {
+        "action": "infosystem",
+        "infosystem": "10345",
+        "data": [
+            {"name": "bearbeit", "value": projektleiter_kuerzel},
+            {"name": "bstart", "value": "1"}
+        ],
+        "table_fields": SCHEMAS["10345"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def fetch_booked_hours(projektleiter_kuerzel):
+    window = date_window(holidays=_holidays())
+    params = {
+        "action": "infosystem",
+        "infosystem": "PRJMLM",
+        "data": [
+            {"name": "ypersonal", "value": projektleiter_kuerzel},
+            {"name": "ystdvondatum", "value": window.minus3},
+            {"name": "ystdbisdatum", "value": window.heute},
+            {"name": "bstart", "value": "1"}
+        ],
+        "table_fields": SCHEMAS["PRJMLM"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+    
+def fetch_overbooked_projects(projektleiter_kuerzel):
+    window = date_window(holidays=_holidays())
+    params = {
+        "action": "infosystem",
+        "infosystem": "PRJM5080LISTE",
+        "data": [
+            {"name": "yprojleit", "value": projektleiter_kuerzel},
+            {"name": "ybprabgeschlossen", "value": "1"},
+            {"name": "yvondatum", "value": window.minus3},
+            {"name": "ybisdatum", "value": window.heute},
+            {"name": "bstart", "value": "1"}
+        ],
+        "table_fields": SCHEMAS["PRJM5080LISTE"].names
+    }
+    return post_json(params, err_msg="Fehler beim Abrufen der Dispatch-Daten")
+
+def get_gateway_info(project_number: str) -> Optional[GatewayInfo]:
+    """
+    Liefert (calc_no, gateway_id, gateway_no).
+    Gibt None zurück, wenn etwas fehlt oder ein Fehler auftritt.
+    """
+    params = {
+        "action": "query",
+        "database_and_group": "32:00",
+        "fields": SCHEMAS["32:00"].names,
+        "filter": {
+            "type": "atomic_condition",
+            "name": "yproject",
+            "value": project_number,
+            "operator": "EQUALS",
+        },
+    }
+
+    try:
+        r_json = post_json(
+            params,
+            err_msg="Fehler beim Abruf der Gateway-Kopfdaten"
+        )
+
+        if r_json is None:                                # schon gemeldet
+            return None
+
+        if not r_json.get("success"):
+            _report_error(f"ABAS meldet Fehler: {r_json.get('message', 'kein Text')}")
+            return None
+
+        rows = r_json.get("result_data", [])
+        if not rows:
+            _report_error(
+                f"Projekt {project_number} wurde nicht gefunden. "
+                "Existiert hier möglicherweise ein Teilprojekt?",
+                level="warning",
+            )
+            return None
+
+        row = rows[0]
+
+        calc_no = row.get("ycalc^nummer")
+        if not calc_no:                                   # <<–– neuer Check
+            _report_error(
+                "❌ Für dieses Gateway ist keine Kalkulationsnummer "
+                "('ycalc^nummer') hinterlegt. "
+                "Bitte in ABAS nachtragen oder das Projekt prüfen."
+            )
+            return None
+
+        return GatewayInfo(calc_no, row.get("id", ""), row.get("nummer", ""))
+
+    except requests.exceptions.RequestException as e:
+        _report_error(f"HTTP-Fehler beim Abruf der Gateway-Kopfdaten: {e}")
+        return None
+
+def fetch_project_data(project_number: str) -> Optional[ProjectData]:
+    """
+    Gateway-Kopf, Gateway-Termine und Kalkulationsstunden direkt aus ABAS.
+    Ohne Session-Zugriff – läuft auch in Worker-Threads.
+    """
+    gw_info = get_gateway_info(project_number)
+    if gw_info is None:
+        return None
+
+    gateway_data = fetch_gateway_data(gw_info.gateway_id)
+    calc_hours = fetch_calculation_hours(gw_info.calculation_number)
+    if gateway_data is None or calc_hours is None:
+        return None                                   # Fehler schon gemeldet
+
+    end_dates, milestones = get_phase_end_dates(gateway_data)
+    return ProjectData(gw_info, end_dates, milestones, calc_hours,
+                       fetched_at=time.time())
+
+def revalidate_in_background(project_number: str, *, address: str | None = None):
+    """Frischen Stand aus ABAS holen und im Store ablegen (max. einer je Projekt)."""
+    store = get_store()
+    if not store.claim_refresh(project_number):
+        return
+    address = resolve_address(address)        # noch im aufrufenden Thread
+
+    def _run():
+        try:
+            data, _ = run_in_worker(address, fetch_project_data, project_number)
+            if data is not None:
+                store.put(project_number, data.to_record())
+        finally:
+            store.release_refresh(project_number)
+
+    threading.Thread(target=_run, daemon=True,
+                     name=f"store-refresh-{project_number}").start()
+
+def get_phase_end_dates(response: dict) -> Tuple[Dict[str, str], Dict[str, date]]:
+    """
+    Extrahiert die Enddaten der Phasen G6, G7 und G8 aus dem API-Payload
+    und liefert sie (a) als String-Dictionary und (b) bereits geparst
+    als date-Objekte zurück.
+
+    Parameters
+    ----------
+    response : dict
+        Voller JSON-Response, der u. a. response["result_data"]["table"] enthält.
+
+    Returns
+    -------
+    Tuple[dict[str, str], dict[str, date]]
+        (1) {phase_id: "dd.mm.yyyy"}  – unverändert als String  
+        (2) {phase_id: date(yyyy, mm, dd)} – geparst für weitere Berechnungen
+    """
+    target_phases = {"G6", "G7", "G8"}
+
+    # (1) Rohdaten als String sammeln
+    end_dates = {
+        item.get("ytzid"): item.get("ytenddate", "")
+        for item in response.get("result_data", {}).get("table", [])
+        if item.get("ytzid") in target_phases
+    }
+
+    # (2) In echte date-Objekte umwandeln, leere Strings überspringen
+    milestones = {
+        k: datetime.strptime(v, "%d.%m.%Y").date()
+        for k, v in end_dates.items()
+        if v
+    }
+
+    return end_dates, milestones
+
+
+
+def extract_department_hours(api_response: dict) -> dict[str, int]:
+    """
+    Convert the API's 'result_data' section to {department: hours}.
+
+    Parameters
+    ----------
+    api_response : dict
+        The full JSON object returned by the API call.
+
+    Returns
+    -------
+    dict[str, int]
+        Aggregated hours keyed by the human-readable department names.
+    """
+    dept_hours: dict[str, int] = {}
+    for row in api_response.get("result_data", []):
+        # row is a dict with raw calc fields and numeric hour totals
+        for raw_field, hours in row.items():
+            if raw_field in CALC_FIELD_TO_DEPT and isinstance(hours, (int, float)):
+                dept = CALC_FIELD_TO_DEPT[raw_field]
+                # accumulate in case the same dept appears in multiple rows
+                dept_hours[dept] = dept_hours.get(dept, 0) + hours
+    return dept_hours
+
+def date_rules() -> CompiledDateRules:
+    """Die kompilierten Terminregeln der aktuellen Einstellungen."""
+    return compile_date_rules(_providers["date_rules"]())
+
+def default_interval(dept: str, milestones: dict[str, date]) -> tuple[date, date]:
+    """Berechnet Start- und Enddatum gemäss DATE_RULES."""
+    return date_rules().interval(dept, milestones, calendar=business_calendar())
+
+# ---------------------------------------------------------------------------
+# ÜBERSICHT – alle Infosysteme parallel
+# ---------------------------------------------------------------------------
+# Abschnitte der Übersichtsseite: Schlüssel → (Abruffunktion, braucht Kürzel)
+OVERVIEW_FETCHERS = {
+    "sold":       (fetch_gateway_infosystem_sold_phase, False),
+    "gateway":    (fetch_gateway_infosystem,            True),
+    "dispatch":   (fetch_dispatch_infosystem,           True),
+    "tasks":      (fetch_open_tasks,                    True),
+    "overbooked": (fetch_overbooked_projects,           True),
+    "booked":     (fetch_booked_hours,                  True),
+}
+
+# Abschnitt → Schema in `services.schema.SCHEMAS`
+OVERVIEW_TABLES = {
+    "sold":       "GATEWAYDASHBOARD",
+    "gateway":    "GATEWAYDASHBOARD",
+    "dispatch":   "DISPATCH",
+    "tasks":      "10345",
+    "overbooked": "PRJM5080LISTE",
+    "booked":     "PRJMLM",
+}
+
+
+def decode_overview(key: str, result: Optional[dict],
+                    columns: List[str] | None = None) -> Optional[pd.DataFrame]:
+    """Antwort eines Übersichts-Abschnitts als typisiertes DataFrame (None bei Fehler)."""
+    return decode_table(OVERVIEW_TABLES[key], result, columns)
+
+
+def _timed_worker(address: str, fn, *args,
+                  holidays: tuple | None = None) -> Tuple[Any, List[str], float]:
+    """Wie `run_in_worker`, zusätzlich mit Laufzeit in Sekunden."""
+    t0 = time.perf_counter()
+    result, errors = run_in_worker(address, fn, *args, holidays=holidays)
+    return result, errors, time.perf_counter() - t0
+
+
+def iter_overview_data(projektleiter: str,
+                       *,
+                       address: str | None = None,
+                       max_workers: int = len(OVERVIEW_FETCHERS),
+                       ) -> Iterator[Tuple[str, Optional[dict], List[str], float]]:
+    """
+    Startet alle Abschnitte der Übersicht parallel und liefert sie in der
+    Reihenfolge ihrer Fertigstellung.
+
+    Yields
+    ------
+    (abschnitt, JSON-Antwort oder None, Fehlermeldungen, Laufzeit in s)
+    """
+    address = resolve_address(address)       # noch im Streamlit-Thread
+    holidays = _holidays()
+    with ThreadPoolExecutor(max_workers=max_workers,
+                            thread_name_prefix="abas-overview") as pool:
+        futures = {
+            pool.submit(_timed_worker, address, fn,
+                        *((projektleiter,) if needs_leader else ()),
+                        holidays=holidays): key
+            for key, (fn, needs_leader) in OVERVIEW_FETCHERS.items()
+        }
+        for fut in as_completed(futures):
+            yield (futures[fut], *fut.result())
+
+
+def load_overview_data(projektleiter: str,
+                       *,
+                       address: str | None = None,
+                       max_workers: int = len(OVERVIEW_FETCHERS),
+                       ) -> Tuple[Dict[str, Optional[dict]], List[str]]:
+    """
+    Lädt alle Abschnitte der Übersicht parallel, statt sechs Infosysteme
+    nacheinander abzufragen. Die Ladezeit entspricht damit dem langsamsten
+    Einzelaufruf.
+
+    Returns
+    -------
+    (results, errors)
+        results : {abschnitt: JSON-Antwort oder None}
+        errors  : Fehlermeldungen aller Worker, zur Ausgabe im Streamlit-Thread
+    """
+    results: Dict[str, Optional[dict]] = {}
+    errors: List[str] = []
+    for key, res, errs, _ in iter_overview_data(projektleiter, address=address,
+                                                max_workers=max_workers):
+        results[key] = res
+        errors.extend(errs)
+    return results, errors
+
+# ---------------------------------------------------------------------------
+# AUFGABEN-ANLAGE – parallel, mit Journal zum Fortsetzen
+# ---------------------------------------------------------------------------
+@dataclass
+class CreateJob:
+    label: str          # Anzeige im Status
+    fn: Callable
+    args: tuple
+    project: str = ""   # für Journal und Fortschritt im Portfolio-Modus
+
+    @property
+    def key(self) -> str:
+        """Stabiler Schlüssel für das Journal (Funktion + Argumente)."""
+        raw = json.dumps([self.fn.__name__, self.args], default=str)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def missing_milestones(edited: pd.DataFrame, settings: dict,
+                       ms: Dict[str, date]) -> List[str]:
+    """
+    Meilensteine, die `build_create_jobs` für diesen Plan braucht, die im
+    Projekt aber fehlen: G8 immer (Dispatch, Support), G7 für die
+    MCAD/ECAD-Freigaben. `get_phase_end_dates` lässt leere Termine weg.
+    """
+    needed = ["G8"]
+    if (settings["mcad_ecad_freigabeaufgabe"]
+            and edited["Abteilung"].isin(["MCAD", "ECAD"]).any()):
+        needed.insert(0, "G7")
+    return [g for g in needed if ms.get(g) is None]
+
+
+def build_create_jobs(project: str, edited: pd.DataFrame, settings: dict,
+                      projektleiter: str, ms: Dict[str, date]) -> List[CreateJob]:
+    """
+    Übersetzt den bearbeiteten Plan in die einzelnen `create`-Aufrufe:
+    eine Aufgabe je Zeile plus Bildgebungs-Unterstützung, MCAD/ECAD-Freigaben,
+    Dispatch-Meilenstein und Support-Aufgabe.
+
+    Raises
+    ------
+    ValueError, wenn nötige Meilensteine fehlen (s. `missing_milestones`) –
+    bevor ein einziger Job erzeugt ist.
+    """
+    missing = missing_milestones(edited, settings, ms)
+    if missing:
+        raise ValueError(f"Projekt {project}: Meilenstein {', '.join(missing)} fehlt")
+    fmt = "%d.%m.%Y"
+    jobs: List[CreateJob] = []
+
+    for _, row in edited.sort_values("Start").iterrows():
+        start, end = row["Start"].strftime(fmt), row["Ende"].strftime(fmt)
+        dept = row["Abteilung"]
+
+        if dept == "PROJECTMANAGEMENT":
+            # Aufgabe für Projektleiter anlegen
+            jobs.append(CreateJob(row["Aufgabe"], create_project_task_for_person, (
+                project, projektleiter, row["Leistungsart"], row["Aufgabe"],
+                row["Stunden"], start, end)))
+        elif dept == "IPC":
+            jobs.append(CreateJob(row["Aufgabe"], create_project_task_for_person, (
+                project, "RH", row["Leistungsart"], row["Aufgabe"],
+                row["Stunden"], start, end)))
+        else:
+            jobs.append(CreateJob(row["Aufgabe"], create_project_task_for_department, (
+                project, dept, row["Leistungsart"], row["Aufgabe"],
+                row["Stunden"], start, end)))
+
+        if dept == "BILDGEBUNG" and settings["doppelte_bildgebungsaufgabe"]:
+            # Bildgebung MCAD/ECAD unterstützung anlegen
+            support_start = roll_to_business_day(row["Ende"] + timedelta(days=1))
+            support_end = roll_to_business_day(support_start + timedelta(days=14), how="backward")
+            jobs.append(CreateJob(
+                "Bildgebung - MCAD/ECAD Unterstützung",
+                create_project_task_for_department, (
+                    project, dept, "BILDGEBUNG",
+                    "Bildgebung - MCAD/ECAD Unterstützung", row["Stunden"],
+                    support_start.strftime(fmt), support_end.strftime(fmt))))
+
+    if settings["mcad_ecad_freigabeaufgabe"]:
+        for dept in ("MCAD", "ECAD"):
+            if dept in edited["Abteilung"].values:
+                jobs.append(CreateJob(
+                    f"{dept} - Interne Freigabe",
+                    create_project_task_for_department, (
+                        project, dept, map_leistungsart(dept),
+                        f"{dept} - Interne Freigabe", 0,
+                        ms["G7"].strftime(fmt), ms["G7"].strftime(fmt))))
+
+    # Meilenstein DISPATCH anlegen
+    jobs.append(CreateJob("MS Dispatch", create_dispatch_milestone, (
+        project, projektleiter, ms["G8"].strftime(fmt), ms["G8"].strftime(fmt))))
+
+    # Support-Aufgabe: ab G8 für ein Jahr
+    support_end = ms["G8"] + timedelta(days=365)
+    jobs.append(CreateJob("Support", create_project_task_for_department, (
+        project, "INTRAVIS", "SONSTIGE", "Support", 0,
+        ms["G8"].strftime(fmt), support_end.strftime(fmt))))
+    for job in jobs:
+        job.project = project
+    return jobs
+
+
+def run_create_jobs(jobs: List[CreateJob],
+                    *,
+                    address: str | None = None,
+                    max_workers: int = 4,
+                    journal: Optional[CreateJournal] = None,
+                    journals: Optional[Dict[str, CreateJournal]] = None,
+                    on_done: Optional[Callable[[CreateJob, bool, str], None]] = None,
+                    ) -> Dict[str, Tuple[bool, str]]:
+    """
+    Sendet die `create`-Aufrufe mit höchstens `max_workers` gleichzeitigen
+    Requests. `on_done` wird im aufrufenden Thread je fertigem Job
+    aufgerufen (Live-Status), jedes Ergebnis landet sofort im Journal –
+    `journal` für einen Plan, `journals` ({Projekt: Journal}) für Jobs
+    mehrerer Projekte.
+
+    Returns
+    -------
+    {job.key: (erfolgreich, Meldung)}
+    """
+    address = resolve_address(address)
+    results: Dict[str, Tuple[bool, str]] = {}
+    if not jobs:
+        return results
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers),
+                            thread_name_prefix="abas-create") as pool:
+        futures = {pool.submit(run_in_worker, address, job.fn, *job.args): job
+                   for job in jobs}
+        for fut in as_completed(futures):
+            job = futures[fut]
+            res, errs = fut.result()
+            ok = bool(res) and bool(res.get("success"))
+            if errs:
+                message = "; ".join(errs)
+            elif not ok:
+                message = (res or {}).get("message", "ABAS meldet keinen Erfolg")
+            else:
+                message = ""
+            results[job.key] = (ok, message)
+            target = journal if journal is not None else (journals or {}).get(job.project)
+            if target is not None:
+                target.record(job.key, job.label, ok, message)
+            if on_done is not None:
+                on_done(job, ok, message)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# PORTFOLIO – Projektpläne für viele Projekte auf einmal
+# ---------------------------------------------------------------------------
+def parse_project_numbers(text: str) -> List[str]:
+    """Projekt-Nummern aus Freitext (Zeilen, Komma, Semikolon, Leerzeichen),
+    ohne Duplikate und in Eingabereihenfolge."""
+    for sep in ",;\t":
+        text = text.replace(sep, " ")
+    return list(dict.fromkeys(t.strip() for t in text.split() if t.strip()))
+
+
+def read_project_csv(raw: bytes) -> List[str]:
+    """Spalte mit „Projekt“ in der Kopfzeile, ohne Kopfzeile die erste Spalte."""
+    rows = [re.split(r"[;,\t]", line)
+            for line in raw.decode("utf-8-sig").splitlines() if line.strip()]
+    if not rows:
+        return []
+    col = next((i for i, c in enumerate(rows[0]) if "projekt" in c.lower()), None)
+    if col is not None:
+        rows = rows[1:]
+    col = col or 0
+    return parse_project_numbers(" ".join(r[col] for r in rows if len(r) > col))
+
+
+def load_projects(projects: List[str],
+                  *,
+                  address: str | None = None,
+                  max_workers: int = 8,
+                  memo: Optional[Dict[str, "ProjectData"]] = None,
+                  on_done: Optional[Callable[[str, bool], None]] = None,
+                  max_age: float | None = None,
+                  revalidate: bool = True,
+                  fresh: bool = False,
+                  ) -> Tuple[Dict[str, "ProjectData"], Dict[str, List[str]]]:
+    """
+    Projektdaten für viele Projekte: Projekt-Store zuerst (`memo`, z. B. die
+    Session, behält die Objekte, solange die Store-Version gleich bleibt),
+    die fehlenden Ketten (Gateway-Kopf → Termine + Kalkulation) parallel
+    aus ABAS.
+
+    Ist ein Store-Eintrag älter als `max_age` (default: Provider
+    ``store_revalidate_s``), wird er mit ``revalidate=True`` trotzdem
+    verwendet und im Hintergrund aktualisiert (wie `app.load_project_data`),
+    mit ``revalidate=False`` sofort neu geholt. ``fresh=True`` holt alle
+    Projekte neu aus ABAS.
+
+    Returns
+    -------
+    ({Projekt: ProjectData}, {Projekt: Fehlermeldungen})
+    """
+    address = resolve_address(address)
+    max_age = _providers["store_revalidate_s"]() if max_age is None else max_age
+    memo = {} if memo is None else memo
+    store = get_store()
+    data: Dict[str, ProjectData] = {}
+    errors: Dict[str, List[str]] = {}
+    missing = []
+    for p in projects:
+        stored = None if fresh else store.get(p)
+        stale = stored is not None and stored.age() > max_age
+        if stored is None or (stale and not revalidate):
+            missing.append(p)
+            continue
+        cached = memo.get(p)
+        if cached is None or cached.version != stored.version:
+            cached = memo[p] = ProjectData.from_record(stored)
+        if stale:
+            revalidate_in_background(p, address=address)
+        data[p] = cached
+        if on_done is not None:
+            on_done(p, True)
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                thread_name_prefix="abas-portfolio") as pool:
+            futures = {pool.submit(run_in_worker, address, fetch_project_data, p): p
+                       for p in missing}
+            for fut in as_completed(futures):
+                p = futures[fut]
+                res, errs = fut.result()
+                if res is not None:
+                    res.version = store.put(p, res.to_record())
+                    data[p] = memo[p] = res
+                else:
+                    errors[p] = errs or ["keine Gateway-Informationen"]
+                if on_done is not None:
+                    on_done(p, res is not None)
+    return {p: data[p] for p in projects if p in data}, errors
+
+
+
+def build_portfolio_plan(data: Dict[str, ProjectData]) -> pd.DataFrame:
+    """
+    Standardpläne aller Projekte in einer Tabelle.
+
+    Die Terminregeln werden einmal für alle Projekte ausgewertet
+    (`CompiledDateRules.evaluate`, Form Projekte × Abteilungen); danach
+    werden nur noch die Abteilungen mit kalkulierten Stunden herausgegriffen.
+    """
+    columns = ["Projekt", "Abteilung", "Stunden", "Aufgabe", "Start", "Ende"]
+    if not data:
+        return pd.DataFrame(columns=columns)
+
+    projects = list(data)
+    hours = pd.DataFrame(
+        [extract_department_hours(data[p].calc_hours) for p in projects],
+        index=pd.Index(projects, name="Projekt"),
+    )
+    long = hours.reset_index().melt(id_vars="Projekt", var_name="Abteilung",
+                                    value_name="Stunden")
+    long = long[(long["Stunden"] > 0) & (long["Abteilung"] != "PRODUCT DEVELOPMENT")]
+
+    rules = date_rules()
+    start, end = rules.evaluate(
+        {g: [data[p].milestones.get(g) for p in projects] for g in ("G6", "G7", "G8")},
+        calendar=business_calendar(),
+    )
+    row = long["Projekt"].map({p: i for i, p in enumerate(projects)}).to_numpy()
+    col = long["Abteilung"].map({d: i for i, d in enumerate(rules.departments)})
+    known = col.notna().to_numpy()
+    col = col.fillna(0).astype(int).to_numpy()
+    nat = np.datetime64("NaT", "D")
+    long["Start"] = pd.to_datetime(np.where(known, start[row, col], nat))
+    long["Ende"] = pd.to_datetime(np.where(known, end[row, col], nat))
+    long["Aufgabe"] = long["Abteilung"].map(task_names())
+
+    long["_pos"] = row                               # Eingabereihenfolge
+    return long.sort_values(["_pos", "Start"]).reset_index(drop=True)[columns]
+
+
+# ---------------------------------------------------------------------------
+# KAPAZITÄT – geplante Stunden je Abteilung und Kalenderwoche
+# ---------------------------------------------------------------------------
+CAPACITY_GROUPS = ("Abteilung", "Leistungsart")
+
+
+def capacity_by_week(plan: pd.DataFrame, *, by: str = "Abteilung") -> pd.DataFrame:
+    """
+    Verteilt die Stunden jeder Aufgabe gleichmässig auf ihre Werktage
+    (Firmenkalender) und summiert je Abteilung bzw. Leistungsart und
+    Kalenderwoche.
+
+    Alles spaltenweise: Werktage je Aufgabe und Woche kommen in einem Schritt
+    aus `BusinessCalendar.count_in_bins` (Aufgaben × Wochen), die Summe je
+    Gruppe ist ein Matrixprodukt – keine Schleife über Zeilen.
+
+    Parameters
+    ----------
+    plan : Spalten ``Abteilung``, ``Stunden``, ``Start``, ``Ende`` – z. B.
+           `build_portfolio_plan`
+    by   : ``"Abteilung"`` oder ``"Leistungsart"`` (über `LEISTUNGSARTEN`)
+
+    Returns
+    -------
+    pd.DataFrame Gruppen × Wochen (Montag als Spaltenkopf), Stunden als float.
+    Aufgaben ohne Werktag (fehlendes Datum, Ende vor Start) fehlen; ihre
+    Anzahl steht in ``.attrs["skipped"]``.
+    """
+    if by not in CAPACITY_GROUPS:
+        raise ValueError(f"by muss eine von {CAPACITY_GROUPS} sein, nicht {by!r}")
+    cal = business_calendar()
+    start = pd.to_datetime(plan["Start"], errors="coerce")
+    end = pd.to_datetime(plan["Ende"], errors="coerce")
+    hours = pd.to_numeric(plan["Stunden"], errors="coerce").fillna(0).to_numpy(float)
+    days = cal.count(start, end)
+    valid = (days > 0) & (hours > 0)
+    skipped = int((~valid & (hours > 0)).sum())
+
+    if not valid.any():
+        out = pd.DataFrame(index=pd.Index([], name=by), columns=pd.DatetimeIndex([]),
+                           dtype=float)
+        out.attrs["skipped"] = skipped
+        return out
+
+    start, end = start[valid], end[valid]
+    first = start.min().normalize()
+    edges = pd.date_range(first - pd.Timedelta(days=first.weekday()),
+                          end.max().normalize() + pd.Timedelta(days=7), freq="W-MON")
+    per_week = cal.count_in_bins(start, end, edges)               # Aufgaben × Wochen
+    per_week = per_week * (hours[valid] / days[valid])[:, None]
+
+    keys = plan.loc[valid, "Abteilung"].astype(str).str.upper()
+    if by == "Leistungsart":
+        keys = keys.map({k: map_leistungsart(k, default="SONSTIGE") for k in keys.unique()})
+    codes, groups = pd.factorize(keys)
+    matrix = np.eye(len(groups))[:, codes] @ per_week             # Gruppen × Wochen
+
+    order = ([d for d in ALL_DEPTS if d in groups] + sorted(set(groups) - set(ALL_DEPTS))
+             if by == "Abteilung" else sorted(groups))
+    out = pd.DataFrame(matrix, index=pd.Index(groups, name=by),
+                       columns=edges[:-1]).loc[order]
+    out.attrs["skipped"] = skipped
+    return out
@@ -0,0 +1,180 @@
+"""
+Schema-Register der ABAS-Infosysteme und -Abfragen.
+
+Je Infosystem bzw. Abfrage (Schlüssel wie `transport.endpoint_of`) steht hier
+einmal, welche Felder abgefragt werden, wie sie in der Oberfläche heissen,
+in welcher Reihenfolge sie erscheinen und welchen Typ sie haben. Die
+Payloads (`table_fields`/`fields`, Reihenfolge der `Field`-Liste) und die
+Anzeige (`order`) lesen beide daraus.
+
+`TableSchema.decode` baut aus der Zeilenliste der Antwort spaltenweise ein
+typisiertes DataFrame:
+
+* ``category`` – wenige verschiedene Werte (Phase, Ampel, Kunde …) als
+  Categorical, spart Speicher und beschleunigt Filter,
+* ``date``     – vektorisiert mit festem Format ``%d.%m.%Y`` (ungültig → NaT),
+* ``number``   – float64 (ungültig → NaN),
+* ``text``     – unverändert (String-Dtype von pandas).
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import pandas as pd
+
+from .stream import ColumnarTable
+
+DATE_FORMAT = "%d.%m.%Y"
+KINDS = ("text", "category", "date", "number")
+
+
+@dataclass(frozen=True)
+class Field:
+    name: str               # ABAS-Feldname, z. B. "tprojekt^nummer"
+    label: str              # Spaltenname in der Anzeige
+    kind: str = "text"
+
+    def __post_init__(self):
+        if self.kind not in KINDS:
+            raise ValueError(f"{self.name}: unbekannter Typ {self.kind!r} "
+                             f"(erlaubt: {', '.join(KINDS)})")
+
+
+class TableSchema:
+
+    def __init__(self, fields: Sequence[Field], order: Sequence[str] | None = None):
+        self.fields: Tuple[Field, ...] = tuple(fields)
+        self._by_label = {f.label: f for f in self.fields}
+        self.order: Tuple[str, ...] = tuple(order) if order else tuple(self._by_label)
+        unknown = set(self.order) - set(self._by_label)
+        if unknown:
+            raise ValueError(f"Reihenfolge nennt unbekannte Spalten: {sorted(unknown)}")
+
+    @property
+    def names(self) -> List[str]:
+        """ABAS-Feldnamen für `table_fields` bzw. `fields` im Payload."""
+        return [f.name for f in self.fields]
+
+    def decode(self, rows: Iterable[Mapping[str, Any]],
+               columns: Sequence[str] | None = None) -> pd.DataFrame:
+        """
+        Zeilen der ABAS-Antwort → typisiertes DataFrame.
+
+        Parameters
+        ----------
+        rows    : ``result_data["table"]`` (Zeilen-dicts oder `ColumnarTable`)
+                  bzw. ``result_data``
+        columns : Anzeige-Reihenfolge (Labels); default: `order`
+
+        Returns
+        -------
+        pd.DataFrame mit den Labels als Spalten; Felder, die in keiner Zeile
+        vorkommen, werden ausgelassen.
+        """
+        cols = rows.columns if isinstance(rows, ColumnarTable) else None
+        if cols is None:
+            rows = rows if isinstance(rows, list) else list(rows)
+        data: Dict[str, Any] = {}
+        for label in (columns if columns is not None else self.order):
+            f = self._by_label[label]
+            if cols is not None:
+                values = cols.get(f.name)
+                if values is None and len(rows):
+                    continue
+            else:
+                if rows and not any(f.name in r for r in rows):
+                    continue
+                values = [r.get(f.name) for r in rows]
+            data[f.label] = _convert(values or [], f.kind)
+        return pd.DataFrame(data)
+
+
+def _convert(values: List[Any], kind: str):
+    if kind == "category":
+        return pd.Categorical(values)
+    if kind == "date":
+        return pd.to_datetime(pd.Series(values, dtype=object), format=DATE_FORMAT,
+                              errors="coerce")
+    if kind == "number":
+        return pd.to_numeric(pd.Series(values, dtype=object),
+                             errors="coerce").astype("float64")
+    return pd.Series(values)
+
+
+_GATEWAY = TableSchema([
+    Field("tprojekt^nummer", "Projekt-Nr."),
+    Field("tserprod^nummer", "Serviceprodukt", "category"),
+    Field("tprojektname^name", "Projektname"),
+    Field("tprjphase^name", "Phase", "category"),
+    Field("ytaktgw", "Gateway", "category"),
+    Field("ygwinfo", "Gateway-Info"),
+    Field("ytprjampel", "Ampel", "category"),
+    Field("ytkundeans^name", "Kunde", "category"),
+    Field("ytstandortans^name", "Standort", "category"),
+    Field("ytprjverantw^such", "Verantwortlich", "category"),
+], order=["Projekt-Nr.", "Serviceprodukt", "Projektname", "Phase", "Ampel",
+          "Gateway", "Gateway-Info", "Kunde", "Standort", "Verantwortlich"])
+
+# Schlüssel wie `transport.endpoint_of`: Infosystem-Name, Datenbank:Gruppe,
+# "read" für den Gateway-Datensatz (einziges read im Dashboard)
+SCHEMAS: Dict[str, TableSchema] = {
+    "GATEWAYDASHBOARD": _GATEWAY,
+    "DISPATCH": TableSchema([
+        Field("ytprojekt^nummer", "Projekt-Nr."),
+        Field("ytserprod^nummer", "Serviceprodukt", "category"),
+        Field("ytserprodname^name", "Systemtyp", "category"),
+        Field("ytwarenempfname^name", "Empfänger", "category"),
+        Field("ytdispatch", "Dispatch", "date"),
+    ], order=["Dispatch", "Projekt-Nr.", "Serviceprodukt", "Systemtyp", "Empfänger"]),
+    "10345": TableSchema([
+        Field("taufgabe^nummer", "Nummer"),
+        Field("taufgabe^projekt^nummer", "Projektnummer", "category"),
+        Field("taufgabe^yprojektname^namebspr", "Projektname", "category"),
+        Field("taufgabe^start", "Startdatum", "date"),
+        Field("taufgabe^end", "Enddatum", "date"),
+        Field("taufgabenname^namebspr", "Aufgabenbeschreibung"),
+        Field("tbestaetigername^namebspr", "von", "category"),
+    ], order=["Nummer", "von", "Projektnummer", "Projektname",
+              "Startdatum", "Enddatum", "Aufgabenbeschreibung"]),
+    "PRJMLM": TableSchema([
+        Field("yadatum", "Datum", "date"),
+        Field("ystdtats", "Stundenzahl", "number"),
+        Field("ytprojekt^nummer", "Projekt-Nr.", "category"),
+        Field("ytprojekt^namebspr", "Leistungsmeldung"),
+    ]),
+    "PRJM5080LISTE": TableSchema([
+        Field("ytprojekt^nummer", "Projektnummer"),
+        Field("ytprojname^namebspr", "Projektname"),
+        Field("ytfortistbudget", "Buchung in Prozent des Budgets (%)", "number"),
+        Field("ytsollstd", "Budget", "number"),
+        Field("ytiststd", "Gebucht", "number"),
+    ], order=["Projektnummer", "Buchung in Prozent des Budgets (%)", "Projektname",
+              "Budget", "Gebucht"]),
+    "32:00": TableSchema([
+        Field("nummer", "Gateway-Nr."),
+        Field("id", "Gateway-ID"),
+        Field("ycalc^nummer", "Kalkulation"),
+    ]),
+    "41:00": TableSchema([
+        Field("yprjmcad", "MCAD", "number"),
+        Field("yprjauto", "AUTOMATION", "number"),
+        Field("yprjecad", "ECAD", "number"),
+        Field("yprjbild", "BILDGEBUNG", "number"),
+        Field("yprjas", "PROJECTMANAGEMENT", "number"),
+        Field("yprjpm", "PRODUCT DEVELOPMENT", "number"),
+        Field("yprjtd", "TD", "number"),
+        Field("yprjsoft", "SOFTWARE", "number"),
+    ]),
+    "read": TableSchema([
+        Field("ytzid", "Gateway"),
+        Field("ytname", "Name"),
+        Field("ytenddate", "Ende", "date"),
+    ]),
+}
+
+
+def decode_table(key: str, result: Mapping[str, Any] | None,
+                 columns: Sequence[str] | None = None) -> pd.DataFrame | None:
+    """Tabelle einer erfolgreichen Infosystem-Antwort dekodieren (sonst None)."""
+    if not result or not result.get("success"):
+        return None
+    return SCHEMAS[key].decode(result["result_data"]["table"], columns)
@@ -0,0 +1,184 @@
+"""
+settings.json als unveränderlicher, validierter Snapshot.
+
+Bisher hat jeder Rerun die Datei gelesen, mit einer tiefen Kopie der
+Defaults gemischt und daraus die Session-Konfiguration neu gebaut.
+`SettingsFile` hält stattdessen einen Snapshot pro Prozess:
+
+* `snapshot()` prüft nur per ``os.stat`` (mtime, Grösse, Inode), ob sich
+  die Datei geändert hat – gelesen, gemischt und validiert wird nur dann,
+* der Snapshot ist tief eingefroren (`MappingProxyType`, Tupel) und damit
+  gefahrlos zwischen Sessions und Threads teilbar; zum Bearbeiten liefert
+  `to_dict()` eine veränderbare Kopie,
+* `save()` schreibt atomar (Temp-Datei + ``os.replace``) und zählt
+  ``_revision`` hoch. Mit ``base_version`` schlägt das Speichern fehl, wenn
+  ein anderer Prozess oder eine andere Session zwischenzeitlich gespeichert
+  hat (`SettingsConflictError`).
+
+Andere Worker-Prozesse sehen die Änderung beim nächsten `snapshot()`, weil
+sich mtime und Inode der Datei ändern.
+"""
+import json
+import os
+import stat
+import tempfile
+import threading
+from copy import deepcopy
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+REVISION_KEY = "_revision"
+
+# validate(settings) korrigiert das (veränderbare) dict und liefert Warnungen
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+
+class SettingsConflictError(RuntimeError):
+    """Die Datei wurde seit dem bearbeiteten Stand von anderer Seite gespeichert."""
+
+
+def freeze(value: Any) -> Any:
+    """dicts → MappingProxyType, Listen → Tupel (rekursiv)."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Umkehrung von `freeze` – JSON-taugliche, veränderbare Kopie."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True, eq=False)
+class SettingsSnapshot:
+    data: Mapping[str, Any]
+    version: int                         # ``_revision`` der Datei (0 = nie gespeichert)
+    stamp: Tuple[int, ...] | None        # (mtime_ns, size, inode) bzw. None ohne Datei
+    warnings: Tuple[str, ...] = field(default=())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data
+
+    def to_dict(self) -> Dict[str, Any]:
+        return thaw(self.data)
+
+
+def _stamp(path: Path) -> Tuple[int, ...] | None:
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (info.st_mtime_ns, info.st_size, info.st_ino)
+
+
+def merge(defaults: Mapping[str, Any], user: Mapping[str, Any]) -> Dict[str, Any]:
+    """Defaults flach plus eine Ebene verschachtelt überschreiben."""
+    settings = deepcopy(dict(defaults))
+    for k, v in user.items():
+        if isinstance(v, dict) and isinstance(settings.get(k), dict):
+            settings[k].update(v)
+        else:
+            settings[k] = v
+    return settings
+
+
+class SettingsFile:
+
+    def __init__(self, path: str | Path, defaults: Mapping[str, Any],
+                 *, validate: Validator | None = None):
+        self.path = Path(path)
+        self._defaults = deepcopy(dict(defaults))
+        self._validate = validate
+        self._lock = threading.Lock()
+        self._snap: SettingsSnapshot | None = None
+
+    def snapshot(self) -> SettingsSnapshot:
+        """Aktueller Stand; liest die Datei nur nach einer Änderung neu."""
+        stamp = _stamp(self.path)
+        snap = self._snap
+        if snap is not None and snap.stamp == stamp:
+            return snap
+        with self._lock:
+            if self._snap is None or self._snap.stamp != _stamp(self.path):
+                self._snap = self._load()
+            return self._snap
+
+    def _load(self) -> SettingsSnapshot:
+        warnings: List[str] = []
+        user: Dict[str, Any] = {}
+        stamp = _stamp(self.path)
+        if stamp is not None:
+            try:
+                raw = json.loads(self.path.read_text("utf-8"))
+                if not isinstance(raw, dict):
+                    raise ValueError("kein JSON-Objekt")
+                user = raw
+            except (ValueError, OSError) as e:
+                if self._snap is not None and self._snap.stamp is not None:
+                    # halb geschriebene/defekte Datei: letzten guten Stand behalten
+                    warnings.append(f"settings.json defekt ({e}) – "
+                                    "benutze den zuletzt gelesenen Stand")
+                    return SettingsSnapshot(self._snap.data, self._snap.version,
+                                            stamp, tuple(warnings))
+                warnings.append(f"settings.json defekt ({e}) – benutze Defaults")
+        version = int(user.pop(REVISION_KEY, 0) or 0)
+        settings = merge(self._defaults, user)
+        if self._validate is not None:
+            warnings += self._validate(settings)
+        return SettingsSnapshot(freeze(settings), version, stamp, tuple(warnings))
+
+    def save(self, settings: Mapping[str, Any], *,
+             base_version: int | None = None) -> SettingsSnapshot:
+        """
+        Schreibt `settings` atomar und liefert den neuen Snapshot.
+
+        Parameters
+        ----------
+        settings     : vollständige Einstellungen (z. B. `to_dict()` + Änderungen)
+        base_version : Version, auf der die Änderung beruht; weicht die Datei
+                       davon ab, wird nicht geschrieben
+
+        Raises
+        ------
+        SettingsConflictError
+        """
+        with self._lock:
+            current = self._load() if _stamp(self.path) is not None else None
+            on_disk = current.version if current is not None else 0
+            if base_version is not None and base_version != on_disk:
+                raise SettingsConflictError(
+                    f"settings.json wurde inzwischen geändert (Version {on_disk}, "
+                    f"bearbeitet wurde {base_version})"
+                )
+            data = {**thaw(settings), REVISION_KEY: on_disk + 1}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            mode = (stat.S_IMODE(os.stat(self.path).st_mode)
+                    if current is not None else 0o644)
+            fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=".settings-",
+                                       suffix=".tmp")
+            try:
+                os.chmod(tmp, mode)             # mkstemp legt 0600 an
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            self._snap = self._load()
+            return self._snap
@@ -0,0 +1,114 @@
+"""
+Zusammenlegen gleichzeitiger, identischer Requests („single flight“).
+
+Fragen mehrere Sessions bzw. Threads denselben Schlüssel an, während der
+erste Aufruf noch läuft, führt nur dieser („Leader“) die Funktion aus; alle
+anderen warten und bekommen dasselbe Ergebnis bzw. dieselbe Exception.
+Abgeschlossene Aufrufe werden nicht gespeichert – das ist Aufgabe des Caches.
+
+`AsyncSingleFlight` macht dasselbe für Coroutines einer Event-Loop.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Führt `fn` höchstens einmal gleichzeitig je `key` aus.
+
+        Returns
+        -------
+        (result, shared)
+            `shared` ist True, wenn das Ergebnis von einem anderen, bereits
+            laufenden Aufruf stammt.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._calls), "leaders": self.leaders,
+                    "shared": self.shared}
+
+
+class AsyncSingleFlight:
+    """`SingleFlight` für Coroutines – Wartende blockieren keinen Thread."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.leaders = 0
+        self.shared = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Wie `SingleFlight.do`; `fn` liefert eine Coroutine."""
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)                   # Futures gehören zu ihrer Loop
+        call = self._calls.get(slot)
+        if call is not None:
+            self.shared += 1
+            return await asyncio.shield(call), True
+
+        call = self._calls[slot] = loop.create_future()
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except BaseException as exc:
+            call.set_exception(exc)
+            call.exception()                     # ohne Wartende kein "never retrieved"
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            del self._calls[slot]
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders,
+                "shared": self.shared}
@@ -0,0 +1,161 @@
+"""
+Persistenter Speicher für Projekt-Stammdaten (SQLite).
+
+Gateway-Kopf (`get_gateway_info`), Gateway-Termine G6/G7/G8 und
+Kalkulationsstunden ändern sich selten, werden aber bei jedem Öffnen eines
+Projekts abgefragt. Der Store hält sie über Neustarts hinweg:
+
+* je Projekt ein JSON-Datensatz mit Abrufzeit,
+* `version` wird nur hochgezählt, wenn sich der Inhalt tatsächlich ändert
+  (Prüfsumme) – Sessions erkennen so günstig, ob ihr Stand veraltet ist,
+* `SCHEMA` verwirft Einträge eines älteren Formats.
+
+Ablageort: ``PJM_STORE_PATH`` (Umgebungsvariable), sonst ``store/`` neben
+dem Code.
+
+Die Hintergrund-Aktualisierung selbst steuert der Aufrufer
+(`pjm.revalidate_in_background`), der Store sorgt mit `claim_refresh` nur
+dafür, dass pro Projekt höchstens eine läuft.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Set
+
+# Ausserhalb des Code-Verzeichnisses ablegen (z. B. auf einem Volume), sonst
+# geht der Store mit jedem neuen Container verloren
+STORE_PATH = Path(os.environ.get("PJM_STORE_PATH")
+                  or Path(__file__).parent.parent / "store" / "projects.sqlite")
+SCHEMA = 1
+
+
+@dataclass(frozen=True)
+class StoredProject:
+    project: str
+    version: int
+    fetched_at: float           # time.time() des letzten erfolgreichen Abrufs
+    data: Dict[str, Any]
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class ProjectStore:
+
+    def __init__(self, path: str | Path = STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()          # eine Verbindung je Thread
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        with self._conn() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS projects (
+                    project     TEXT PRIMARY KEY,
+                    schema      INTEGER NOT NULL,
+                    version     INTEGER NOT NULL,
+                    digest      TEXT NOT NULL,
+                    fetched_at  REAL NOT NULL,
+                    data        TEXT NOT NULL
+                )""")
+
+    def _conn(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.path, timeout=10)
+            con.execute("PRAGMA journal_mode=WAL")     # Leser blockieren Schreiber nicht
+            self._local.con = con
+        return con
+
+    def get(self, project: str) -> StoredProject | None:
+        row = self._conn().execute(
+            "SELECT version, fetched_at, data FROM projects "
+            "WHERE project = ? AND schema = ?", (project, SCHEMA)
+        ).fetchone()
+        if row is None:
+            return None
+        return StoredProject(project, row[0], row[1], json.loads(row[2]))
+
+    def version(self, project: str) -> int | None:
+        """Nur die Versionsnummer – billig genug für jeden Rerun."""
+        row = self._conn().execute(
+            "SELECT version FROM projects WHERE project = ? AND schema = ?",
+            (project, SCHEMA)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, project: str, data: Dict[str, Any]) -> int:
+        """
+        Speichert einen frisch abgerufenen Stand.
+
+        Returns
+        -------
+        int
+            Version des Eintrags – unverändert, wenn sich nur die Abrufzeit
+            geändert hat.
+        """
+        raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        now = time.time()
+        with self._conn() as con:
+            row = con.execute(
+                "SELECT version, digest, schema FROM projects WHERE project = ?",
+                (project,)
+            ).fetchone()
+            if row is not None and row[1] == digest and row[2] == SCHEMA:
+                con.execute("UPDATE projects SET fetched_at = ? WHERE project = ?",
+                            (now, project))
+                return row[0]
+            version = (row[0] + 1) if row is not None else 1
+            con.execute(
+                "INSERT OR REPLACE INTO projects "
+                "(project, schema, version, digest, fetched_at, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (project, SCHEMA, version, digest, now, raw),
+            )
+            return version
+
+    def delete(self, project: str):
+        with self._conn() as con:
+            con.execute("DELETE FROM projects WHERE project = ?", (project,))
+
+    def claim_refresh(self, project: str) -> bool:
+        """True für genau einen Aufrufer, solange keine Aktualisierung läuft."""
+        with self._lock:
+            if project in self._refreshing:
+                return False
+            self._refreshing.add(project)
+            return True
+
+    def release_refresh(self, project: str):
+        with self._lock:
+            self._refreshing.discard(project)
+
+    def stats(self) -> Dict[str, Any]:
+        count, oldest = self._conn().execute(
+            "SELECT COUNT(*), MIN(fetched_at) FROM projects WHERE schema = ?", (SCHEMA,)
+        ).fetchone()
+        with self._lock:
+            refreshing = len(self._refreshing)
+        return {"projects": count,
+                "oldest_age_h": round((time.time() - oldest) / 3600, 1) if oldest else 0.0,
+                "refreshing": refreshing,
+                "path": str(self.path)}
+
+
+_store: ProjectStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> ProjectStore:
+    """Prozessweiter Store unter `STORE_PATH`."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ProjectStore()
+        return _store
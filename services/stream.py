@@ -0,0 +1,236 @@
+"""
+Streamende JSON-Dekodierung für grosse Infosystem-Antworten.
+
+`resp.json()` hält erst den kompletten Body (bytes), dann den kompletten
+Baum mit einem dict je Zeile – pandas kopiert das danach noch einmal. Bei
+GATEWAYDASHBOARD (Sold Phase) oder langen PRJMLM-Historien sind das
+tausende Zeilen.
+
+`decode_response` liest den Body stattdessen stückweise (``stream=True``,
+gzip wird dabei von urllib3 entpackt) und hängt die Zeilen aus
+``result_data.table`` direkt an Spaltenlisten an (`ColumnarTable`). Der Rest
+der Antwort (``success``, ``message`` …) bleibt ein normales dict.
+
+Backends, jeweils optional:
+
+* ``ijson`` (am besten mit yajl2_c) – echtes Streaming,
+* ``orjson`` – schnelles Parsen, wenn der Body schon vollständig vorliegt
+  (Cassette, kein ijson, asynchroner Client),
+* sonst ``json`` aus der Standardbibliothek.
+"""
+import json
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple
+
+try:
+    import ijson
+except ImportError:                       # pragma: no cover - optional
+    ijson = None
+
+try:
+    import orjson
+except ImportError:                       # pragma: no cover - optional
+    orjson = None
+
+CHUNK_SIZE = 64 * 1024
+# Kleinere Bodies (laut Content-Length) am Stück parsen – dort ist orjson
+# schneller und der Speicher kein Thema.
+STREAM_MIN_BYTES = 256 * 1024
+TABLE_PATH = ["result_data", "table"]
+
+
+def loads(raw: bytes | str) -> Any:
+    """JSON parsen – mit orjson, falls installiert."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def backend() -> str:
+    """Aktives Backend für Anzeige und Metriken."""
+    if ijson is not None:
+        return f"ijson/{ijson.backend}"
+    return "orjson" if orjson is not None else "json"
+
+
+class ColumnarTable(Sequence):
+    """
+    Tabelle als ``{Feld: [Werte …]}``.
+
+    Verhält sich nach aussen wie die gewohnte Liste von Zeilen-dicts
+    (`len`, Index, Iteration erzeugen die Zeile bei Bedarf), spart aber
+    das dict je Zeile. `services.schema` liest die Spalten direkt.
+    """
+
+    __slots__ = ("columns", "_n")
+
+    def __init__(self):
+        self.columns: Dict[str, List[Any]] = {}
+        self._n = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> "ColumnarTable":
+        table = cls()
+        for row in rows:
+            table.append(row)
+        return table
+
+    def put(self, name: str, value: Any):
+        """Wert der aktuellen Zeile; neue Felder werden nach oben mit None aufgefüllt."""
+        col = self.columns.get(name)
+        if col is None:
+            col = self.columns[name] = [None] * self._n
+        col.append(value)
+
+    def end_row(self):
+        self._n += 1
+        for col in self.columns.values():
+            if len(col) < self._n:
+                col.append(None)
+
+    def append(self, row: Mapping[str, Any]):
+        for name, value in row.items():
+            self.put(name, value)
+        self.end_row()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._n))]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return {name: col[i] for name, col in self.columns.items()}
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable({self._n} Zeilen, {list(self.columns)})"
+
+
+def columnar(data: Any) -> Any:
+    """``result_data.table`` einer fertig geparsten Antwort in Spalten umbauen."""
+    result = data.get("result_data") if isinstance(data, dict) else None
+    if isinstance(result, dict) and isinstance(result.get("table"), list):
+        result["table"] = ColumnarTable.from_rows(result["table"])
+    return data
+
+
+class _Reader:
+    """Dateiartiger Leser über `resp.raw` – entpackt gzip und zählt Bytes."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self.nbytes = 0
+
+    def read(self, n: int = CHUNK_SIZE) -> bytes:
+        chunk = self._raw.read(n, decode_content=True)
+        self.nbytes += len(chunk)
+        return chunk
+
+
+def _read_rows(table: ColumnarTable, events: Iterator[Tuple[str, Any]]):
+    """
+    Zeilen-Ereignisse bis zum Ende des Arrays in `table` übernehmen.
+
+    Heisse Schleife (ein Durchlauf je Zelle) – deshalb ohne `put`/`end_row`
+    und ohne Prefix-Strings; aufgefüllt wird nur, wenn einer Zeile Felder
+    fehlen.
+    """
+    cols = table.columns
+    n = table._n
+    key, filled, in_row = None, 0, False
+    for event, value in events:
+        if event == "map_key":
+            key = value
+        elif event == "end_map":
+            n += 1
+            if filled != len(cols):
+                for col in cols.values():
+                    if len(col) < n:
+                        col.append(None)
+            filled, in_row = 0, False
+        elif event == "start_map" and not in_row:
+            in_row = True
+        elif event == "end_array" and not in_row:
+            table._n = n
+            return
+        elif event in ("start_map", "start_array"):
+            raise ValueError("verschachtelte Tabellenzelle wird nicht unterstützt")
+        else:
+            col = cols.get(key)
+            if col is None:
+                col = cols[key] = [None] * n
+            col.append(value)
+            filled += 1
+    raise ValueError("Tabelle unvollständig")
+
+
+def _parse_events(events: Iterator[Tuple[str, Any]]) -> Any:
+    """
+    ijson-Ereignisse → Antwort-dict; Zeilen von ``result_data.table`` gehen
+    direkt in eine `ColumnarTable`, alles andere baut `ObjectBuilder`.
+    """
+    builder = ijson.ObjectBuilder()
+    table: ColumnarTable | None = None
+    path: List[Any] = []                       # Schlüssel der offenen Container
+    for event, value in events:
+        if event == "start_array" and path == TABLE_PATH:
+            table = ColumnarTable()
+            _read_rows(table, events)
+            builder.event("null", None)             # Platzhalter, s. unten
+            continue
+        if event == "map_key":
+            path[-1] = value
+        elif event in ("start_map", "start_array"):
+            path.append(None)
+        elif event in ("end_map", "end_array"):
+            path.pop()
+        builder.event(event, value)
+    data = builder.value
+    if table is not None:
+        data["result_data"]["table"] = table
+    return data
+
+
+def decode_response(resp) -> Tuple[Any, int]:
+    """
+    JSON einer `requests`-Antwort dekodieren, Tabellenzeilen spaltenweise.
+
+    Parameters
+    ----------
+    resp : mit ``stream=True`` abgeschickte Antwort; ist der Body bereits
+           gelesen (Cassette), kleiner als `STREAM_MIN_BYTES` oder fehlt
+           ijson, wird er am Stück geparst.
+
+    Returns
+    -------
+    (Antwort, Anzahl gelesener Bytes nach dem Entpacken)
+
+    Raises
+    ------
+    ValueError bei ungültigem JSON (wie `json.loads`).
+    """
+    raw = getattr(resp, "raw", None)
+    length = resp.headers.get("Content-Length")
+    small = (length is not None and length.isdigit()
+             and "Content-Encoding" not in resp.headers
+             and int(length) < STREAM_MIN_BYTES)
+    if ijson is None or raw is None or resp._content_consumed or small:
+        content = resp.content
+        return columnar(loads(content)), len(content)
+
+    reader = _Reader(raw)
+    try:
+        data = _parse_events(iter(ijson.basic_parse(reader, buf_size=CHUNK_SIZE,
+                                                     use_float=True)))
+    except ijson.JSONError as exc:
+        raise ValueError(f"Ungültiges JSON: {exc}") from exc
+    finally:
+        while reader.read():            # Rest lesen → Verbindung zurück in den Pool
+            pass
+    return data, reader.nbytes
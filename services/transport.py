@@ -0,0 +1,801 @@
+"""
+Prozessweiter HTTP-Transport für alle ABAS-Aufrufe.
+
+Alle Streamlit-Sessions und Reruns teilen sich eine `requests.Session` mit
+Connection-Pool (Keep-Alive), Retry und Backoff. Damit wird pro Host nur noch
+eine Handvoll TCP-Verbindungen aufgebaut statt einer pro Request.
+
+`apost` / `arequest_json` sind die Gegenstücke für den asynchronen Client
+(`httpx.AsyncClient`, services/abas_async.py). Sie teilen Governor, Breaker
+mit Stale-Rückfall, Lese-Cache, Cassette und Metriken mit dem synchronen
+Pfad und warten per ``await``; httpx wird erst dort importiert.
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Set
+
+import requests
+from requests.adapters import HTTPAdapter, Retry
+
+from . import cassette as _cassette_mod
+from . import stream as _stream
+from .breaker import BreakerRegistry, CircuitBreaker, CircuitOpenError
+from .cache import TTLCache
+from .governor import READ, WRITE, Governor
+from .metrics import METRICS
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+if TYPE_CHECKING:                          # pragma: no cover
+    import httpx
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+# Lebensdauer (s) gecachter Lesezugriffe: Infosystem-Name bzw.
+# Datenbank:Gruppe bei `query`, "read" für Einzelsätze. Nicht aufgeführt
+# → nicht gecacht.
+DEFAULT_CACHE_TTL: Dict[str, float] = {
+    "GATEWAYDASHBOARD": 300,
+    "DISPATCH":         300,
+    "10345":             60,
+    "PRJMLM":           120,
+    "PRJM5080LISTE":    300,
+    "32:00":            600,
+    "41:00":            600,
+    "read":             600,
+}
+DEFAULT_CACHE_SIZE = 512
+
+DEFAULT_MAX_IN_FLIGHT = 8          # gleichzeitige Requests ans ERP
+DEFAULT_RATE = 20.0                # Requests/s (0 = unbegrenzt)
+DEFAULT_BURST = 10
+DEFAULT_WRITE_RESERVE = 2          # Plätze nur für Schreibzugriffe
+
+DEFAULT_BREAKER_THRESHOLD = 3       # aufeinanderfolgende Ausfälle bis "offen"
+DEFAULT_BREAKER_COOLDOWN = 30.0     # s bis zum nächsten Erholungs-Test
+
+# Infosysteme, die in ABAS etwas anlegen (z. B. Aufgaben freigeben)
+WRITE_INFOSYSTEMS = {"PRJMAUFAN"}
+
+PROJECT_FIELDS = {"yprojekt", "yproject"}
+PERSON_FIELDS = {"ypersonal", "prjleit", "yprjleit", "yprojleit", "bearbeit"}
+
+# Infosystem-Tabellen stückweise und spaltenweise dekodieren (s. stream.py)
+_stream_tables = True
+
+_lock = threading.Lock()
+_session: requests.Session | None = None
+_session_cfg: tuple | None = None
+
+_cassette = _cassette_mod.from_env()     # Aufnahme/Wiedergabe, s. cassette.py
+
+_cache = TTLCache(DEFAULT_CACHE_SIZE)
+_cache_ttl: Dict[str, float] = dict(DEFAULT_CACHE_TTL)
+
+# letzte gute Antwort je Lesezugriff (ohne Ablauf) – Rückfall bei Störungen
+_last_good = TTLCache(DEFAULT_CACHE_SIZE)
+_flight = SingleFlight()
+_aflight = AsyncSingleFlight()
+_probe_tasks: Set["asyncio.Task"] = set()      # Referenzen, sonst sammelt der GC
+_governor = Governor(max_in_flight=DEFAULT_MAX_IN_FLIGHT, rate=DEFAULT_RATE,
+                     burst=DEFAULT_BURST, write_reserve=DEFAULT_WRITE_RESERVE)
+_breakers = BreakerRegistry(threshold=DEFAULT_BREAKER_THRESHOLD,
+                            cooldown=DEFAULT_BREAKER_COOLDOWN)
+
+
+def make_retry_session(retries: int = DEFAULT_RETRIES,
+                       *,
+                       backoff: float = DEFAULT_BACKOFF,
+                       pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Baut eine Session mit Retry/Backoff und einem Pool von `pool_size`
+    Keep-Alive-Verbindungen je Host.
+
+    POST wird von urllib3 nur bei Verbindungsfehlern wiederholt (der Request
+    ist dann nie beim Server angekommen), nicht bei 5xx – ein `create` darf
+    keine doppelten Aufgaben erzeugen.
+    """
+    sess = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+    )
+    adapter = HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        pool_block=False,
+    )
+    sess.mount("http://", adapter)
+    sess.mount("https://", adapter)
+    return sess
+
+
+def configure(*,
+              pool_size: int = DEFAULT_POOL_SIZE,
+              retries: int = DEFAULT_RETRIES,
+              backoff: float = DEFAULT_BACKOFF):
+    """
+    Setzt die Pool-Parameter (z. B. aus settings.json). Nur wenn sich etwas
+    ändert, wird die Session neu gebaut und die alte geschlossen.
+    """
+    global _session, _session_cfg
+    cfg = (int(pool_size), int(retries), float(backoff))
+    with _lock:
+        if cfg == _session_cfg and _session is not None:
+            return
+        old = _session
+        _session = make_retry_session(cfg[1], backoff=cfg[2], pool_size=cfg[0])
+        _session_cfg = cfg
+    if old is not None:
+        old.close()
+
+
+def get_session() -> requests.Session:
+    """Die gemeinsame Session; wird beim ersten Zugriff mit Defaults angelegt."""
+    if _session is None:
+        configure()
+    return _session
+
+
+def configure_cassette(cassette: "_cassette_mod.Cassette | None"):
+    """Cassette zur Laufzeit setzen (z. B. im Benchmark); None schaltet ab."""
+    global _cassette
+    _cassette = cassette
+
+
+def _hold_until_closed(resp: requests.Response, stack: ExitStack):
+    """Governor-Platz erst mit `resp.close()` freigeben (gestreamter Body)."""
+    close = resp.close
+
+    def _close():
+        try:
+            close()
+        finally:
+            stack.close()                 # idempotent
+
+    resp.close = _close
+
+
+def _record_when_read(resp: requests.Response, cas: "_cassette_mod.Cassette",
+                      payload: dict, t0: float):
+    """
+    Gestreamten Body beim Lesen mitschneiden und erst mit `resp.close()`
+    aufzeichnen. So liest der Aufrufer weiter stückweise, und die
+    aufgezeichnete Laufzeit reicht bis zum letzten gelesenen Byte.
+    """
+    raw = resp.raw
+    chunks: list[bytes] = []
+    t_end = [t0]
+
+    def _note(chunk: bytes) -> bytes:
+        chunks.append(chunk)
+        t_end[0] = time.perf_counter()
+        return chunk
+
+    read = raw.read
+    raw.read = lambda *a, **kw: _note(read(*a, **kw))
+    read_chunked = getattr(raw, "read_chunked", None)
+    if read_chunked is not None:              # iter_content bei chunked-Antworten
+        raw.read_chunked = lambda *a, **kw: (_note(c) for c in read_chunked(*a, **kw))
+
+    close = resp.close
+    recorded = []
+
+    def _close():
+        try:
+            close()
+        finally:
+            if not recorded:
+                recorded.append(True)
+                cas.record(payload, status=resp.status_code, reason=resp.reason,
+                           content=b"".join(chunks), elapsed=t_end[0] - t0)
+
+    resp.close = _close
+
+
+def post(address: str, payload: dict, *, timeout: float,
+         session: requests.Session | None = None,
+         stream: bool = False) -> requests.Response:
+    """
+    POST über die gemeinsame (oder eine explizit übergebene) Session.
+
+    Einzige Stelle, an der Requests das Netz verlassen – hier hängen die
+    Drosselung (Governor, Schreib- vor Lesezugriffen) und die Cassette zum
+    Aufnehmen bzw. Abspielen von ABAS-Verkehr. Mit ``stream=True`` kehrt der
+    Aufruf nach den Headern zurück, der Body wird danach gelesen; der
+    Governor-Platz bleibt belegt, bis der Aufrufer die Antwort schliesst
+    (``resp.close()`` bzw. ``with resp:``).
+    """
+    with ExitStack() as stack:
+        stack.enter_context(_governor.slot(WRITE if is_write(payload) else READ))
+        cas = _cassette
+        if cas is not None and cas.mode == "replay":
+            return cas.replay(address, payload)
+
+        sess = session or get_session()
+        t0 = time.perf_counter()
+        try:
+            resp = sess.post(address, json=payload, timeout=timeout, stream=stream)
+        except requests.exceptions.RequestException as exc:
+            if cas is not None:
+                cas.record_error(payload, exc, time.perf_counter() - t0)
+            raise
+        if stream and not resp._content_consumed:
+            if cas is not None:
+                _record_when_read(resp, cas, payload, t0)
+            _hold_until_closed(resp, stack.pop_all())
+        elif cas is not None:
+            cas.record(payload, status=resp.status_code, reason=resp.reason,
+                       content=resp.content, elapsed=time.perf_counter() - t0)
+        return resp
+
+
+def configure_stream(enabled: bool = True):
+    """Streamende Dekodierung der Infosystem-Tabellen ein-/ausschalten."""
+    global _stream_tables
+    _stream_tables = bool(enabled)
+
+
+def is_table_read(payload: dict) -> bool:
+    """Infosystem-Lesezugriff – Antwort enthält ``result_data.table``."""
+    return payload.get("action") == "infosystem" and not is_write(payload)
+
+
+def configure_governor(*, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                       rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                       write_reserve: int = DEFAULT_WRITE_RESERVE):
+    _governor.configure(max_in_flight=max_in_flight, rate=rate, burst=burst,
+                        write_reserve=write_reserve)
+
+
+def governor_stats() -> Dict[str, Dict[str, Any]]:
+    return _governor.stats()
+
+
+def _governor_gauges():
+    for lane, st in _governor.stats().items():
+        labels = {"lane": lane}
+        yield "abas_queue_depth", labels, st["queued"]
+        yield "abas_in_flight", labels, st["in_flight"]
+        yield "abas_queue_wait_seconds_mean", labels, st["mean_wait_s"]
+        yield "abas_queue_wait_seconds_max", labels, st["max_wait_s"]
+
+
+METRICS.add_gauges(_governor_gauges)
+
+
+def configure_cache(*,
+                    ttl: Dict[str, float] | None = None,
+                    maxsize: int = DEFAULT_CACHE_SIZE):
+    """TTLs je Infosystem und maximale Anzahl Einträge setzen."""
+    global _cache_ttl
+    _cache_ttl = dict(DEFAULT_CACHE_TTL if ttl is None else ttl)
+    _cache.maxsize = int(maxsize)
+
+
+def cache_key(address: str, payload: dict) -> str:
+    """Kanonisches JSON – gleiche Abfrage ergibt unabhängig von der
+    Schlüsselreihenfolge denselben Schlüssel."""
+    return json.dumps([address, payload], sort_keys=True,
+                      separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def is_write(payload: dict) -> bool:
+    return (payload.get("action") == "create"
+            or payload.get("infosystem") in WRITE_INFOSYSTEMS)
+
+
+def endpoint_of(payload: dict) -> str:
+    """Infosystem-Name, Datenbank:Gruppe bei `query`, sonst die Aktion."""
+    action = payload.get("action")
+    if action == "infosystem":
+        return payload.get("infosystem") or "-"
+    if action == "query":
+        return payload.get("database_and_group") or "-"
+    return action or "-"
+
+
+def _ttl_for(payload: dict) -> float | None:
+    if payload.get("action") not in ("infosystem", "query", "read"):
+        return None
+    name = endpoint_of(payload)
+    if name in WRITE_INFOSYSTEMS:
+        return None
+    return _cache_ttl.get(name)
+
+
+def row_count(data: Any) -> int:
+    result = data.get("result_data") if isinstance(data, dict) else None
+    if isinstance(result, dict):
+        result = result.get("table")
+    return len(result) if isinstance(result, (list, dict, _stream.ColumnarTable)) else 0
+
+
+def _retries(res: requests.Response | None) -> int:
+    retries = getattr(getattr(res, "raw", None), "retries", None)
+    return len(getattr(retries, "history", ()) or ())
+
+
+def _tags(payload: dict, response: dict | None = None) -> Set[str]:
+    """
+    Projekt- und Personen-Tags aus Payload und (optional) Ergebniszeilen.
+    Eine Infosystem-Antwort wird so z. B. auch mit allen Projekten getaggt,
+    die in ihrer Tabelle vorkommen.
+    """
+    tags: Set[str] = set()
+
+    def _add(name: str, value: Any):
+        if value in (None, ""):
+            return
+        if name in PROJECT_FIELDS or name.endswith("projekt^nummer"):
+            tags.add(f"projekt:{value}")
+        elif name in PERSON_FIELDS:
+            tags.add(f"person:{value}")
+
+    for item in payload.get("data", []):
+        _add(item.get("name", ""), item.get("value"))
+    flt = payload.get("filter") or {}
+    _add(flt.get("name", ""), flt.get("value"))
+    if flt.get("name"):
+        tags.add(f"filter:{flt['name']}={flt.get('value')}")
+    if payload.get("action") == "read":
+        tags.add(f"id:{payload.get('id')}")
+
+    if response:
+        result = response.get("result_data")
+        rows: Iterable = ()
+        if isinstance(result, dict):
+            rows = result.get("table", [])
+        elif isinstance(result, list):
+            rows = result
+        if isinstance(rows, _stream.ColumnarTable):
+            for name, values in rows.columns.items():
+                if name.endswith("projekt^nummer"):
+                    for value in set(values):
+                        _add(name, value)
+            return tags
+        for row in rows:
+            if isinstance(row, dict):
+                for name, value in row.items():
+                    if name.endswith("projekt^nummer"):
+                        _add(name, value)
+    return tags
+
+
+def invalidate(*, projects: Iterable[str] = (), persons: Iterable[str] = (),
+               tags: Iterable[str] = ()) -> int:
+    """Gecachte Einträge zu Projekten/Personen (oder rohen Tags wie
+    ``id:…`` / ``filter:nummer=…``) verwerfen."""
+    return _cache.invalidate(
+        [f"projekt:{p}" for p in projects]
+        + [f"person:{p}" for p in persons]
+        + list(tags)
+    )
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _cache.stats()
+
+
+def _is_read(payload: dict) -> bool:
+    return (payload.get("action") in ("infosystem", "query", "read")
+            and not is_write(payload))
+
+
+def _is_outage(exc: Exception) -> bool:
+    """Timeouts, Verbindungsfehler und 5xx zählen für den Breaker."""
+    if isinstance(exc, requests.exceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code >= 500
+    return isinstance(exc, (requests.exceptions.Timeout,
+                            requests.exceptions.ConnectionError))
+
+
+def _stale(key: str | None) -> dict | None:
+    """Letzte gute Antwort, markiert mit der Uhrzeit ihres Abrufs."""
+    entry = _last_good.get(key) if key is not None else None
+    if entry is None:
+        return None
+    data, fetched_at = entry
+    return {**data, "_stale_since": datetime.fromtimestamp(fetched_at).strftime("%H:%M")}
+
+
+def _remember(payload: dict, data: dict, *, key: str | None, ttl: float | None):
+    if key is not None:
+        _last_good.set(key, (data, time.time()), math.inf)
+        if ttl:
+            _cache.set(key, data, ttl, _tags(payload, data))
+    elif is_write(payload):
+        _cache.invalidate(_tags(payload))
+
+
+def _fetch(address: str, payload: dict, *, timeout: float,
+           session: requests.Session | None, key: str | None,
+           ttl: float | None) -> dict:
+    """Ein echter Request samt Metriken, Cache- und Stale-Pflege."""
+    action = payload.get("action", "")
+    endpoint = endpoint_of(payload)
+    t0 = time.perf_counter()
+    res: requests.Response | None = None
+    outcome, rows, nbytes = "error", 0, None
+    stream = _stream_tables and is_table_read(payload)
+    try:
+        res = post(address, payload, timeout=timeout, session=session, stream=stream)
+        res.raise_for_status()
+        if stream:
+            try:
+                data, nbytes = _stream.decode_response(res)
+            except ValueError as exc:
+                raise requests.exceptions.InvalidJSONError(exc, response=res) from exc
+        else:
+            data = res.json()
+        rows = row_count(data)
+        ok = not isinstance(data, dict) or data.get("success", True)
+        outcome = "ok" if ok else "api_error"
+
+        if ok and isinstance(data, dict):
+            _remember(payload, data, key=key, ttl=ttl)
+        return data
+    except requests.exceptions.Timeout:
+        outcome = "timeout"
+        raise
+    except requests.exceptions.HTTPError as exc:
+        outcome = f"http_{exc.response.status_code if exc.response is not None else '?'}"
+        raise
+    finally:
+        METRICS.record(
+            endpoint=endpoint, action=action, outcome=outcome,
+            elapsed=time.perf_counter() - t0,
+            payload_bytes=len(json.dumps(payload, default=str)),
+            response_bytes=(nbytes if nbytes is not None
+                            else len(res.content) if res is not None else 0),
+            rows=rows, retries=_retries(res),
+        )
+        if res is not None:
+            res.close()                  # gibt bei stream=True den Governor-Platz frei
+
+
+def _fetch_guarded(address: str, payload: dict,
+                   breaker: CircuitBreaker | None, **kw) -> dict:
+    """`_fetch` mit Buchführung im Breaker – läuft nur im Leader-Thread."""
+    try:
+        data = _fetch(address, payload, **kw)
+    except requests.exceptions.RequestException as exc:
+        if breaker is not None and _is_outage(exc):
+            breaker.record_failure()
+        raise
+    if breaker is not None:
+        breaker.record_success()
+    return data
+
+
+def _probe(breaker: CircuitBreaker, address: str, payload: dict, **kw):
+    """Genau ein Hintergrund-Request pro offenem Breaker prüft die Erholung."""
+    if not breaker.try_begin_probe():
+        return
+
+    def _run():
+        ok = False
+        try:
+            _fetch(address, payload, **kw)
+            ok = True
+        except requests.exceptions.RequestException:
+            pass
+        finally:
+            breaker.end_probe(ok)
+
+    threading.Thread(target=_run, daemon=True,
+                     name=f"abas-probe-{breaker.name}").start()
+
+
+def request_json(address: str, payload: dict, *, timeout: float,
+                 session: requests.Session | None = None) -> dict:
+    """
+    POST + Statusprüfung + JSON-Dekodierung mit Lese-Cache und Circuit Breaker.
+
+    Lesezugriffe mit konfigurierter TTL werden aus dem Cache bedient;
+    laufen identische Lesezugriffe gleichzeitig (mehrere Sessions), geht nur
+    einer ans ERP und alle erhalten dasselbe Ergebnis;
+    erfolgreiche Schreibzugriffe verwerfen alle Einträge der betroffenen
+    Projekte bzw. Personen.
+
+    Ist das Infosystem gestört (Breaker offen) oder schlägt ein Lesezugriff
+    mit Timeout/5xx fehl, kommt die letzte gute Antwort mit dem Schlüssel
+    ``_stale_since`` ("HH:MM") zurück. Ohne solche Antwort werden Fehler als
+    `requests`-Exceptions weitergereicht (`CircuitOpenError` bei offenem
+    Breaker, ohne das ERP zu belasten).
+    """
+    action = payload.get("action", "")
+    endpoint = endpoint_of(payload)
+    t0 = time.perf_counter()
+
+    read = _is_read(payload)
+    ttl = _ttl_for(payload)
+    key = cache_key(address, payload) if read else None
+    if key is not None and ttl:
+        hit = _cache.get(key)
+        if hit is not None:
+            METRICS.record(endpoint=endpoint, action=action, outcome="cache_hit",
+                           elapsed=time.perf_counter() - t0, rows=row_count(hit))
+            return hit
+
+    kw = dict(timeout=timeout, session=session, key=key, ttl=ttl)
+    breaker = _breakers.get(endpoint) if read else None
+    if breaker is not None and not breaker.allow():
+        _probe(breaker, address, payload, **kw)
+        stale = _stale(key)
+        METRICS.record(endpoint=endpoint, action=action,
+                       outcome="stale" if stale is not None else "circuit_open",
+                       elapsed=time.perf_counter() - t0)
+        if stale is not None:
+            return stale
+        raise CircuitOpenError(
+            f"ABAS-Infosystem {endpoint} antwortet nicht – Abruf vorübergehend ausgesetzt"
+        )
+
+    try:
+        if key is None:
+            data = _fetch_guarded(address, payload, breaker, **kw)
+        else:
+            # gleichzeitige identische Lesezugriffe teilen sich einen Request
+            data, shared = _flight.do(
+                key, lambda: _fetch_guarded(address, payload, breaker, **kw))
+            if shared:
+                METRICS.record(endpoint=endpoint, action=action, outcome="shared",
+                               elapsed=time.perf_counter() - t0, rows=row_count(data))
+    except requests.exceptions.RequestException as exc:
+        stale = _stale(key) if breaker is not None and _is_outage(exc) else None
+        if stale is not None:
+            return stale
+        raise
+    return data
+
+
+# ---------------------------------------------------------------- asyncio
+async def _areplay(cas: "_cassette_mod.Cassette", address: str,
+                   payload: dict) -> "httpx.Response":
+    import httpx
+
+    request = httpx.Request("POST", address, json=payload)
+    entry = cas.next_entry(payload)
+    if entry is None:
+        raise httpx.ConnectError(
+            f"Cassette {cas.path.name}: keine Aufnahme für diesen Request",
+            request=request)
+    await asyncio.sleep(cas.delay(entry))
+    if entry.get("kind") == "error":
+        exc_type = (httpx.ReadTimeout if "Timeout" in entry.get("error", "")
+                    else httpx.ConnectError)
+        raise exc_type(f"{entry.get('message', '')} (Cassette {cas.path.name})",
+                       request=request)
+    headers = {"Content-Type": "application/json"} if entry.get("kind") == "json" else {}
+    return httpx.Response(entry["status"], content=cas.content(entry),
+                          headers=headers, request=request)
+
+
+async def apost(client: "httpx.AsyncClient", address: str, payload: dict, *,
+                timeout: float) -> "httpx.Response":
+    """`post` für den asynchronen Client: Governor-Platz per ``await``,
+    Cassette wie beim synchronen Pfad. Der Body ist danach gelesen."""
+    import httpx
+
+    async with _governor.aslot(WRITE if is_write(payload) else READ):
+        cas = _cassette
+        if cas is not None and cas.mode == "replay":
+            return await _areplay(cas, address, payload)
+
+        t0 = time.perf_counter()
+        try:
+            resp = await client.post(address, json=payload, timeout=timeout)
+        except httpx.TransportError as exc:
+            if cas is not None:
+                cas.record_error(payload, exc, time.perf_counter() - t0)
+            raise
+        if cas is not None:
+            cas.record(payload, status=resp.status_code, reason=resp.reason_phrase,
+                       content=resp.content, elapsed=time.perf_counter() - t0)
+        return resp
+
+
+def _is_async_outage(exc: Exception) -> bool:
+    """`_is_outage` für httpx-Exceptions."""
+    import httpx
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError))
+
+
+async def _afetch(client: "httpx.AsyncClient", address: str, payload: dict, *,
+                  timeout: float, key: str | None, ttl: float | None) -> dict:
+    """`_fetch` für den asynchronen Client."""
+    import httpx
+
+    action = payload.get("action", "")
+    endpoint = endpoint_of(payload)
+    t0 = time.perf_counter()
+    res: "httpx.Response | None" = None
+    outcome, rows = "error", 0
+    try:
+        res = await apost(client, address, payload, timeout=timeout)
+        res.raise_for_status()
+        if _stream_tables and is_table_read(payload):
+            data = _stream.columnar(_stream.loads(res.content))
+        else:
+            data = res.json()
+        rows = row_count(data)
+        ok = not isinstance(data, dict) or data.get("success", True)
+        outcome = "ok" if ok else "api_error"
+
+        if ok and isinstance(data, dict):
+            _remember(payload, data, key=key, ttl=ttl)
+        return data
+    except httpx.TimeoutException:
+        outcome = "timeout"
+        raise
+    except httpx.HTTPStatusError as exc:
+        outcome = f"http_{exc.response.status_code}"
+        raise
+    finally:
+        METRICS.record(
+            endpoint=endpoint, action=action, outcome=outcome,
+            elapsed=time.perf_counter() - t0,
+            payload_bytes=len(json.dumps(payload, default=str)),
+            response_bytes=len(res.content) if res is not None else 0,
+            rows=rows,
+        )
+
+
+async def _afetch_guarded(client: "httpx.AsyncClient", address: str, payload: dict,
+                          breaker: CircuitBreaker | None, **kw) -> dict:
+    import httpx
+
+    try:
+        data = await _afetch(client, address, payload, **kw)
+    except httpx.HTTPError as exc:
+        if breaker is not None and _is_async_outage(exc):
+            breaker.record_failure()
+        raise
+    if breaker is not None:
+        breaker.record_success()
+    return data
+
+
+def _aprobe(breaker: CircuitBreaker, client: "httpx.AsyncClient", address: str,
+            payload: dict, **kw):
+    """`_probe` als Task auf der laufenden Loop."""
+    if not breaker.try_begin_probe():
+        return
+
+    async def _run():
+        import httpx
+
+        ok = False
+        try:
+            await _afetch(client, address, payload, **kw)
+            ok = True
+        except (httpx.HTTPError, ValueError):
+            pass
+        finally:
+            breaker.end_probe(ok)
+
+    task = asyncio.get_running_loop().create_task(_run())
+    _probe_tasks.add(task)
+    task.add_done_callback(_probe_tasks.discard)
+
+
+async def arequest_json(client: "httpx.AsyncClient", address: str, payload: dict, *,
+                        timeout: float) -> dict:
+    """
+    `request_json` für den asynchronen Client – gleicher Cache, gleicher
+    Breaker je Infosystem samt Stale-Rückfall, Single-Flight innerhalb der
+    Event-Loop. Fehler kommen als httpx-Exceptions, bei offenem Breaker ohne
+    letzte gute Antwort als `CircuitOpenError`.
+    """
+    import httpx
+
+    action = payload.get("action", "")
+    endpoint = endpoint_of(payload)
+    t0 = time.perf_counter()
+
+    read = _is_read(payload)
+    ttl = _ttl_for(payload)
+    key = cache_key(address, payload) if read else None
+    if key is not None and ttl:
+        hit = _cache.get(key)
+        if hit is not None:
+            METRICS.record(endpoint=endpoint, action=action, outcome="cache_hit",
+                           elapsed=time.perf_counter() - t0, rows=row_count(hit))
+            return hit
+
+    kw = dict(timeout=timeout, key=key, ttl=ttl)
+    breaker = _breakers.get(endpoint) if read else None
+    if breaker is not None and not breaker.allow():
+        _aprobe(breaker, client, address, payload, **kw)
+        stale = _stale(key)
+        METRICS.record(endpoint=endpoint, action=action,
+                       outcome="stale" if stale is not None else "circuit_open",
+                       elapsed=time.perf_counter() - t0)
+        if stale is not None:
+            return stale
+        raise CircuitOpenError(
+            f"ABAS-Infosystem {endpoint} antwortet nicht – Abruf vorübergehend ausgesetzt"
+        )
+
+    try:
+        if key is None:
+            data = await _afetch_guarded(client, address, payload, breaker, **kw)
+        else:
+            data, shared = await _aflight.do(
+                key, lambda: _afetch_guarded(client, address, payload, breaker, **kw))
+            if shared:
+                METRICS.record(endpoint=endpoint, action=action, outcome="shared",
+                               elapsed=time.perf_counter() - t0, rows=row_count(data))
+    except httpx.HTTPError as exc:
+        stale = _stale(key) if breaker is not None and _is_async_outage(exc) else None
+        if stale is not None:
+            return stale
+        raise
+    return data
+
+
+def configure_breaker(*, threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                      cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+    _breakers.configure(threshold=int(threshold), cooldown=float(cooldown))
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return _breakers.stats()
+
+
+def flight_stats() -> Dict[str, int]:
+    """Zusammengelegte Lesezugriffe – synchroner und asynchroner Pfad."""
+    sync, aio = _flight.stats(), _aflight.stats()
+    return {name: sync[name] + aio[name] for name in sync}
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Verbindungsstatistik je Host aus den urllib3-Pools.
+
+    `connections` zählt neu aufgebaute TCP-Verbindungen, `requests` alle
+    darüber gesendeten Requests – die Differenz wurde per Keep-Alive
+    wiederverwendet.
+    """
+    sess = _session
+    if sess is None:
+        return {"pool_size": None, "hosts": {}}
+
+    hosts: Dict[str, Any] = {}
+    seen: set[int] = set()
+    for adapter in sess.adapters.values():
+        if id(adapter) in seen:
+            continue
+        seen.add(id(adapter))
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            conns = pool.num_connections
+            reqs = pool.num_requests
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections": conns,
+                "requests": reqs,
+                "reused": max(reqs - conns, 0),
+                "reuse_ratio": round((reqs - conns) / reqs, 3) if reqs else 0.0,
+                "idle": pool.pool.qsize() if pool.pool is not None else 0,
+            }
+    return {"pool_size": _session_cfg[0] if _session_cfg else None,
+            "hosts": hosts}